@@ -0,0 +1,34 @@
+"""Times `.delete` and the `.commit` that applies it, removing 1k and 10k of 100k bookmarks"""
+
+import shutil
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZE = 100_000
+# Deleting every bookmark whose URL ends in these digits
+SUFFIXES = ("00", "0")
+
+with tempfile.TemporaryDirectory() as directory:
+    source_path = make_profile(directory, bookmarks=SIZE)
+
+    print(f"{'rows':>8} {'delete (s)':>11} {'commit (s)':>11}")
+
+    for suffix in SUFFIXES:
+        db_path = source_path.replace(".sqlite", f"-{suffix}.sqlite")
+        shutil.copyfile(source_path, db_path)
+
+        fb = FirefoxBookmarks(storage="memory")
+        fb.connect(db_path=db_path)
+
+        start = perf_counter()
+        rows = fb.delete(where=Bookmark.url.endswith(suffix))
+        deleted = perf_counter() - start
+
+        report = fb.commit()
+        fb.disconnect()
+
+        print(f"{rows:>8} {deleted:>11.2f} {report.seconds:>11.2f}")
@@ -0,0 +1,43 @@
+"""Times importing 10k and 50k bookmarks from a Netscape bookmark file, and committing them to the Places database
+
+The file is exported from one synthetic profile and imported into another,
+so about half of its URLs are new to the Places database.
+"""
+
+import os
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZES = (10_000, 50_000)
+
+with tempfile.TemporaryDirectory() as directory:
+    print(f"{'rows':>8} {'import (s)':>11} {'commit (s)':>11} "
+          f"{'places':>8}")
+
+    for size in SIZES:
+        source = FirefoxBookmarks(storage="memory")
+        source.connect(db_path=make_profile(directory, bookmarks=size))
+        exported = os.path.join(directory, f"bookmarks{size}.html")
+        source.export(exported)
+        source.disconnect()
+
+        target_dir = os.path.join(directory, f"target{size}")
+        fb = FirefoxBookmarks(storage="memory")
+        fb.connect(db_path=make_profile(target_dir, bookmarks=size // 2))
+        folder = fb.folders(where=Bookmark.guid == "unfiled_____")[0]
+
+        start = perf_counter()
+        rows = fb.import_html(exported, parent=folder)
+        imported = perf_counter() - start
+
+        start = perf_counter()
+        report = fb.commit()
+        committed = perf_counter() - start
+        fb.disconnect()
+
+        print(f"{rows:>8} {imported:>11.2f} {committed:>11.2f} "
+              f"{report.places:>8}")
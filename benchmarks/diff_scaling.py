@@ -0,0 +1,36 @@
+"""Times `FirefoxBookmarks.diff` on profiles of increasing size
+
+Each profile has 1% of its bookmarks renamed before diffing. Doubling the
+profile should roughly double the time taken.
+"""
+
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZES = (1_000, 2_000, 4_000, 8_000, 16_000, 32_000, 64_000)
+
+print(f"{'bookmarks':>10} {'changed':>8} {'seconds':>8} {'us/row':>8}")
+
+for size in SIZES:
+    with tempfile.TemporaryDirectory() as directory:
+        make_profile(directory, bookmarks=size)
+
+        fb = FirefoxBookmarks(storage="memory")
+        fb.connect(look_under_path=directory)
+        fb.update(
+            where=Bookmark.title.endswith("00"),
+            data={Bookmark.title: "renamed"},
+        )
+
+        start = perf_counter()
+        changed = fb.diff()
+        seconds = perf_counter() - start
+
+        fb.disconnect()
+
+    print(f"{size:>10} {len(changed):>8} {seconds:>8.3f} "
+          f"{seconds / size * 1e6:>8.2f}")
@@ -0,0 +1,43 @@
+"""Times `.export` in every format, plain and gzipped, and measures its peak memory, on 10k and 100k bookmarks
+
+Peak memory should stay flat as the profile grows.
+"""
+
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZES = (10_000, 100_000)
+
+with tempfile.TemporaryDirectory() as directory:
+    print(f"{'rows':>8} {'file':>17} {'seconds':>8} {'peak (MiB)':>11} "
+          f"{'size (MiB)':>11}")
+
+    for size in SIZES:
+        fb = FirefoxBookmarks(storage="memory")
+        fb.connect(db_path=make_profile(directory, bookmarks=size))
+
+        for name in ("bookmarks.html", "bookmarks.json", "bookmarks.csv",
+                     "bookmarks.json.gz"):
+            output_path = os.path.join(directory, name)
+
+            start = perf_counter()
+            fb.export(output_path)
+            seconds = perf_counter() - start
+
+            # Measured apart, since tracing slows everything down
+            tracemalloc.start()
+            fb.export(output_path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{size:>8} {name:>17} {seconds:>8.2f} "
+                  f"{peak / 2**20:>11.2f} "
+                  f"{os.path.getsize(output_path) / 2**20:>11.1f}")
+
+        fb.disconnect()
@@ -0,0 +1,97 @@
+"""Compares loading 10k and 100k bookmarks from `places.sqlite` and from a `.jsonlz4` bookmark backup, in time and file size
+
+The backup is made by exporting to JSON and compressing it with a simple
+greedy LZ4 encoder, which compresses somewhat worse than Firefox's.
+"""
+
+import os
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+from firefox_bookmarks.constants import BOOKMARK_BACKUPS_DIR_NAME
+from firefox_bookmarks.jsonlz4 import MOZLZ4_MAGIC
+
+SIZES = (10_000, 100_000)
+
+
+def compress_block(data: bytes) -> bytes:
+    """Greedy LZ4 block encoder, matching 4-byte prefixes through a hash table"""
+
+    output = bytearray()
+    last_match = len(data) - 12
+    table: dict[bytes, int] = {}
+    anchor = position = 0
+
+    def sequence(literals: bytes, offset: int = 0, match: int = 0):
+        token_literals = min(len(literals), 15)
+        token_match = min(match - 4, 15) if offset else 0
+        output.append(token_literals << 4 | token_match)
+        extended(len(literals) - 15)
+        output.extend(literals)
+        if offset:
+            output.extend(offset.to_bytes(2, "little"))
+            extended(match - 4 - 15)
+
+    def extended(length: int):
+        if length < 0:
+            return
+        output.extend(b"\xff" * (length // 255))
+        output.append(length % 255)
+
+    while position < last_match:
+        key = data[position:position + 4]
+        candidate = table.get(key)
+        table[key] = position
+        if candidate is None or position - candidate > 0xFFFF:
+            position += 1
+            continue
+
+        match = 4
+        while position + match < len(data) - 5 and \
+                data[candidate + match] == data[position + match]:
+            match += 1
+
+        sequence(data[anchor:position], position - candidate, match)
+        position += match
+        anchor = position
+
+    sequence(data[anchor:])
+
+    return bytes(output)
+
+
+with tempfile.TemporaryDirectory() as directory:
+    print(f"{'rows':>8} {'source':>8} {'file (MiB)':>11} {'load (s)':>9}")
+
+    for size in SIZES:
+        db_path = make_profile(directory, bookmarks=size)
+
+        fb = FirefoxBookmarks(storage="memory")
+        fb.connect(db_path=db_path, readonly=True)
+        json_path = os.path.join(directory, "bookmarks.json")
+        fb.export(json_path)
+        fb.disconnect()
+
+        with open(json_path, "rb") as json_file:
+            data = json_file.read()
+        backups_dir = os.path.join(os.path.dirname(db_path),
+                                   BOOKMARK_BACKUPS_DIR_NAME)
+        os.makedirs(backups_dir, exist_ok=True)
+        backup_path = os.path.join(backups_dir, "bookmarks.jsonlz4")
+        with open(backup_path, "wb") as backup:
+            backup.write(MOZLZ4_MAGIC + len(data).to_bytes(4, "little") +
+                         compress_block(data))
+
+        for source, path in (("places", db_path), ("jsonlz4", backup_path)):
+            fb = FirefoxBookmarks(storage="memory")
+            start = perf_counter()
+            report = fb.connect(db_path=db_path, readonly=True, source=source)
+            seconds = perf_counter() - start
+            fb.disconnect()
+
+            file_size = os.path.getsize(path) / 2**20
+            print(f"{report.rows:>8} {source:>8} {file_size:>11.1f} "
+                  f"{seconds:>9.2f}")
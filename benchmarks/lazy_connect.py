@@ -0,0 +1,30 @@
+"""Times `.connect` with and without `lazy=True`, and the first query after each, on 100k bookmarks"""
+
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZE = 100_000
+
+with tempfile.TemporaryDirectory() as directory:
+    db_path = make_profile(directory, bookmarks=SIZE)
+
+    print(f"{'mode':>8} {'connect (s)':>12} {'first query (s)':>16}")
+
+    for lazy in (False, True):
+        fb = FirefoxBookmarks(storage="memory")
+
+        start = perf_counter()
+        fb.connect(db_path=db_path, lazy=lazy)
+        connected = perf_counter() - start
+
+        start = perf_counter()
+        fb.bookmarks(where=Bookmark.id == 1)
+        queried = perf_counter() - start
+        fb.disconnect()
+
+        name = "lazy" if lazy else "eager"
+        print(f"{name:>8} {connected:>12.3f} {queried:>16.3f}")
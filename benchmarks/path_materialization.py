@@ -0,0 +1,36 @@
+"""Times getting the path of every bookmark, by walking parents and in bulk
+
+Walking parents costs a query per ancestor, while `with_paths=True` computes
+every path in one recursive query.
+"""
+
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZES = (1_000, 5_000, 50_000)
+
+print(f"{'bookmarks':>10} {'walked':>8} {'bulk':>8}")
+
+for size in SIZES:
+    with tempfile.TemporaryDirectory() as directory:
+        make_profile(directory, bookmarks=size)
+
+        fb = FirefoxBookmarks(storage="memory")
+        fb.connect(look_under_path=directory)
+
+        start = perf_counter()
+        walked = [bookmark.path for bookmark in fb.bookmarks()]
+        walked_seconds = perf_counter() - start
+
+        start = perf_counter()
+        bulk = [bookmark.path for bookmark in fb.bookmarks(with_paths=True)]
+        bulk_seconds = perf_counter() - start
+
+        fb.disconnect()
+
+    assert walked == bulk
+    print(f"{size:>10} {walked_seconds:>8.3f} {bulk_seconds:>8.3f}")
@@ -0,0 +1,50 @@
+"""Times merging the bookmarks of several profiles, serially and with `aggregate_bookmarks`
+
+Serially, each profile is loaded into a `FirefoxBookmarks` in turn, while
+`aggregate_bookmarks` reads them all at once, in a process per CPU.
+"""
+
+import os
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+PROFILES = (2, 8, 16)
+BOOKMARKS = 20_000
+
+print(f"{'profiles':>10} {'serial':>8} {'pooled':>8}")
+
+for count in PROFILES:
+    with tempfile.TemporaryDirectory() as directory:
+        db_paths = [
+            make_profile(os.path.join(directory, str(idx)),
+                         bookmarks=BOOKMARKS) for idx in range(count)
+        ]
+
+        start = perf_counter()
+        serial = {}
+        for db_path in db_paths:
+            fb = FirefoxBookmarks(storage="memory")
+            fb.connect(db_path=db_path, readonly=True)
+            for bookmark in fb.bookmarks(fields=[
+                    Bookmark.url, Bookmark.title, Bookmark.last_modified
+            ]):
+                known = serial.get(bookmark.url)
+                if known is None or \
+                        bookmark.last_modified > known.last_modified:
+                    serial[bookmark.url] = bookmark
+            fb.disconnect()
+        serial_seconds = perf_counter() - start
+
+        start = perf_counter()
+        report = aggregate_bookmarks(
+            os.path.join(directory, "merged.sqlite"),
+            db_paths=db_paths,
+        )
+        pooled_seconds = perf_counter() - start
+
+    assert report.bookmarks == len(serial)
+    print(f"{count:>10} {serial_seconds:>8.3f} {pooled_seconds:>8.3f}")
@@ -0,0 +1,31 @@
+"""Compares loading every column with `connect(columns=...)`, in time and in size of the duplicate database
+
+The duplicate is kept on disk, so that its size can be read off the file.
+"""
+
+import os
+import tempfile
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZE = 100_000
+COLUMNS = [Bookmark.title, Bookmark.url]
+
+with tempfile.TemporaryDirectory() as directory:
+    db_path = make_profile(directory, bookmarks=SIZE)
+
+    print(f"{'columns':>8} {'load (s)':>10} {'size (MiB)':>11}")
+
+    for columns in (None, COLUMNS):
+        fb = FirefoxBookmarks()
+        start = perf_counter()
+        fb.connect(db_path=db_path, columns=columns)
+        seconds = perf_counter() - start
+        size = os.path.getsize(fb._db_path)
+        fb.disconnect()
+
+        name = "all" if columns is None else "some"
+        print(f"{name:>8} {seconds:>10.2f} {size / 2**20:>11.1f}")
@@ -0,0 +1,50 @@
+"""Compares `Bookmark` models with `BookmarkRecord`s, in memory per row and rows read per second
+
+Each row is read the way report jobs do, through `title`, `url`,
+`is_bookmark`, `is_folder` and `repr`.
+"""
+
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZE = 100_000
+
+
+def read(rows) -> int:
+    total = 0
+    for row in rows:
+        if row.is_bookmark or row.is_folder:
+            total += len(row.title or "") + len(row.url or "") + len(repr(row))
+    return total
+
+
+with tempfile.TemporaryDirectory() as directory:
+    make_profile(directory, bookmarks=SIZE)
+
+    fb = FirefoxBookmarks(storage="memory")
+    fb.connect(look_under_path=directory)
+
+    print(f"{'rows':>8} {'bytes/row':>10} {'rows/s':>10}")
+
+    for lightweight in (False, True):
+        start = perf_counter()
+        read(fb.select(lightweight=lightweight))
+        seconds = perf_counter() - start
+
+        # Measured apart, since tracing slows everything down
+        tracemalloc.start()
+        rows = list(fb.select(lightweight=lightweight))
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        name = "record" if lightweight else "model"
+        print(f"{name:>8} {retained / len(rows):>10.0f} "
+              f"{len(rows) / seconds:>10.0f}")
+        del rows
+
+    fb.disconnect()
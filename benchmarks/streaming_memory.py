@@ -0,0 +1,48 @@
+"""Measures the peak memory of iterating over every bookmark, with `.bookmarks` and `.iter_bookmarks`
+
+`.bookmarks` caches a model instance per row, while `.iter_bookmarks` keeps
+only `fetch_size` rows at a time.
+"""
+
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from synthetic_profile import make_profile
+
+from firefox_bookmarks import *
+
+SIZES = (10_000, 100_000)
+
+
+def measure(rows) -> tuple[float, float]:
+    tracemalloc.start()
+    start = perf_counter()
+    for _ in rows():
+        pass
+    seconds = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return peak / 2**20, seconds
+
+
+print(f"{'bookmarks':>10} {'rows':>14} {'peak MiB':>9} {'seconds':>8}")
+
+for size in SIZES:
+    with tempfile.TemporaryDirectory() as directory:
+        make_profile(directory, bookmarks=size)
+
+        fb = FirefoxBookmarks(storage="memory")
+        fb.connect(look_under_path=directory)
+
+        results = {
+            ".bookmarks": measure(fb.bookmarks),
+            "model": measure(lambda: fb.iter_bookmarks()),
+            "tuple": measure(lambda: fb.iter_bookmarks(rows="tuple")),
+        }
+
+        fb.disconnect()
+
+    for name, (peak, seconds) in results.items():
+        print(f"{size:>10} {name:>14} {peak:>9.1f} {seconds:>8.3f}")
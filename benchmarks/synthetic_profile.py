@@ -0,0 +1,140 @@
+"""Builds throwaway Firefox profiles with a Places database of any size"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE moz_origins (
+    id INTEGER PRIMARY KEY,
+    prefix TEXT NOT NULL,
+    host TEXT NOT NULL,
+    frecency INTEGER NOT NULL,
+    recalc_frecency INTEGER NOT NULL DEFAULT 0,
+    alt_frecency INTEGER,
+    recalc_alt_frecency INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (prefix, host)
+);
+CREATE TABLE moz_places (
+    id INTEGER PRIMARY KEY,
+    url LONGVARCHAR,
+    title LONGVARCHAR,
+    rev_host LONGVARCHAR,
+    visit_count INTEGER DEFAULT 0,
+    hidden INTEGER DEFAULT 0 NOT NULL,
+    typed INTEGER DEFAULT 0 NOT NULL,
+    frecency INTEGER DEFAULT -1 NOT NULL,
+    last_visit_date INTEGER,
+    guid TEXT,
+    foreign_count INTEGER DEFAULT 0 NOT NULL,
+    url_hash INTEGER DEFAULT 0 NOT NULL,
+    description TEXT,
+    preview_image_url TEXT,
+    site_name TEXT,
+    origin_id INTEGER REFERENCES moz_origins(id),
+    recalc_frecency INTEGER NOT NULL DEFAULT 0,
+    alt_frecency INTEGER,
+    recalc_alt_frecency INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX moz_places_guid_uniqueindex ON moz_places (guid);
+CREATE INDEX moz_places_url_hashindex ON moz_places (url_hash);
+CREATE TABLE moz_bookmarks (
+    id INTEGER PRIMARY KEY,
+    type INTEGER,
+    fk INTEGER DEFAULT NULL,
+    parent INTEGER,
+    position INTEGER,
+    title LONGVARCHAR,
+    keyword_id INTEGER,
+    folder_type TEXT,
+    dateAdded INTEGER,
+    lastModified INTEGER,
+    guid TEXT,
+    syncStatus INTEGER NOT NULL DEFAULT 0,
+    syncChangeCounter INTEGER NOT NULL DEFAULT 1
+);
+CREATE UNIQUE INDEX moz_bookmarks_guid_uniqueindex ON moz_bookmarks (guid);
+CREATE INDEX moz_bookmarks_itemindex ON moz_bookmarks (fk, type);
+CREATE INDEX moz_bookmarks_parentindex ON moz_bookmarks (parent, position);
+CREATE TABLE moz_bookmarks_deleted (
+    guid TEXT PRIMARY KEY,
+    dateRemoved INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+ROOTS = ("root", "menu", "toolbar", "tags", "unfiled", "mobile")
+FOLDER_SIZE = 100
+NOW = 1_700_000_000_000_000
+
+
+def make_profile(directory: str, *, bookmarks: int) -> str:
+    """Creates a profile under `directory` with `bookmarks` bookmarks, spread over folders in the menu
+
+    Args:
+        directory: Directory to create the profile in
+        bookmarks: Number of bookmarks to create
+
+    Returns:
+        Path of the created `places.sqlite`
+    """
+
+    profile_dir = os.path.join(directory, f"bench{bookmarks}.default")
+    os.makedirs(profile_dir, exist_ok=True)
+    db_path = os.path.join(profile_dir, "places.sqlite")
+
+    with closing(sqlite3.connect(db_path)) as connection:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            "INSERT INTO moz_origins (id, prefix, host, frecency) "
+            "VALUES (?, 'https://', ?, 100)",
+            ((idx, f"site{idx}.example.com") for idx in range(100)),
+        )
+        folder_rows = [(idx + 1, 0 if idx == 0 else 1, max(idx - 1, 0), name,
+                        NOW, NOW, f"{name:_<12}")
+                       for idx, name in enumerate(ROOTS)]
+        connection.executemany(
+            "INSERT INTO moz_places "
+            "(id, url, title, rev_host, guid, foreign_count, url_hash, "
+            "origin_id, frecency, description) "
+            "VALUES (?, ?, ?, ?, ?, 1, ?, ?, 100, ?)",
+            ((idx, f"https://site{idx % 100}.example.com/page/{idx}",
+              f"Page {idx}", f"moc.elpmaxe.{idx % 100}etis.", f"pl{idx:010}",
+              idx, idx % 100, f"A description of page {idx}")
+             for idx in range(bookmarks)),
+        )
+
+        next_id = len(ROOTS) + 1
+        bookmark_rows = []
+        for idx in range(bookmarks):
+            if idx % FOLDER_SIZE == 0:
+                # Every folder lives in the bookmarks menu, which has id 2
+                folder_id = next_id
+                next_id += 1
+                folder_rows.append(
+                    (folder_id, 2, idx // FOLDER_SIZE, f"Folder {folder_id}",
+                     NOW, NOW, f"fo{folder_id:010}"))
+            bookmark_rows.append(
+                (next_id, idx, folder_id, idx % FOLDER_SIZE, f"Bookmark {idx}",
+                 NOW, NOW, f"bm{next_id:010}"))
+            next_id += 1
+
+        connection.executemany(
+            "INSERT INTO moz_bookmarks "
+            "(id, type, parent, position, title, dateAdded, lastModified, guid) "
+            "VALUES (?, 2, ?, ?, ?, ?, ?, ?)",
+            folder_rows,
+        )
+        connection.executemany(
+            "INSERT INTO moz_bookmarks "
+            "(id, type, fk, parent, position, title, dateAdded, lastModified, guid) "
+            "VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?)",
+            bookmark_rows,
+        )
+        connection.commit()
+
+    return db_path
+
+
+__all__ = [
+    'make_profile',
+]
@@ -42,31 +42,338 @@ Copyright (C) 2023 Aditya Rajput & other contributors
 # You should have received a copy of the GNU Affero General Public License
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 
+import operator
 import os
-import shutil
-from tempfile import gettempdir
-from time import time
-from typing import Any, Iterable
+import sqlite3
+import warnings
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, closing
+from functools import reduce, wraps
+from tempfile import mkstemp
+from time import perf_counter, time
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
 from peewee import (
     JOIN,
+    OP,
+    SQL,
     CharField,
-    DoesNotExist,
+    CursorWrapper,
+    Database,
     Expression,
     Field,
     FloatField,
     Function,
     IntegerField,
     ModelSelect,
+    Node,
+    NodeList,
+    OperationalError,
+    SelectQuery,
+    SqliteDatabase,
     StringExpression,
     TextField,
+    Value,
+    WrappedNode,
+    chunked,
     fn,
 )
 
-from .bookmark import Bookmark, connect_bookmark_model
-from .constants import BATCH_SIZE, BOOKMARK_TYPE, FOLDER_TYPE, ProfileCriterion
-from .locate import locate_db
-from .models import FirefoxBookmark, FirefoxOrigin, FirefoxPlace, connect_firefox_models
+from .aggregate import aggregate_bookmarks
+from .backups import BackupStore, Compression, RetentionPolicy, Snapshot
+from .bookmark import (
+    Bookmark,
+    BookmarkChange,
+    BookmarkClosure,
+    BookmarkRecord,
+    BookmarkSearch,
+    BookmarkTrigram,
+    BookmarkTrigrams,
+    ProfileBookmarkRecord,
+    bookmark_database,
+    bookmark_paths,
+    connect_bookmark_model,
+    index_trigrams,
+    rebuilding_closure,
+    rebuilding_index,
+    subtree_paths,
+    track_closure,
+    track_index,
+    trigrams,
+    untracked,
+)
+from .connect import Progress, close_places_db, connect_to_places_db
+from .constants import (
+    BACKUP_DIR_NAME,
+    BACKUP_PAGES,
+    BACKUP_SLEEP,
+    BATCH_SIZE,
+    BOOKMARK_TYPE,
+    FETCH_SIZE,
+    FOLDER_TYPE,
+    MAX_QUERY_PARAMETERS,
+    PLACES_SCHEMA,
+    ROOT_GUIDS,
+    SYNC_STATUS_NEW,
+    SYNC_STATUS_NORMAL,
+    TRIGRAM_COUNT_LIMIT,
+    TRIGRAMS_PER_MATCH,
+    ExportFormat,
+    LoadEngine,
+    OutputFormat,
+    ProfileCriterion,
+    RowType,
+    Source,
+    Storage,
+)
+from .export import EXPORT_FIELDS, export_bookmarks
+from .importers import ImportedRow, open_text, read_html, read_json
+from .jsonlz4 import SNAPSHOT_FIELDS, URL_FIELDS, read_jsonlz4, url_columns
+from .locate import (
+    BOOKMARK_BACKUP_EXTENSION,
+    FILE_NAME,
+    locate_bookmark_backup,
+    locate_db,
+    locate_db_candidates,
+)
+from .models import (
+    FirefoxBookmark,
+    FirefoxDeletedBookmark,
+    FirefoxOrigin,
+    FirefoxPlace,
+    places_database,
+)
+from .reports import CommitReport, ExportReport, LoadReport, RefreshReport
+from .urls import hash_url, make_guid, reverse_host, split_origin
+
+_T = TypeVar("_T")
+
+
+def _bound_method(method: Callable[..., _T]) -> Callable[..., _T]:
+    """Decorates a method of `FirefoxBookmarks` to run with the models bound to the instance's own databases"""
+
+    @wraps(method)
+    def inner(self, *args, **kwargs) -> _T:
+        with self._bound():
+            return method(self, *args, **kwargs)
+
+    return inner
+
+
+def _bind_rows(wrapper: CursorWrapper, database: Database) -> CursorWrapper:
+    """Makes the `Bookmark`s that an executed query builds remember the database they were read from, see `Bookmark.bound`"""
+
+    process_row = wrapper.process_row
+
+    def bound_row(row) -> Bookmark:
+        bookmark = process_row(row)
+        bookmark._database = database
+        return bookmark
+
+    wrapper.process_row = bound_row
+    return wrapper
+
+
+def _fetch(wrapper: CursorWrapper, fetch_size: int) -> Iterator:
+    """Yields the rows of an executed query, fetching `fetch_size` rows at a time, without caching them"""
+
+    cursor = wrapper.cursor
+    try:
+        while batch := cursor.fetchmany(fetch_size):
+            if not wrapper.initialized:
+                wrapper.initialize()
+                wrapper.initialized = True
+            for row in batch:
+                yield wrapper.process_row(row)
+    finally:
+        cursor.close()
+
+
+def _id_of(item: Bookmark | BookmarkRecord | int) -> int:
+    return item.id if isinstance(item, (Bookmark, BookmarkRecord)) else item
+
+
+def _bookmark_field(key: Field | str) -> Field:
+    """Looks up the `Bookmark` field of a key of `update`'s `data`, given as a field or by name"""
+
+    if isinstance(key, str):
+        return Bookmark._meta.combined[key]
+    return key
+
+
+def _fields_in(node: Any) -> Iterator[Field]:
+    """Yields every field that an expression refers to, however deeply nested"""
+
+    if isinstance(node, Field):
+        yield node
+    elif isinstance(node, Expression):
+        yield from _fields_in(node.lhs)
+        yield from _fields_in(node.rhs)
+    elif isinstance(node, WrappedNode):
+        yield from _fields_in(node.node)
+    elif isinstance(node, Function):
+        yield from _fields_in(node.arguments)
+    elif isinstance(node, NodeList):
+        yield from _fields_in(node.nodes)
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            yield from _fields_in(item)
+
+
+def _insert_statement(fields: Iterable[Field], *, upsert: bool = False) -> str:
+    """Builds an INSERT statement for the table of `fields`, with a parameter for each
+
+    Args:
+        fields: Fields of a single model, in the order of the parameters
+        upsert: If `True`, a row of the same `id` is updated instead.
+    """
+
+    fields = list(fields)
+    table = fields[0].model._meta.table_name
+    columns = ", ".join(f'"{field.column_name}"' for field in fields)
+    parameters = ", ".join("?" for _ in fields)
+    statement = f'INSERT INTO "{table}" ({columns}) VALUES ({parameters})'
+
+    if upsert:
+        assignments = ", ".join(
+            f'"{field.column_name}" = excluded."{field.column_name}"'
+            for field in fields)
+        statement += f' ON CONFLICT ("id") DO UPDATE SET {assignments}'
+
+    return statement
+
+
+def _inserted(row: dict[Field | str, Any]) -> dict[str, Any]:
+    """Checks a row passed to `insert_many`, keying it by field name"""
+
+    names = {field.name for field in _INSERTED_FIELDS}
+    inserted = {}
+    for key, value in row.items():
+        name = key.name if isinstance(key, Field) else key
+        if name not in names:
+            raise ValueError(f"Cannot insert a value for `{name}`")
+        inserted[name] = value
+
+    if inserted.get("type") is None:
+        inserted["type"] = BOOKMARK_TYPE if inserted.get(
+            "url") else FOLDER_TYPE
+
+    return inserted
+
+
+def _renumber(
+    model: type[Bookmark] | type[FirefoxBookmark],
+    folder_ids: Iterable[int],
+):
+    """Numbers the rows in some folders from 0, in their current order, with a single windowed UPDATE
+
+    Args:
+        model: `Bookmark` or `FirefoxBookmark`
+        folder_ids: `id`s of the folders, at most `MAX_QUERY_PARAMETERS`
+    """
+
+    new_position = fn.ROW_NUMBER().over(
+        partition_by=[model.parent],
+        order_by=[model.position, model.id],
+    ) - 1
+    ranked = model \
+        .select(model.id, new_position.alias("position")) \
+        .where(model.parent.in_(list(folder_ids))) \
+        .alias("ranked")
+
+    # Only rows that move are written
+    model \
+        .update(position=ranked.c.position) \
+        .from_(ranked) \
+        .where(model.id == ranked.c.id) \
+        .where(Expression(model.position, OP.IS_NOT, ranked.c.position)) \
+        .execute()
+
+
+def _contained_literal(expression: Expression) -> str | None:
+    """Finds the string that a `Bookmark.title.contains(...)` or `Bookmark.url.contains(...)` condition looks for
+
+    Returns:
+        The string, or `None` if the condition is of any other kind, or the \
+        string has fewer than three characters or any wildcards
+    """
+
+    if expression.op not in (OP.ILIKE, OP.LIKE):
+        return None
+    if not any(expression.lhs is field for field in _TRIGRAM_FIELDS):
+        return None
+    if not isinstance(expression.rhs, str):
+        return None
+
+    pattern = expression.rhs
+    literal = pattern[1:-1]
+    if len(pattern) < 2 or pattern[0] != "%" or pattern[-1] != "%":
+        return None
+    if len(literal) < 3 or any(char in literal for char in "%_\\"):
+        return None
+
+    return literal
+
+
+# Fields that `trigram_index=True` indexes
+_TRIGRAM_FIELDS = (Bookmark.title, Bookmark.url)
+
+# Fields that paths are made of. Changing any of them moves or renames paths.
+_PATH_FIELDS = {
+    Bookmark.id,
+    Bookmark.parent,
+    Bookmark.title,
+    Bookmark.type,
+    Bookmark.url,
+}
+
+# Fields that are always loaded, as `refresh`, `diff` and `commit` need them
+_KEY_FIELDS = (
+    Bookmark.id,
+    Bookmark.guid,
+    Bookmark.parent,
+    Bookmark.place_guid,
+    Bookmark.place_id,
+    Bookmark.type,
+)
+
+# Fields that `insert_many` accepts
+_INSERTED_FIELDS = (
+    Bookmark.title,
+    Bookmark.url,
+    Bookmark.type,
+    Bookmark.date_added,
+    Bookmark.last_modified,
+    Bookmark.guid,
+)
+
+# Fields that new rows are staged with, and created in the Places database from
+_STAGED_FIELDS = (
+    Bookmark.id,
+    Bookmark.parent,
+    Bookmark.position,
+    Bookmark.type,
+    Bookmark.title,
+    Bookmark.url,
+    Bookmark.date_added,
+    Bookmark.last_modified,
+    Bookmark.guid,
+    Bookmark.url_hash,
+    Bookmark.rev_host,
+    Bookmark.origin_prefix,
+    Bookmark.origin_host,
+    Bookmark.sync_status,
+    Bookmark.sync_change_counter,
+)
+
+# Fields that `search_index=True` indexes
+_SEARCH_FIELDS = (
+    Bookmark.title,
+    Bookmark.url,
+    Bookmark.description,
+    Bookmark.site_name,
+)
 
 
 class FirefoxBookmarks:
@@ -100,21 +407,120 @@ class FirefoxBookmarks:
 
     Attributes:
         connect: Duplicates the Places database and connects to it
+        refresh: Copies over the changes made to the Places database since connecting
         disconnect: Disconnects and cleans up
+        persist: Saves the duplicate database to a file
 
         select: Executes a SELECT query
         update: Executes an UPDATE query
+        delete: Executes a DELETE query, removing the rows under any folders deleted too
 
         bookmarks: Executes a SELECT query over the bookmarks
         folders: Executes a SELECT query over the folders
+        iter_select: Streams the rows of a SELECT query
+        iter_bookmarks: Streams the rows of a SELECT query over the bookmarks
+        iter_folders: Streams the rows of a SELECT query over the folders
+        descendants: Executes a SELECT query over the rows under a folder
+        ancestors: Lists the folders that a bookmark or folder is in
+        search: Executes a full-text search
+        insert_many: Adds bookmarks, folders or separators to a folder
+        import_html: Adds the contents of a Netscape bookmark file to a folder
+        import_json: Adds the contents of a Firefox JSON backup to a folder
+        paths: Computes the paths of many bookmarks and folders at once
+        export: Writes all bookmarks and folders to an HTML, JSON or CSV file
+
+        checkpoint: Marks the current state, to later find what changed since
+        changed_since: Lists the changes made after a checkpoint
 
         diff: Generates diff between current state and the original Places database
         commit: Commits the updated bookmarks to the Places database
         restore_backup: Finds the ith latest backup and copies it to the Places database
+        list_backups: Lists the backups of the Places database
+        get_backup: Looks up a backup of the Places database by its timestamp
+        prune_backups: Removes the backups that a retention policy does not keep
     """
 
-    def __init__(self):
-        self._db_path = os.path.join(gettempdir(), 'bookmarks.sqlite')
+    def __init__(
+        self,
+        *,
+        storage: Storage | str = Storage.DISK,
+        persist_to: str | None = None,
+        backup_pages: int = BACKUP_PAGES,
+        backup_progress: Progress | None = None,
+        backup_sleep: float = BACKUP_SLEEP,
+        backup_compression: Compression = Compression.ZLIB,
+        backup_retention: RetentionPolicy | None = RetentionPolicy(),
+        materialize_paths: bool = False,
+        closure_table: bool = False,
+        search_index: bool = False,
+        trigram_index: bool = False,
+    ):
+        """Initializes the manager, without connecting to any database
+
+        Args:
+            storage: Where to keep the duplicate database. \
+            `Storage.MEMORY` (or `"memory"`) skips all filesystem writes for \
+            it. Defaults to `Storage.DISK`.
+            persist_to: If supplied, the duplicate database is saved to this \
+            path on `disconnect`. Defaults to `None`.
+            backup_pages: Number of pages to copy per step, when backing up \
+            the Places database or duplicating it in read-only mode. \
+            Defaults to `BACKUP_PAGES`.
+            backup_progress: Called after each step of those copies, with \
+            the status, and the remaining and total number of pages. \
+            Defaults to `None`.
+            backup_sleep: Seconds to wait between steps of those copies. \
+            Defaults to `BACKUP_SLEEP`.
+            backup_compression: How to compress backups. Defaults to \
+            `Compression.ZLIB`.
+            backup_retention: Which backups to keep after each commit. If \
+            `None`, all are kept. Defaults to `RetentionPolicy()`.
+            materialize_paths: If `True`, the path of every row is stored \
+            in its `materialized_path` column, which is recomputed after \
+            each `.update` that could move or rename rows. `.path` then \
+            costs nothing. Defaults to `False`.
+            closure_table: If `True`, every ancestor-descendant pair is \
+            stored in the `bookmark_closure` table, which is kept up to date \
+            as rows move. Subtree queries then become indexed lookups \
+            instead of recursive queries. Defaults to `False`.
+            search_index: If `True`, `title`, `url`, `description` and \
+            `site_name` are indexed for full-text search with `.search`, \
+            and the index is kept up to date as rows change. Defaults to \
+            `False`.
+            trigram_index: If `True`, `title` and `url` are indexed by \
+            trigram, so that `.contains(...)` conditions on them, with at \
+            least three characters, no longer scan every row. Applies to \
+            `.select`, `.bookmarks`, `.folders` and `.descendants`. \
+            Defaults to `False`.
+        """
+
+        self._storage = Storage(storage)
+        self._persist_to = persist_to
+        self._copy_options = {
+            "pages": backup_pages,
+            "progress": backup_progress,
+            "sleep": backup_sleep,
+        }
+        self._backup_options = {
+            "compression": backup_compression,
+            "retention": backup_retention,
+        }
+        self._materialize_paths = materialize_paths
+        self._closure_table = closure_table
+        self._search_index = search_index
+        self._trigram_index = trigram_index
+
+        # Each instance has databases of its own, which the models are bound
+        # to while its methods run
+        self._database = SqliteDatabase(None)
+        self._places_database = SqliteDatabase(None)
+        self._db_path = None
+        # Engine of the load that `connect(lazy=True)` put off, if any
+        self._pending_engine: LoadEngine | None = None
+        # Names of the `Bookmark` fields left out of the load, so far
+        self._unloaded: set[str] = set()
+        # Bookmark backup loaded instead of the Places database, if any
+        self._snapshot: str | None = None
 
         self._TRANSLATION = {
             "COMBINE": {
@@ -355,357 +761,2451 @@ class FirefoxBookmarks:
             },
         }
 
+    @_bound_method
     def connect(
         self,
         *,
+        db_path: str | None = None,
         look_under_path: str | None = None,
         criterion: ProfileCriterion = ProfileCriterion.LATEST,
         readonly: bool = False,
-    ):
+        immutable: bool = False,
+        engine: LoadEngine = LoadEngine.ATTACH,
+        columns: Iterable[Field] | None = None,
+        lazy: bool = False,
+        source: Source | str = Source.PLACES,
+    ) -> LoadReport:
         """Duplicates a Places database (chosen according to `criterion`) and connects the `Bookmark` model to it
 
         Args:
+            db_path: Path of the Places database. If supplied, no profile is \
+            searched for, and `look_under_path` and `criterion` are ignored.
             look_under_path: Path from where to start searching. \
             If not supplied, looks under default profiles directory.
             criterion: Which profile to choose, in case there are multiple. \
             Defaults to `ProfileCriterion.LATEST`.
-            readonly: If `True`, any changes made will not be synced with \
-            the original database. Use if encountering a "database locked" \
-            error. Defaults to `False`.
+            readonly: If `True`, the Places database is opened in read-only \
+            mode, and any changes made will not be synced with it. Use if \
+            encountering a "database locked" error. Defaults to `False`.
+            immutable: Read-only mode only. If `True`, tells SQLite that the \
+            Places database cannot change, so that it skips locking \
+            altogether. Only use this while Firefox is not running. \
+            Defaults to `False`.
+            engine: How to copy the Places database into the duplicate \
+            database. Defaults to `LoadEngine.ATTACH`, which falls back to \
+            `LoadEngine.BATCH` if the Places database cannot be attached.
+            columns: If supplied, only these fields of `Bookmark` are \
+            copied, along with the keys that `refresh`, `diff` and `commit` \
+            need, and those that paths and indexes are built from. Any other \
+            field is copied over the first time it is selected by name, \
+            filtered on, or updated. Selecting all fields only returns those \
+            copied so far. Defaults to `None`, which copies every field.
+            lazy: If `True`, only the paths are resolved and the databases \
+            connected to. The Places database is copied on the first query \
+            or update instead, and until then `.diff` finds nothing and \
+            `.commit` writes nothing. Defaults to `False`.
+            source: `Source.JSONLZ4` (or `"jsonlz4"`) loads the latest of \
+            the bookmark backups that Firefox keeps in the profile's \
+            `bookmarkbackups` directory, or the `.jsonlz4` file given as \
+            `db_path`, without opening the Places database at all. Use if \
+            it is locked or corrupt. Only the fields that backups hold are \
+            filled in, and the session is read-only: `.refresh` and \
+            `.commit` do nothing, and `.diff` lists the rows changed since \
+            loading. The fields computed from `url` are filled in when first \
+            needed, unless given in `columns`. Giving any field that backups \
+            do not hold in `columns` raises a `ValueError`. Defaults to \
+            `Source.PLACES`.
+
+        Returns:
+            Number of rows copied, and the time it took. Nothing is copied \
+            yet if `lazy`.
         """
 
-        # Connect old models
-        from .models import database_obj
-        self._places_database = database_obj
-        self._places_path = locate_db(
-            look_under_path=look_under_path,
-            criterion=criterion,
-        )
-        connect_firefox_models(
-            look_under_path=look_under_path,
-            criterion=criterion,
-            readonly=readonly,
-        )
+        # Connect old models, to the profile found once here
+        source = Source(source)
+        if source == Source.JSONLZ4 and db_path is not None and \
+                db_path.lower().endswith(BOOKMARK_BACKUP_EXTENSION):
+            # Backups sit in a directory of the profile
+            self._snapshot = db_path
+            self._places_path = os.path.join(
+                os.path.dirname(os.path.dirname(db_path)),
+                FILE_NAME,
+            )
+        else:
+            self._places_path = db_path or locate_db(
+                look_under_path=look_under_path,
+                criterion=criterion,
+            )
+
+        if source == Source.JSONLZ4:
+            self._snapshot = self._snapshot or locate_bookmark_backup(
+                db_path=self._places_path)
+            if self._snapshot is None:
+                raise FileNotFoundError(
+                    f"No bookmark backups next to {self._places_path!r}")
+            readonly = True
+
+            requested = {field.name for field in columns or []}
+            held = {field.name for field in (*SNAPSHOT_FIELDS, *URL_FIELDS)}
+            if requested - held:
+                raise ValueError("Bookmark backups do not hold " +
+                                 ", ".join(sorted(requested - held)))
+
+            # Computed from `url` when first needed, as they are slow to,
+            # unless asked for. The rest is read in one pass regardless.
+            url_names = {field.name for field in URL_FIELDS} - requested
+            columns = [
+                field for field in self._TRANSLATION["COMBINE"]["TO"]
+                if field.name not in url_names
+            ]
+        else:
+            self._snapshot = None
+            connect_to_places_db(
+                database=self._places_database,
+                db_path=self._places_path,
+                readonly=readonly,
+                immutable=immutable,
+                **self._copy_options,
+            )
+        self._readonly = readonly
+        self._backups: BackupStore | None = None
+        self._unloaded = self._unloaded_names(columns)
 
         # Connect new model
-        self._database = connect_bookmark_model(db_path=self._db_path)
+        if self._storage == Storage.MEMORY:
+            # A named, shared-cache database stays the same across the
+            # connections that peewee opens per thread
+            self._db_path = f"file:firefox-bookmarks-{id(self)}" + \
+                "?mode=memory&cache=shared"
+        else:
+            descriptor, self._db_path = mkstemp(
+                prefix="firefox-bookmarks-",
+                suffix=".sqlite",
+            )
+            os.close(descriptor)
+        connect_bookmark_model(
+            db_path=self._db_path,
+            database=self._database,
+            closure_table=self._closure_table,
+        )
+        if self._closure_table:
+            track_closure(self._database)
+        self._searchable = self._search_index and self._create_search_index()
+        self._trigrams = self._trigram_index and self._create_trigram_index()
+        self._attached = self._snapshot is None and self._attach_places()
+
+        # Insert data into duplicate database, now or on first use
+        if lazy:
+            self._pending_engine = engine
+            return LoadReport(engine=engine, rows=0, seconds=0)
+
+        self._pending_engine = None
+        return self._load(engine=engine)
+
+    def _bound(self) -> ExitStack:
+        """Binds the models to this instance's databases, in the current thread only"""
+
+        stack = ExitStack()
+        stack.enter_context(bookmark_database.bound(self._database))
+        stack.enter_context(places_database.bound(self._places_database))
+
+        return stack
 
-        # Insert data into duplicate database
-        self._load()
+    def _ensure_loaded(self):
+        """Runs the load that `connect(lazy=True)` put off, if it has not run yet"""
 
-    def _load(self):
+        if self._pending_engine is not None:
+            engine, self._pending_engine = self._pending_engine, None
+            self._load(engine=engine)
+
+    def _load(self, *, engine: LoadEngine = LoadEngine.ATTACH) -> LoadReport:
         """Inserts data from places.sqlite to our duplicate bookmarks.sqlite database"""
 
+        start = perf_counter()
+
+        if engine == LoadEngine.ATTACH and not self._attached:
+            engine = LoadEngine.BATCH
+
+        # Taken before copying, so that `refresh` errs on the side of
+        # re-copying rows that changed during the load
+        if self._snapshot is None:
+            self._watermarks = self._places_watermarks()
+        else:
+            self._watermarks = (0, 0)
+
+        with self._database.atomic(), untracked(self._database), \
+                self._rebuilding_indexes():
+            # Start from a clean slate, in case a previous session left its
+            # duplicate database behind
+            Bookmark.delete().execute()
+            BookmarkChange.delete().execute()
+
+            if self._snapshot is not None:
+                rows = self._load_snapshot()
+            elif engine == LoadEngine.ATTACH:
+                rows = self._load_attached()
+            else:
+                rows = self._load_batched()
+
+            if self._materialize_paths:
+                self._store_paths()
+
+        # Everything changed after this point is yet to be committed
+        self._committed = self.checkpoint()
+
+        return LoadReport(
+            engine=engine,
+            rows=rows,
+            seconds=perf_counter() - start,
+        )
+
+    @_bound_method
+    def refresh(self) -> RefreshReport:
+        """Copies over the changes made to the Places database since loading or the last refresh
+
+        New bookmarks, and bookmarks with a newer `last_modified` or whose \
+        place has a newer `last_visit_date`, are copied again. Bookmarks \
+        that were removed from the Places database are removed. Rows with \
+        uncommitted changes are left as they are.
+
+        Returns:
+            Number of rows copied and removed, and the time it took
+        """
+
+        self._ensure_loaded()
+        start = perf_counter()
+
+        if self._snapshot is not None:
+            warnings.warn(
+                "Loaded from a bookmark backup, so nothing was refreshed.")
+            return RefreshReport(
+                copied=0,
+                removed=0,
+                seconds=perf_counter() - start,
+            )
+
+        bookmark_mark, place_mark = self._watermarks
+        watermarks = self._places_watermarks()
+        uncommitted = {id_ for (id_, ) in self._uncommitted_ids().tuples()}
+
+        places_ids = {
+            id_
+            for (id_, ) in FirefoxBookmark.select(FirefoxBookmark.id).tuples()
+        }
+        our_ids = {id_ for (id_, ) in Bookmark.select(Bookmark.id).tuples()}
+        added = list(places_ids - our_ids - uncommitted)
+        removed = list(our_ids - places_ids - uncommitted)
+
+        modified = self._combined_query() \
+            .where(
+                (FirefoxBookmark.last_modified > bookmark_mark) |
+                (FirefoxPlace.last_visit_date > place_mark)
+            ) \
+            .tuples()
+        stale = {row[0]: row for row in modified if row[0] not in uncommitted}
+
+        for ids in chunked(added, MAX_QUERY_PARAMETERS):
+            new = self._combined_query() \
+                .where(FirefoxBookmark.id.in_(ids)) \
+                .tuples()
+            stale.update((row[0], row) for row in new)
+
+        with self._database.atomic(), untracked(self._database), \
+                self._rebuilding_indexes():
+            self._upsert(stale.values())
+
+            for ids in chunked(removed, MAX_QUERY_PARAMETERS):
+                Bookmark.delete().where(Bookmark.id.in_(ids)).execute()
+
+            if self._materialize_paths:
+                self._store_paths()
+
+        self._watermarks = watermarks
+
+        return RefreshReport(
+            copied=len(stale),
+            removed=len(removed),
+            seconds=perf_counter() - start,
+        )
+
+    def _rebuilding_indexes(self) -> ExitStack:
+        """Pauses the triggers that maintain the optional indexes, which are rebuilt on exit"""
+
+        stack = ExitStack()
+        if self._closure_table:
+            stack.enter_context(rebuilding_closure(self._database))
+        if self._searchable:
+            stack.enter_context(
+                rebuilding_index(self._database, BookmarkSearch))
+        if self._trigrams and self._trigram_fts:
+            stack.enter_context(
+                rebuilding_index(self._database, BookmarkTrigrams))
+        elif self._trigrams:
+            stack.callback(self._index_trigrams)
+
+        return stack
+
+    def _create_search_index(self) -> bool:
+        """Creates the full-text index, if SQLite was built with FTS5
+
+        Returns:
+            Whether the index could be created
+        """
+
+        if not BookmarkSearch.fts5_installed():
+            warnings.warn(
+                "SQLite was built without FTS5, so `.search` is unavailable.")
+            return False
+
+        self._database.create_tables([BookmarkSearch])
+        track_index(self._database, BookmarkSearch)
+
+        return True
+
+    def _create_trigram_index(self) -> bool:
+        """Creates the trigram index, as an FTS5 table if SQLite has the trigram tokenizer, or else as a plain table
+
+        Returns:
+            Whether the index could be created
+        """
+
+        try:
+            self._database.create_tables([BookmarkTrigrams])
+        except OperationalError:
+            self._trigram_fts = False
+            self._database.create_tables([BookmarkTrigram])
+        else:
+            self._trigram_fts = True
+            track_index(self._database, BookmarkTrigrams)
+
+        return True
+
+    def _index_trigrams(self, ids: Iterable[int] | None = None):
+        """Indexes the trigrams of some or all rows into the plain trigram table"""
+
+        index_trigrams(self._database, ids)
+        self._trigrams_indexed = self.checkpoint()
+
+    def _sync_trigrams(self):
+        """Indexes again the rows whose `title` or `url` changed since the plain trigram table was last updated"""
+
+        if not self._trigrams or self._trigram_fts:
+            return
+
+        changed = BookmarkChange \
+            .select(BookmarkChange.bookmark_id) \
+            .where(BookmarkChange.seq > self._trigrams_indexed) \
+            .where(
+                (BookmarkChange.operation != "UPDATE") |
+                BookmarkChange.column.is_null(False)
+            ) \
+            .distinct()
+        ids = [id_ for (id_, ) in changed.tuples()]
+
+        if ids:
+            self._index_trigrams(ids)
+
+    def _places_watermarks(self) -> tuple[int, int]:
+        """Finds the latest `last_modified` of `moz_bookmarks`, and `last_visit_date` of `moz_places`"""
+
+        bookmark_mark = FirefoxBookmark \
+            .select(fn.MAX(FirefoxBookmark.last_modified)) \
+            .scalar()
+        place_mark = FirefoxPlace \
+            .select(fn.MAX(FirefoxPlace.last_visit_date)) \
+            .scalar()
+
+        return bookmark_mark or 0, place_mark or 0
+
+    def _attach_places(self) -> bool:
+        """Attaches the Places database to our duplicate database, as the `places` schema
+
+        Returns:
+            Whether the Places database could be attached
+        """
+
+        try:
+            # Attach the file that the `Firefox*` models are actually
+            # connected to, which is a temporary duplicate in read-only mode
+            self._database.attach(
+                self._places_database.database,
+                PLACES_SCHEMA,
+            )
+        except OperationalError as error:
+            warnings.warn(
+                f"Could not attach the Places database ({error}). " + \
+                "Falling back to copying and diffing it through Python.",
+            )
+            return False
+
+        return True
+
+    def _load_attached(self) -> int:
+        # Neither `main` nor `temp` have `moz_*` tables, so SQLite resolves the
+        # unqualified table names in this query to the attached schema
+        return Bookmark \
+            .insert_from(
+                self._combined_query(),
+                fields=self._loaded_translation("COMBINE")["TO"],
+            ) \
+            .as_rowcount() \
+            .execute()
+
+    def _load_batched(self) -> int:
         max_id = FirefoxBookmark.select(fn.MAX(FirefoxBookmark.id)).scalar()
+        rows = 0
+
+        for idx in range(0, (max_id or 0) + 1, BATCH_SIZE):
+            start = (FirefoxBookmark.id >= idx)
+            end = (FirefoxBookmark.id < idx + BATCH_SIZE)
+
+            source = list(self._combined_query().where(start & end).tuples())
+            if not source:
+                # This just means that there are no ids in this batch. This is
+                # not unusual. Hence we just...
+                #
+                # Ignore,
+                # Barua
+                continue
+
+            Bookmark.insert_many(
+                source,
+                fields=self._loaded_translation("COMBINE")["TO"],
+            ).execute()
+            rows += len(source)
+
+        return rows
+
+    def _load_snapshot(self) -> int:
+        # Streamed straight from the decompressed tree into the table
+        cursor = self._database.cursor()
+        cursor.executemany(
+            _insert_statement(SNAPSHOT_FIELDS),
+            read_jsonlz4(self._snapshot),
+        )
+        rows = cursor.rowcount
 
-        with self._database.atomic():
-            for idx in range(0, max_id, BATCH_SIZE):
-                try:
-                    selected = FirefoxBookmark.select(
-                        *(self._TRANSLATION["COMBINE"]["FROM"]))
-
-                    joined = selected.join(
-                        FirefoxPlace,
-                        on=(FirefoxBookmark.fk == FirefoxPlace.id),
-                        join_type=JOIN.LEFT_OUTER,
-                    ).join(
-                        FirefoxOrigin,
-                        on=(FirefoxPlace.origin == FirefoxOrigin.id),
-                        join_type=JOIN.LEFT_OUTER,
-                    )
-
-                    start = (FirefoxBookmark.id >= idx)
-                    end = (FirefoxBookmark.id < idx + BATCH_SIZE)
-
-                    query = joined.where(start & end)
-
-                    source = list(query.tuples())
-                except DoesNotExist:
-                    # This just means that there are no ids in this batch. This is not unusual.
-                    # Hence we just...
-                    #
-                    # Ignore,
-                    # Barua
-                    continue
-
-                Bookmark.insert_many(
-                    source,
-                    fields=self._TRANSLATION["COMBINE"]["TO"],
-                ).execute()
+        if any(field.name not in self._unloaded for field in URL_FIELDS):
+            self._load_url_columns()
+
+        return rows
+
+    def _unloaded_names(self, columns: Iterable[Field] | None) -> set[str]:
+        """Names the `Bookmark` fields that `connect(columns=...)` leaves out of the load"""
+
+        if columns is None:
+            return set()
+
+        kept = [*columns, *_KEY_FIELDS]
+        if self._materialize_paths:
+            kept.extend(_PATH_FIELDS)
+        if self._search_index:
+            kept.extend(_SEARCH_FIELDS)
+        if self._trigram_index:
+            kept.extend(_TRIGRAM_FIELDS)
+
+        names = {field.name for field in self._TRANSLATION["COMBINE"]["TO"]}
+        return names - {field.name for field in kept}
+
+    def _loaded_translation(self, *keys: str) -> dict[str, tuple[Field, ...]]:
+        """Looks up `keys` in `_TRANSLATION`, keeping only the pairs of fields whose `Bookmark` side is loaded"""
+
+        translation = reduce(operator.getitem, keys, self._TRANSLATION)
+        if not self._unloaded:
+            return translation
+
+        ours = "TO" if keys[0] == "COMBINE" else "FROM"
+        loaded = [
+            field.name not in self._unloaded for field in translation[ours]
+        ]
+
+        return {
+            side: tuple(field for field, keep in zip(fields, loaded) if keep)
+            for side, fields in translation.items()
+        }
+
+    def _loaded_fields(self) -> list[Field]:
+        """Lists the `Bookmark` fields that hold data, in their usual order"""
+
+        return [
+            field for field in Bookmark._meta.sorted_fields
+            if field.name not in self._unloaded
+        ]
 
+    def _load_columns(self, fields: Iterable[Field]):
+        """Copies over the fields among `fields` that were left out of the load"""
+
+        names = {
+            field.name
+            for field in fields if getattr(field, "model", None) is Bookmark
+        } & self._unloaded
+        if not names:
+            return
+
+        if self._snapshot is not None:
+            self._load_url_columns()
+            return
+
+        translation = self._TRANSLATION["COMBINE"]
+        pairs = [
+            (source, target)
+            for source, target in zip(translation["FROM"], translation["TO"])
+            if target.name in names
+        ]
+        assignments = ", ".join(f'"{target.column_name}" = ?'
+                                for _, target in pairs)
+        statement = f'UPDATE "{Bookmark._meta.table_name}" ' + \
+            f'SET {assignments} WHERE "{Bookmark.id.column_name}" = ?'
+
+        source = self._combined_query(
+            [FirefoxBookmark.id, *(source for source, _ in pairs)])
+        with self._database.atomic(), untracked(self._database):
+            self._database.cursor().executemany(
+                statement,
+                ((*row[1:], row[0]) for row in source.tuples().iterator()),
+            )
+
+        self._unloaded -= names
+
+    def _load_url_columns(self):
+        """Fills in `URL_FIELDS` from the `url` of each row, for sessions loaded from a bookmark backup"""
+
+        assignments = ", ".join(f'"{field.column_name}" = ?'
+                                for field in URL_FIELDS)
+        statement = f'UPDATE "{Bookmark._meta.table_name}" ' + \
+            f'SET {assignments} WHERE "{Bookmark.id.column_name}" = ?'
+
+        source = Bookmark \
+            .select(Bookmark.id, Bookmark.url) \
+            .where(Bookmark.url.is_null(False))
+        with self._database.atomic(), untracked(self._database):
+            self._database.cursor().executemany(
+                statement,
+                ((*url_columns(url), id_)
+                 for id_, url in source.tuples().iterator()),
+            )
+
+        self._unloaded -= {field.name for field in URL_FIELDS}
+
+    def _combined_query(self,
+                        sources: Iterable[Field] | None = None) -> ModelSelect:
+        """Builds the SELECT query that joins `moz_bookmarks`, `moz_places` and `moz_origins` into rows of `bookmark`
+
+        Args:
+            sources: Fields of the `Firefox*` models to select. Defaults to \
+            those translated to the loaded fields of `Bookmark`.
+        """
+
+        if sources is None:
+            sources = self._loaded_translation("COMBINE")["FROM"]
+
+        return FirefoxBookmark \
+            .select(*sources) \
+            .join(
+                FirefoxPlace,
+                on=(FirefoxBookmark.fk == FirefoxPlace.id),
+                join_type=JOIN.LEFT_OUTER,
+            ) \
+            .join(
+                FirefoxOrigin,
+                on=(FirefoxPlace.origin == FirefoxOrigin.id),
+                join_type=JOIN.LEFT_OUTER,
+            )
+
+    @_bound_method
     def select(
         self,
         *,
         fields: Iterable[Field] = [],
         where: Expression | None = None,
-    ) -> Iterable[Bookmark]:
+        under: Bookmark | int | None = None,
+        with_paths: bool = False,
+        lightweight: bool = False,
+    ) -> Iterable[Bookmark] | list[BookmarkRecord]:
         """Executes a SELECT query
 
         Args:
             fields: Iterable of fields to select. Defaults to all.
             where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            under: If supplied, only rows anywhere under this folder (or \
+            folder `id`) are selected. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query, so that `.path` costs nothing. \
+            Defaults to `False`.
+            lightweight: If `True`, returns a list of read-only \
+            `BookmarkRecord`s, which take much less memory and time to \
+            build than `Bookmark`s. Defaults to `False`.
 
         Returns:
             Iterable of bookmarks and folders matching the SELECT query
         """
 
-        selected: ModelSelect = Bookmark.select(*fields)
-
-        if where is not None:
-            selected = selected.where(where)
+        selected = self._select(
+            fields=fields,
+            where=where,
+            under=under,
+            with_paths=with_paths,
+            lightweight=lightweight,
+        )
 
-        return selected.execute()
+        return self._execute(selected, lightweight=lightweight)
 
-    def update(
+    @_bound_method
+    def iter_select(
         self,
         *,
+        fields: Iterable[Field] = [],
         where: Expression | None = None,
-        data: dict[Field, Any],
-    ) -> int:
-        """Executes an UPDATE query
+        under: Bookmark | int | None = None,
+        with_paths: bool = False,
+        rows: RowType | str = RowType.MODEL,
+        fetch_size: int = FETCH_SIZE,
+    ) -> Iterator:
+        """Executes a SELECT query, and streams its rows instead of keeping them all in memory
 
         Args:
-            data: A `dict` from fields of `Bookmark` to new values
+            fields: Iterable of fields to select. Defaults to all.
             where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            under: If supplied, only rows anywhere under this folder (or \
+            folder `id`) are selected. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query. Defaults to `False`.
+            rows: Form of each row. `RowType.MODEL` (or `"model"`) yields \
+            `Bookmark`s, `"record"` yields read-only `BookmarkRecord`s, \
+            while `"tuple"`, `"dict"` and `"namedtuple"` skip building \
+            objects of either kind. Defaults to `RowType.MODEL`.
+            fetch_size: Number of rows to fetch from the database at a \
+            time. Defaults to `FETCH_SIZE`.
 
         Returns:
-            Number of rows affected by the update
+            Iterator over the bookmarks and folders matching the SELECT query
         """
 
-        return Bookmark.update(data).where(where).execute()
+        rows = RowType(rows)
+        selected = self._select(
+            fields=fields,
+            where=where,
+            under=under,
+            with_paths=with_paths,
+            lightweight=rows == RowType.RECORD,
+        )
 
-    def bookmarks(
+        if rows == RowType.TUPLE:
+            selected = selected.tuples()
+        elif rows == RowType.DICT:
+            selected = selected.dicts()
+        elif rows == RowType.NAMEDTUPLE:
+            selected = selected.namedtuples()
+
+        # Executed here, while the models are bound, and read lazily later
+        executed = selected.execute()
+        if rows == RowType.MODEL:
+            _bind_rows(executed, self._database)
+        fetched = _fetch(executed, fetch_size)
+        if rows == RowType.RECORD:
+            return map(BookmarkRecord._make, fetched)
+        return fetched
+
+    def _select(
+        self,
+        *,
+        fields: Iterable[Field],
+        where: Expression | None,
+        under: Bookmark | int | None,
+        with_paths: bool,
+        lightweight: bool = False,
+    ) -> ModelSelect:
+        self._ensure_loaded()
+
+        fields = list(fields)
+        if not fields and self._unloaded:
+            fields = self._loaded_fields()
+
+        # Copy over whatever was left out of the load, yet is needed now
+        needed = [*fields, *_fields_in(where)]
+        if with_paths:
+            needed.extend(_PATH_FIELDS)
+        self._load_columns(needed)
+
+        if lightweight:
+            # Records have a slot for every field, in order, so fill those
+            # not selected with NULLs
+            names = {field.name for field in fields}
+            fields = [
+                field if not names or field.name in names
+                or field is Bookmark.materialized_path else SQL("NULL")
+                for field in Bookmark._meta.sorted_fields
+            ]
+
+        if not with_paths:
+            selected: ModelSelect = Bookmark.select(*fields)
+        else:
+            # Stand the computed path in for the stored one, which may be stale
+            fields = [
+                field for field in fields or Bookmark._meta.sorted_fields
+                if field is not Bookmark.materialized_path
+            ]
+            paths = bookmark_paths()
+            selected = Bookmark \
+                .select(
+                    *fields,
+                    paths.c.path.alias(Bookmark.materialized_path.name),
+                ) \
+                .join(
+                    paths,
+                    join_type=JOIN.LEFT_OUTER,
+                    on=(paths.c.id == Bookmark.id),
+                ) \
+                .with_cte(paths) \
+                .objects()
+
+        if where is not None and self._trigrams:
+            self._sync_trigrams()
+            where = self._use_trigrams(where)
+        if where is not None:
+            selected = selected.where(where)
+        if under is not None:
+            selected = selected.where(Bookmark.id.in_(self._subtree(under)))
+        if lightweight:
+            selected = selected.tuples()
+
+        return selected
+
+    def _execute(
+        self,
+        selected: ModelSelect,
+        *,
+        lightweight: bool,
+    ) -> Iterable[Bookmark] | list[BookmarkRecord]:
+        """Executes a query built by `_select`, into `BookmarkRecord`s if `lightweight`"""
+
+        if lightweight:
+            return list(
+                map(BookmarkRecord._make, _fetch(selected.execute(),
+                                                 FETCH_SIZE)))
+        return _bind_rows(selected.execute(), self._database)
+
+    def _use_trigrams(self, node: Node) -> Node:
+        """Narrows each `.contains(...)` condition on `title` or `url` down to the rows that have all of its trigrams
+
+        The conditions themselves are kept, so the results do not change.
+        Only conditions that are combined through `AND` and `OR` are narrowed
+        down: under `NOT`, narrowing would turn a NULL into a match.
+        """
+
+        if not isinstance(node, Expression):
+            return node
+
+        literal = _contained_literal(node)
+        if literal is not None:
+            field = getattr(Bookmark, node.lhs.name)
+            matches = self._trigram_matches(field, literal)
+            if matches is not None:
+                return node & Bookmark.id.in_(matches)
+            return node
+
+        if node.op not in (OP.AND, OP.OR):
+            return node
+
+        return Expression(
+            self._use_trigrams(node.lhs),
+            node.op,
+            self._use_trigrams(node.rhs),
+            flat=node.flat,
+        )
+
+    def _trigram_matches(
         self,
+        field: Field,
+        literal: str,
+    ) -> SelectQuery | None:
+        """Builds a SELECT query for the `id`s of the rows whose `field` may contain `literal`
+
+        Returns:
+            The query, or `None` if the index would not narrow down the rows
+        """
+
+        if self._trigram_fts:
+            # The trigram tokenizer matches phrases as substrings
+            phrase = '"' + literal.replace('"', '""') + '"'
+            column = getattr(BookmarkTrigrams, field.name)
+            return BookmarkTrigrams \
+                .select(BookmarkTrigrams.rowid) \
+                .where(column.match(phrase))
+
+        # Any subset of the trigrams narrows down correctly. Common ones, like
+        # "www" or "com", narrow down little at great cost, so use only the
+        # rarest few, found by counting each up to a limit.
+        counts = sorted(
+            (
+                BookmarkTrigram \
+                    .select(BookmarkTrigram.bookmark_id) \
+                    .where(BookmarkTrigram.column == field.column_name) \
+                    .where(BookmarkTrigram.trigram == gram) \
+                    .limit(TRIGRAM_COUNT_LIMIT) \
+                    .count(),
+                gram,
+            ) for gram in trigrams(literal))
+        grams = [
+            gram for count, gram in counts[:TRIGRAMS_PER_MATCH]
+            if count < TRIGRAM_COUNT_LIMIT
+        ]
+        if not grams:
+            return None
+
+        return BookmarkTrigram \
+            .select(BookmarkTrigram.bookmark_id) \
+            .where(BookmarkTrigram.column == field.column_name) \
+            .where(BookmarkTrigram.trigram.in_(grams)) \
+            .group_by(BookmarkTrigram.bookmark_id) \
+            .having(fn.COUNT(BookmarkTrigram.trigram) == len(grams))
+
+    @_bound_method
+    def descendants(
+        self,
+        folder: Bookmark | int,
         *,
         fields: Iterable[Field] = [],
         where: Expression | None = None,
-    ) -> Iterable[Bookmark]:
-        """Executes a SELECT query over only the rows representing bookmarks
+        with_paths: bool = False,
+        lightweight: bool = False,
+    ) -> Iterable[Bookmark] | list[BookmarkRecord]:
+        """Executes a SELECT query over the rows anywhere under a folder
 
         Args:
+            folder: The folder, or its `id`
             fields: Iterable of fields to select. Defaults to all.
             where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query. Defaults to `False`.
+            lightweight: If `True`, returns a list of read-only \
+            `BookmarkRecord`s, which take much less memory and time to \
+            build than `Bookmark`s. Defaults to `False`.
 
         Returns:
-            Iterable of bookmarks matching the SELECT query
+            Iterable of bookmarks and folders under `folder`, matching the \
+            SELECT query
         """
 
-        final_where: Expression = (Bookmark.type == BOOKMARK_TYPE)
-        if where is not None:
-            final_where &= where
+        return self.select(
+            fields=fields,
+            where=where,
+            under=folder,
+            with_paths=with_paths,
+            lightweight=lightweight,
+        )
 
-        return Bookmark.select(*fields).where(final_where).execute()
+    @_bound_method
+    def ancestors(self, item: Bookmark | int) -> list[Bookmark]:
+        """Lists the folders that a bookmark or folder is in, from the root down to its parent
 
-    def folders(
+        Args:
+            item: The bookmark or folder, or its `id`
+
+        Returns:
+            List of folders
+        """
+
+        self._ensure_loaded()
+        item_id = _id_of(item)
+
+        if self._closure_table:
+            selected = Bookmark \
+                .select() \
+                .join(
+                    BookmarkClosure,
+                    on=(BookmarkClosure.ancestor == Bookmark.id),
+                ) \
+                .where(BookmarkClosure.descendant == item_id) \
+                .where(BookmarkClosure.depth > 0) \
+                .order_by(BookmarkClosure.depth.desc())
+        else:
+            base = Bookmark \
+                .select(Bookmark.parent, Value(1)) \
+                .where(Bookmark.id == item_id)
+            lineage = base.cte(
+                "lineage",
+                recursive=True,
+                columns=("id", "depth"),
+            )
+            parent = Bookmark.alias()
+            parents = parent \
+                .select(parent.parent, lineage.c.depth + 1) \
+                .join(lineage, on=(parent.id == lineage.c.id))
+            lineage = lineage.union_all(parents)
+            selected = Bookmark \
+                .select() \
+                .join(lineage, on=(lineage.c.id == Bookmark.id)) \
+                .order_by(lineage.c.depth.desc()) \
+                .with_cte(lineage)
+
+        return list(_bind_rows(selected.execute(), self._database))
+
+    @_bound_method
+    def search(
         self,
+        query: str,
         *,
         fields: Iterable[Field] = [],
         where: Expression | None = None,
+        limit: int | None = None,
+        frecency_weight: float = 0,
     ) -> Iterable[Bookmark]:
-        """Executes a SELECT query over only the rows representing folders
+        """Executes a full-text search, from best to worst match
+
+        Requires `search_index=True`. Each result's relevance is available \
+        as its `rank` attribute, where lower is better.
 
         Args:
+            query: An FTS5 query, e.g. `"firefox help"`, `"fire*"` or \
+            `"title: mozilla"`
             fields: Iterable of fields to select. Defaults to all.
             where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            limit: Maximum number of results. Defaults to `None`.
+            frecency_weight: How much each point of `place_frecency` \
+            improves the rank. `0` ranks by text relevance (BM25) alone. \
+            Defaults to `0`.
 
         Returns:
-            Iterable of folders matching the SELECT query
+            Iterable of bookmarks and folders matching the search
         """
 
-        final_where: Expression = (Bookmark.type == FOLDER_TYPE)
+        if not self._searchable:
+            raise ValueError("Pass `search_index=True` to search bookmarks")
+
+        self._ensure_loaded()
+        fields = list(fields) or self._loaded_fields()
+        needed = [*fields, *_fields_in(where)]
+        if frecency_weight:
+            needed.append(Bookmark.place_frecency)
+        self._load_columns(needed)
+
+        rank = BookmarkSearch.bm25()
+        if frecency_weight:
+            rank -= frecency_weight * fn.MAX(Bookmark.place_frecency, 0)
+
+        selected = Bookmark \
+            .select(*fields, rank.alias("rank")) \
+            .join(BookmarkSearch, on=(BookmarkSearch.rowid == Bookmark.id)) \
+            .where(BookmarkSearch.match(query)) \
+            .order_by(SQL("rank")) \
+            .limit(limit)
+
         if where is not None:
-            final_where &= where
+            selected = selected.where(where)
 
-        return Bookmark.select(*fields).where(final_where).execute()
+        return _bind_rows(selected.execute(), self._database)
 
-    def str_update(
+    def _subtree(self, folder: Bookmark | int) -> SelectQuery:
+        """Builds a SELECT query for the `id`s of all rows anywhere under a folder"""
+
+        folder_id = _id_of(folder)
+
+        if self._closure_table:
+            return BookmarkClosure \
+                .select(BookmarkClosure.descendant) \
+                .where(BookmarkClosure.ancestor == folder_id) \
+                .where(BookmarkClosure.depth > 0)
+
+        base = Bookmark.select(Bookmark.id).where(Bookmark.parent == folder_id)
+        subtree = base.cte("subtree", recursive=True, columns=("id", ))
+        child = Bookmark.alias()
+        children = child \
+            .select(child.id) \
+            .join(subtree, on=(child.parent == subtree.c.id))
+        subtree = subtree.union_all(children)
+
+        return subtree.select_from(subtree.c.id)
+
+    @_bound_method
+    def update(
         self,
         *,
-        field: CharField | TextField,
-        where: Expression,
-        updated: str | StringExpression | Function,
+        where: Expression | None = None,
+        data: dict[Field | str, Any],
     ) -> int:
-        """Executes an UPDATE query on a string field
+        """Executes an UPDATE query
 
         Args:
-            field: The `Field` to update
-            where: An `Expression` used in the WHERE clause
-            updated: The field's updated value, or a `peewee.Function` that defines the transform
+            data: A `dict` from fields of `Bookmark`, or their names, to new \
+            values
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
 
         Returns:
             Number of rows affected by the update
         """
 
-        return self.update(
-            where=where,
-            data={field: updated},
+        self._ensure_loaded()
+        data = {_bookmark_field(key): value for key, value in data.items()}
+        self._load_columns([
+            *_fields_in(list(data)), *_fields_in(list(data.values())),
+            *_fields_in(where)
+        ])
+
+        names = {field.name for field in data}
+        moves = self._materialize_paths and \
+            not names.isdisjoint(field.name for field in _PATH_FIELDS)
+        # Changing `id`s moves the rows out from under the ids taken here
+        ids = None
+        if moves and Bookmark.id.name not in names:
+            ids = [
+                id_ for (id_, ) in Bookmark \
+                    .select(Bookmark.id) \
+                    .where(where) \
+                    .tuples()
+            ]
+
+        rows = Bookmark.update(data).where(where).execute()
+
+        if moves and ids != []:
+            self._store_paths(ids)
+
+        return rows
+
+    @_bound_method
+    def delete(self, *, where: Expression) -> int:
+        """Executes a DELETE query, removing the rows under any folders deleted too
+
+        The rows left in the folders that lost rows are renumbered from 0, \
+        and those folders are marked as modified. `.commit` deletes the rows \
+        from the Places database and renumbers the same folders there, so \
+        `.diff` lists the deleted rows and their folders, but not the rows \
+        that only moved up.
+
+        Args:
+            where: An `Expression` used in the WHERE clause
+
+        Returns:
+            Number of rows deleted, including those under deleted folders
+        """
+
+        self._ensure_loaded()
+        self._load_columns([
+            *_fields_in(where),
+            Bookmark.position,
+            Bookmark.last_modified,
+            Bookmark.sync_change_counter,
+        ])
+
+        doomed = Bookmark \
+            .select(Bookmark.id) \
+            .where(where) \
+            .cte("doomed", recursive=True, columns=("id", ))
+        child = Bookmark.alias()
+        doomed = doomed.union(
+            child \
+                .select(child.id) \
+                .join(doomed, on=(child.parent == doomed.c.id))
         )
+        rows = Bookmark \
+            .select(Bookmark.id, Bookmark.parent, Bookmark.guid) \
+            .join(doomed, on=(Bookmark.id == doomed.c.id)) \
+            .with_cte(doomed) \
+            .tuples()
+
+        ids = set()
+        parents = set()
+        for id_, parent, guid in rows:
+            if guid in ROOT_GUIDS:
+                raise ValueError(f"Cannot delete the root folder {guid!r}")
+            ids.add(id_)
+            parents.add(parent)
+        parents -= ids
+        parents.discard(None)
+
+        now = int(time() * 1_000_000)
+        with self._database.atomic():
+            for chunk in chunked(ids, MAX_QUERY_PARAMETERS):
+                Bookmark.delete().where(Bookmark.id.in_(chunk)).execute()
+
+            for chunk in chunked(parents, MAX_QUERY_PARAMETERS):
+                with untracked(self._database):
+                    _renumber(Bookmark, chunk)
+                Bookmark \
+                    .update(
+                        last_modified=now,
+                        sync_change_counter=Bookmark.sync_change_counter + 1,
+                    ) \
+                    .where(Bookmark.id.in_(chunk)) \
+                    .execute()
 
-    def num_update(
+        return len(ids)
+
+    @_bound_method
+    def insert_many(
         self,
+        rows: Iterable[dict[Field | str, Any]],
         *,
-        field: IntegerField | FloatField,
-        where: Expression,
-        updated: int | float | Expression,
+        parent: Bookmark | int,
     ) -> int:
-        """Executes an UPDATE query on a numerical field
+        """Adds bookmarks, folders or separators to the end of a folder, to be created in the Places database on commit
 
         Args:
-            field: The `Field` to update
-            where: An `Expression` used in the WHERE clause
-            updated: The field's updated value
+            rows: Iterable of `dict`s from fields of `Bookmark` (or their \
+            names) to values. Only `title`, `url`, `type`, `date_added`, \
+            `last_modified` and `guid` can be given. `type` defaults to a \
+            bookmark if there is a `url`, and to a folder otherwise. The \
+            rest are filled in.
+            parent: The folder (or folder `id`) to add them to
 
         Returns:
-            Number of rows affected by the update
+            Number of rows added
         """
 
-        return self.update(
-            where=where,
-            data={field: updated},
-        )
+        return self._stage(((0, _inserted(row)) for row in rows),
+                           parent=parent)
 
-    def diff(self) -> list[str]:
-        """Generates diff between current state of our duplicate database, and the chosen Places database
+    @_bound_method
+    def import_html(self, path: str, *, parent: Bookmark | int) -> int:
+        """Adds the bookmarks, folders and separators of a Netscape bookmark file to a folder, to be created on commit
+
+        Args:
+            path: Path of the file, as exported by a browser. Decompressed \
+            with gzip if it ends in `.gz`.
+            parent: The folder (or folder `id`) to add them to
 
         Returns:
-            List of `guid`s, representing the bookmarks that have changed
+            Number of rows added
         """
 
-        bookmarks = list(
-            FirefoxBookmark \
-                .select(FirefoxBookmark.guid, FirefoxBookmark.fk) \
-                .execute()
-        )
-        differing_bookmarks = []
-
-        for bk in bookmarks:
-            original_bk = FirefoxBookmark \
-                .select(*self._TRANSLATION["SEPARATE"]["moz_bookmarks"]["TO"]) \
-                .where(FirefoxBookmark.guid == bk.guid) \
-                .tuples() \
-                .first()
+        with open_text(path) as file:
+            return self._stage(read_html(file), parent=parent)
 
-            changed_bk = Bookmark \
-                .select(*self._TRANSLATION["SEPARATE"]["moz_bookmarks"]["FROM"]) \
-                .where(Bookmark.guid == bk.guid) \
-                .tuples() \
-                .first()
+    @_bound_method
+    def import_json(self, path: str, *, parent: Bookmark | int) -> int:
+        """Adds the bookmarks, folders and separators of a bookmark backup in Firefox's JSON format to a folder, to be created on commit
 
-            original_pl = FirefoxPlace \
-                .select(*self._TRANSLATION["SEPARATE"]["moz_places"]["TO"]) \
-                .where(FirefoxPlace.id == bk.fk) \
-                .tuples() \
-                .first()
+        Args:
+            path: Path of the file. Decompressed with gzip if it ends in \
+            `.gz`.
+            parent: The folder (or folder `id`) to add them to
 
-            changed_pl = Bookmark \
-                .select(*self._TRANSLATION["SEPARATE"]["moz_places"]["FROM"]) \
-                .where(Bookmark.guid == bk.guid) \
-                .tuples() \
-                .first()
+        Returns:
+            Number of rows added
+        """
 
-            if original_bk != changed_bk or original_pl != changed_pl:
-                differing_bookmarks.append(bk.guid)
+        with open_text(path) as file:
+            return self._stage(read_json(file), parent=parent)
 
-        return differing_bookmarks
+    def _stage(
+        self,
+        rows: Iterable[ImportedRow],
+        *,
+        parent: Bookmark | int,
+    ) -> int:
+        """Inserts new rows under a folder into our duplicate database, with the `id`s, positions and keys that `commit` creates them with
 
-    def commit(self):
-        """Commits the updated bookmarks from our duplicate database to the Places database"""
+        Args:
+            rows: Pairs of depth below `parent`, parents before children, \
+            and a `dict` of field names to values
+            parent: The folder (or folder `id`) to add them to
 
-        self._back_up_places()
+        Returns:
+            Number of rows added
+        """
 
-        diff_guids = self.diff()
+        self._ensure_loaded()
+
+        parent_id = _id_of(parent)
+        if Bookmark.get_or_none(Bookmark.id == parent_id,
+                                Bookmark.type == FOLDER_TYPE) is None:
+            raise ValueError(f"No folder with id {parent_id}")
+
+        # `id`s follow both databases, so that `commit` can usually keep them
+        next_id = Bookmark.select(fn.MAX(Bookmark.id)).scalar() or 0
+        if self._snapshot is None:
+            next_id = max(
+                next_id,
+                FirefoxBookmark.select(fn.MAX(FirefoxBookmark.id)).scalar()
+                or 0,
+            )
+        next_id += 1
+        now = int(time() * 1_000_000)
+        # `id` and next position of the folder open at each depth
+        folders = [[parent_id, self._next_position(parent_id)]]
+
+        def staged() -> Iterator[tuple]:
+            nonlocal next_id
+
+            for depth, row in rows:
+                del folders[min(depth, len(folders) - 1) + 1:]
+                folder = folders[-1]
+                url = row.get("url")
+                prefix, host = split_origin(url) if url else (None, None)
+
+                yield (
+                    next_id,
+                    folder[0],
+                    folder[1],
+                    row["type"],
+                    row.get("title"),
+                    url,
+                    row.get("date_added") or now,
+                    row.get("last_modified") or row.get("date_added") or now,
+                    row.get("guid") or make_guid(),
+                    hash_url(url) if url else None,
+                    reverse_host(url) if url else None,
+                    prefix,
+                    host,
+                    SYNC_STATUS_NEW,
+                    1,
+                )
+
+                folder[1] += 1
+                if row["type"] == FOLDER_TYPE:
+                    folders.append([next_id, 0])
+                next_id += 1
+
+        count = 0
+        with self._database.atomic():
+            cursor = self._database.cursor()
+            for batch in chunked(staged(), BATCH_SIZE):
+                cursor.executemany(_insert_statement(_STAGED_FIELDS), batch)
+                count += len(batch)
 
-        with self._places_database.atomic():
-            for guid in diff_guids:
-                # region moz_bookmarks
-                source_tuple_bk = Bookmark \
-                    .select(*self._TRANSLATION["SEPARATE"]["moz_bookmarks"]["FROM"]) \
-                    .where(Bookmark.guid == guid) \
-                    .tuples() \
-                    .first()
-
-                source_dict_bk = {
-                    field: value
-                    for field, value in zip(
-                        self._TRANSLATION["SEPARATE"]["moz_bookmarks"]["TO"],
-                        source_tuple_bk,
-                    )
-                }
+            if self._materialize_paths:
+                self._store_paths()
 
-                FirefoxBookmark \
-                    .update(source_dict_bk) \
-                    .where(FirefoxBookmark.guid == guid) \
-                    .execute()
-                # endregion
-
-                # region moz_places
-                place_guid = Bookmark \
-                    .select(Bookmark.place_guid) \
-                    .where(Bookmark.guid == guid) \
-                    .scalar()
-
-                if place_guid is not None:
-                    source_tuple_pl = Bookmark \
-                        .select(*self._TRANSLATION["SEPARATE"]["moz_places"]["FROM"]) \
-                        .where(Bookmark.place_guid == place_guid) \
-                        .tuples() \
-                        .first()
-
-                    source_dict_pl = {
-                        field: value
-                        for field, value in zip(
-                            self._TRANSLATION["SEPARATE"]["moz_places"]["TO"],
-                            source_tuple_pl,
-                        )
-                    }
+        return count
 
-                    FirefoxPlace \
-                        .update(source_dict_pl) \
-                        .where(FirefoxPlace.guid == place_guid) \
-                        .execute()
-                # endregion
+    def _next_position(self, folder_id: int) -> int:
+        last = Bookmark \
+            .select(fn.MAX(Bookmark.position)) \
+            .where(Bookmark.parent == folder_id) \
+            .scalar()
 
-    def _back_up_places(self):
-        file_name = f"backup-{int(time())}.sqlite"
-        dest = os.path.join(os.path.dirname(self._places_path), file_name)
-        shutil.copy(self._places_path, dest)
+        return 0 if last is None else last + 1
+
+    def iter_bookmarks(
+        self,
+        *,
+        fields: Iterable[Field] = [],
+        where: Expression | None = None,
+        under: Bookmark | int | None = None,
+        with_paths: bool = False,
+        rows: RowType | str = RowType.MODEL,
+        fetch_size: int = FETCH_SIZE,
+    ) -> Iterator:
+        """Executes a SELECT query over only the rows representing bookmarks, and streams its rows
+
+        Args:
+            fields: Iterable of fields to select. Defaults to all.
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            under: If supplied, only bookmarks anywhere under this folder \
+            (or folder `id`) are selected. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query. Defaults to `False`.
+            rows: Form of each row, see `iter_select`. Defaults to \
+            `RowType.MODEL`.
+            fetch_size: Number of rows to fetch from the database at a \
+            time. Defaults to `FETCH_SIZE`.
+
+        Returns:
+            Iterator over the bookmarks matching the SELECT query
+        """
+
+        final_where: Expression = (Bookmark.type == BOOKMARK_TYPE)
+        if where is not None:
+            final_where &= where
+
+        return self.iter_select(
+            fields=fields,
+            where=final_where,
+            under=under,
+            with_paths=with_paths,
+            rows=rows,
+            fetch_size=fetch_size,
+        )
+
+    @_bound_method
+    def bookmarks(
+        self,
+        *,
+        fields: Iterable[Field] = [],
+        where: Expression | None = None,
+        under: Bookmark | int | None = None,
+        with_paths: bool = False,
+        lightweight: bool = False,
+    ) -> Iterable[Bookmark] | list[BookmarkRecord]:
+        """Executes a SELECT query over only the rows representing bookmarks
+
+        Args:
+            fields: Iterable of fields to select. Defaults to all.
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            under: If supplied, only bookmarks anywhere under this folder \
+            (or folder `id`) are selected. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query. Defaults to `False`.
+            lightweight: If `True`, returns a list of read-only \
+            `BookmarkRecord`s, which take much less memory and time to \
+            build than `Bookmark`s. Defaults to `False`.
+
+        Returns:
+            Iterable of bookmarks matching the SELECT query
+        """
+
+        final_where: Expression = (Bookmark.type == BOOKMARK_TYPE)
+        if where is not None:
+            final_where &= where
+
+        selected = self._select(
+            fields=fields,
+            where=final_where,
+            under=under,
+            with_paths=with_paths,
+            lightweight=lightweight,
+        )
+
+        return self._execute(selected, lightweight=lightweight)
+
+    def iter_folders(
+        self,
+        *,
+        fields: Iterable[Field] = [],
+        where: Expression | None = None,
+        under: Bookmark | int | None = None,
+        with_paths: bool = False,
+        rows: RowType | str = RowType.MODEL,
+        fetch_size: int = FETCH_SIZE,
+    ) -> Iterator:
+        """Executes a SELECT query over only the rows representing folders, and streams its rows
+
+        Args:
+            fields: Iterable of fields to select. Defaults to all.
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            under: If supplied, only folders anywhere under this folder \
+            (or folder `id`) are selected. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query. Defaults to `False`.
+            rows: Form of each row, see `iter_select`. Defaults to \
+            `RowType.MODEL`.
+            fetch_size: Number of rows to fetch from the database at a \
+            time. Defaults to `FETCH_SIZE`.
+
+        Returns:
+            Iterator over the folders matching the SELECT query
+        """
+
+        final_where: Expression = (Bookmark.type == FOLDER_TYPE)
+        if where is not None:
+            final_where &= where
+
+        return self.iter_select(
+            fields=fields,
+            where=final_where,
+            under=under,
+            with_paths=with_paths,
+            rows=rows,
+            fetch_size=fetch_size,
+        )
+
+    @_bound_method
+    def folders(
+        self,
+        *,
+        fields: Iterable[Field] = [],
+        where: Expression | None = None,
+        under: Bookmark | int | None = None,
+        with_paths: bool = False,
+        lightweight: bool = False,
+    ) -> Iterable[Bookmark] | list[BookmarkRecord]:
+        """Executes a SELECT query over only the rows representing folders
+
+        Args:
+            fields: Iterable of fields to select. Defaults to all.
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            under: If supplied, only folders anywhere under this folder \
+            (or folder `id`) are selected. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query. Defaults to `False`.
+            lightweight: If `True`, returns a list of read-only \
+            `BookmarkRecord`s, which take much less memory and time to \
+            build than `Bookmark`s. Defaults to `False`.
+
+        Returns:
+            Iterable of folders matching the SELECT query
+        """
+
+        final_where: Expression = (Bookmark.type == FOLDER_TYPE)
+        if where is not None:
+            final_where &= where
+
+        selected = self._select(
+            fields=fields,
+            where=final_where,
+            under=under,
+            with_paths=with_paths,
+            lightweight=lightweight,
+        )
+
+        return self._execute(selected, lightweight=lightweight)
+
+    @_bound_method
+    def paths(self, *, where: Expression | None = None) -> dict[int, str]:
+        """Computes the paths of many bookmarks and folders at once, with a single recursive query
+
+        Args:
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+
+        Returns:
+            `dict` from the `id` of each bookmark and folder matching the \
+            WHERE clause to its path, as given by `Bookmark.path`
+        """
+
+        self._ensure_loaded()
+        self._load_columns([*_PATH_FIELDS, *_fields_in(where)])
+
+        paths = bookmark_paths()
+        selected = Bookmark \
+            .select(Bookmark.id, paths.c.path) \
+            .join(paths, on=(paths.c.id == Bookmark.id)) \
+            .with_cte(paths)
+
+        if where is not None:
+            selected = selected.where(where)
+
+        return dict(selected.tuples())
+
+    @_bound_method
+    def export(
+        self,
+        output_path: str,
+        *,
+        output_format: ExportFormat | str | None = None,
+        compress: bool | None = None,
+    ) -> ExportReport:
+        """Writes all bookmarks and folders to a file, streaming them in the order of the bookmark tree
+
+        Args:
+            output_path: Where to write the bookmarks. Overwritten if it \
+            exists.
+            output_format: `ExportFormat.HTML` (or `"html"`) writes a \
+            Netscape bookmark file, `"json"` the format of Firefox's \
+            bookmark backups, and `"csv"` a row per bookmark, folder and \
+            separator. Defaults to the format named by the extension of \
+            `output_path`, ignoring any `.gz`.
+            compress: If `True`, the file is compressed with gzip as it is \
+            written. Defaults to whether `output_path` ends in `.gz`.
+
+        Returns:
+            Format and number of rows written, and the time it took
+        """
+
+        self._ensure_loaded()
+        self._load_columns(EXPORT_FIELDS)
+
+        return export_bookmarks(
+            output_path,
+            output_format=output_format,
+            compress=compress,
+        )
+
+    def _store_paths(self, ids: list[int] | None = None):
+        """Stores the path of every row, or of the rows under and including `ids`, in its `materialized_path` column"""
+
+        if ids is None or len(ids) > MAX_QUERY_PARAMETERS:
+            ctes = [bookmark_paths()]
+        else:
+            ctes = subtree_paths(ids)
+
+        paths = ctes[-1]
+        Bookmark \
+            .update(materialized_path=paths.c.path) \
+            .from_(paths) \
+            .where(paths.c.id == Bookmark.id) \
+            .with_cte(*ctes) \
+            .execute()
+
+    def str_update(
+        self,
+        *,
+        field: CharField | TextField,
+        where: Expression,
+        updated: str | StringExpression | Function,
+    ) -> int:
+        """Executes an UPDATE query on a string field
+
+        Args:
+            field: The `Field` to update
+            where: An `Expression` used in the WHERE clause
+            updated: The field's updated value, or a `peewee.Function` that defines the transform
+
+        Returns:
+            Number of rows affected by the update
+        """
+
+        return self.update(
+            where=where,
+            data={field: updated},
+        )
+
+    def num_update(
+        self,
+        *,
+        field: IntegerField | FloatField,
+        where: Expression,
+        updated: int | float | Expression,
+    ) -> int:
+        """Executes an UPDATE query on a numerical field
+
+        Args:
+            field: The `Field` to update
+            where: An `Expression` used in the WHERE clause
+            updated: The field's updated value
+
+        Returns:
+            Number of rows affected by the update
+        """
+
+        return self.update(
+            where=where,
+            data={field: updated},
+        )
+
+    @_bound_method
+    def diff(self) -> list[str]:
+        """Generates diff between current state of our duplicate database, and the chosen Places database
+
+        Returns:
+            List of `guid`s, representing the bookmarks that have changed, \
+            or that are yet to be created, followed by those that are yet to \
+            be deleted
+        """
+
+        if self._pending_engine is not None:
+            # Nothing can have changed before the load
+            return []
+
+        if self._snapshot is not None:
+            # There is no Places database to compare with
+            changed = Bookmark \
+                .select(Bookmark.guid) \
+                .where(Bookmark.id.in_(self._uncommitted_ids())) \
+                .order_by(Bookmark.id) \
+                .tuples()
+            return [guid for (guid, ) in changed] + self._deleted_guids()
+
+        if not self._attached:
+            return self._diff_unattached() + self._deleted_guids()
+
+        # Only rows changed since the last commit can differ
+        pairs = (*self._separate_pairs("moz_bookmarks"),
+                 *self._separate_pairs("moz_places"))
+
+        # Like the loading query, this resolves `moz_*` to the attached schema
+        differing = Bookmark \
+            .select(Bookmark.guid) \
+            .join(
+                FirefoxBookmark,
+                on=(FirefoxBookmark.guid == Bookmark.guid),
+                join_type=JOIN.LEFT_OUTER,
+            ) \
+            .join(
+                FirefoxPlace,
+                on=(FirefoxBookmark.fk == FirefoxPlace.id),
+                join_type=JOIN.LEFT_OUTER,
+            ) \
+            .where(Bookmark.id.in_(self._uncommitted_ids())) \
+            .where(FirefoxBookmark.id.is_null() | reduce(operator.or_, (
+                Expression(changed, OP.IS_NOT, original)
+                for changed, original in pairs
+            ))) \
+            .order_by(Bookmark.id) \
+            .tuples()
+
+        return [guid for (guid, ) in differing] + self._deleted_guids()
+
+    def _diff_unattached(self) -> list[str]:
+        """Generates the same diff as `diff`, by comparing both databases in Python"""
+
+        bk = self._loaded_translation("SEPARATE", "moz_bookmarks")
+        pl = self._loaded_translation("SEPARATE", "moz_places")
+
+        changed = list(
+            Bookmark \
+                .select(Bookmark.guid, *bk["FROM"], *pl["FROM"]) \
+                .where(Bookmark.id.in_(self._uncommitted_ids())) \
+                .order_by(Bookmark.id) \
+                .tuples()
+        )
+
+        original_by_guid = {}
+        for rows in chunked(changed, MAX_QUERY_PARAMETERS):
+            originals = FirefoxBookmark \
+                .select(FirefoxBookmark.guid, *bk["TO"], *pl["TO"]) \
+                .join(
+                    FirefoxPlace,
+                    on=(FirefoxBookmark.fk == FirefoxPlace.id),
+                    join_type=JOIN.LEFT_OUTER,
+                ) \
+                .where(FirefoxBookmark.guid.in_([row[0] for row in rows])) \
+                .tuples()
+            original_by_guid.update((row[0], row[1:]) for row in originals)
+
+        return [
+            row[0] for row in changed if row[0] not in original_by_guid
+            or original_by_guid[row[0]] != row[1:]
+        ]
+
+    def _deleted_guids(self) -> list[str]:
+        """Lists the `guid`s of rows deleted since the last commit that are still in the Places database"""
+
+        logged = BookmarkChange \
+            .select(BookmarkChange.guid) \
+            .where(BookmarkChange.seq > self._committed) \
+            .where(BookmarkChange.operation == "DELETE") \
+            .where(BookmarkChange.guid.is_null(False)) \
+            .order_by(BookmarkChange.guid) \
+            .distinct()
+        guids = [guid for (guid, ) in logged.tuples()]
+
+        # Leave out rows added again with the same `guid`, and, unless there
+        # is no Places database, rows that never made it there
+        kept = set()
+        for chunk in chunked(guids, MAX_QUERY_PARAMETERS):
+            kept.update(guid for (guid, ) in Bookmark \
+                .select(Bookmark.guid) \
+                .where(Bookmark.guid.in_(chunk)) \
+                .tuples())
+        guids = [guid for guid in guids if guid not in kept]
+
+        if self._snapshot is not None:
+            return guids
+
+        found = set()
+        for chunk in chunked(guids, MAX_QUERY_PARAMETERS):
+            found.update(guid for (guid, ) in FirefoxBookmark \
+                .select(FirefoxBookmark.guid) \
+                .where(FirefoxBookmark.guid.in_(chunk)) \
+                .tuples())
+
+        return [guid for guid in guids if guid in found]
+
+    def _uncommitted_ids(self) -> ModelSelect:
+        """Selects the ids of rows changed since the last commit"""
+
+        return BookmarkChange \
+            .select(BookmarkChange.bookmark_id) \
+            .where(BookmarkChange.seq > self._committed)
+
+    @_bound_method
+    def checkpoint(self) -> int:
+        """Marks the current state of our duplicate database, to later find what changed since
+
+        Returns:
+            A checkpoint, to be passed to `changed_since`
+        """
+
+        return BookmarkChange.select(fn.MAX(BookmarkChange.seq)).scalar() or 0
+
+    @_bound_method
+    def changed_since(self, checkpoint: int = 0) -> Iterable[BookmarkChange]:
+        """Lists the changes made to our duplicate database after a checkpoint
+
+        Args:
+            checkpoint: A checkpoint returned by `checkpoint`. Defaults to \
+            0, which lists every change made since connecting.
+
+        Returns:
+            Iterable of changes, in the order they were made. Each holds the \
+            `bookmark_id` and `guid` of the row, the `operation` and, for \
+            updates that change `title` or `url`, their names in `column`, \
+            separated by commas.
+        """
+
+        return BookmarkChange \
+            .select() \
+            .where(BookmarkChange.seq > checkpoint) \
+            .order_by(BookmarkChange.seq) \
+            .execute()
+
+    def _separate_pairs(self, table: str) -> Iterable[tuple[Field, Field]]:
+        """Pairs each `Bookmark` field with the field of `table` that it is written to"""
+
+        translation = self._loaded_translation("SEPARATE", table)
+
+        return zip(translation["FROM"], translation["TO"])
+
+    @_bound_method
+    def commit(self) -> CommitReport:
+        """Commits the updated bookmarks from our duplicate database to the Places database
+
+        Returns:
+            Number of bookmarks and places written, and the time it took
+        """
+
+        start = perf_counter()
+
+        if self._readonly:
+            warnings.warn(
+                "Connected in read-only mode, so nothing was committed.")
+            return CommitReport(
+                bookmarks=0,
+                places=0,
+                seconds=perf_counter() - start,
+            )
+        if self._pending_engine is not None:
+            # Nothing can have changed before the load, so skip the backup too
+            return CommitReport(
+                bookmarks=0,
+                places=0,
+                seconds=perf_counter() - start,
+            )
+
+        committed = self.checkpoint()
+        diff_guids = self.diff()
+
+        self._back_up_places(rows_changed=len(diff_guids))
+        deleted_guids = set(self._deleted_guids())
+        new_guids = self._new_guids(diff_guids) - deleted_guids
+        if new_guids:
+            self._make_room(new_guids)
+        bookmark_rows: list[tuple] = []
+        place_rows: dict[str, tuple] = {}
+
+        changed_guids = [
+            guid for guid in diff_guids
+            if guid not in new_guids and guid not in deleted_guids
+        ]
+        for guids in chunked(changed_guids, MAX_QUERY_PARAMETERS):
+            changed = Bookmark \
+                .select(
+                    *self._loaded_translation("SEPARATE", "moz_bookmarks")["FROM"],
+                    Bookmark.guid,
+                ) \
+                .where(Bookmark.guid.in_(guids)) \
+                .tuples()
+            bookmark_rows.extend(changed)
+
+            # Bookmarks of the same URL share a place, which is written once
+            changed = Bookmark \
+                .select(
+                    *self._loaded_translation("SEPARATE", "moz_places")["FROM"],
+                    Bookmark.place_guid,
+                ) \
+                .where(Bookmark.guid.in_(guids)) \
+                .where(Bookmark.place_guid.is_null(False)) \
+                .tuples()
+            place_rows.update((row[-1], row) for row in changed)
+
+        with self._places_database.atomic():
+            deleted = self._delete_old(deleted_guids)
+            cursor = self._places_database.cursor()
+            cursor.executemany(
+                self._update_statement("moz_bookmarks"),
+                bookmark_rows,
+            )
+            cursor.executemany(
+                self._update_statement("moz_places"),
+                place_rows.values(),
+            )
+            inserted, created = self._insert_new(new_guids)
+
+        if new_guids:
+            self._copy_back(new_guids)
+        self._committed = committed
+
+        return CommitReport(
+            bookmarks=len(bookmark_rows) + inserted + deleted,
+            places=len(place_rows) + created,
+            seconds=perf_counter() - start,
+            inserted=inserted,
+            deleted=deleted,
+        )
+
+    def _new_guids(self, guids: list[str]) -> set[str]:
+        """Picks the `guid`s that are yet to be created in the Places database"""
+
+        existing = set()
+        for chunk in chunked(guids, MAX_QUERY_PARAMETERS):
+            found = FirefoxBookmark \
+                .select(FirefoxBookmark.guid) \
+                .where(FirefoxBookmark.guid.in_(chunk)) \
+                .tuples()
+            existing.update(guid for (guid, ) in found)
+
+        return set(guids) - existing
+
+    def _make_room(self, new_guids: set[str]):
+        """Moves new rows to `id`s above any in either database, if the Places database took some of theirs since they were added"""
+
+        ids = []
+        for chunk in chunked(new_guids, MAX_QUERY_PARAMETERS):
+            ids.extend(id_ for (id_, ) in Bookmark \
+                .select(Bookmark.id) \
+                .where(Bookmark.guid.in_(chunk)) \
+                .tuples())
+
+        taken = any(FirefoxBookmark.select().where(
+            FirefoxBookmark.id.in_(chunk)).exists()
+                    for chunk in chunked(ids, MAX_QUERY_PARAMETERS))
+        if not taken:
+            return
+
+        # Every new `id` is above every old one, so none collide on the way
+        offset = max(
+            Bookmark.select(fn.MAX(Bookmark.id)).scalar(),
+            FirefoxBookmark.select(fn.MAX(FirefoxBookmark.id)).scalar() or 0,
+        ) + 1 - min(ids)
+
+        with self._database.atomic(), untracked(self._database), \
+                self._rebuilding_indexes():
+            for chunk in chunked(ids, MAX_QUERY_PARAMETERS):
+                Bookmark \
+                    .update(parent=Bookmark.parent + offset) \
+                    .where(Bookmark.parent.in_(chunk)) \
+                    .execute()
+            for chunk in chunked(ids, MAX_QUERY_PARAMETERS):
+                Bookmark \
+                    .update(id=Bookmark.id + offset) \
+                    .where(Bookmark.id.in_(chunk)) \
+                    .execute()
+
+            if self._materialize_paths:
+                self._store_paths()
+
+    def _insert_new(self, new_guids: set[str]) -> tuple[int, int]:
+        """Creates new rows in the Places database, along with the places and origins of their URLs
+
+        Returns:
+            Number of bookmarks and places created
+        """
+
+        inserted = created = 0
+
+        for chunk in chunked(new_guids, MAX_QUERY_PARAMETERS):
+            rows = list(
+                Bookmark \
+                    .select(*_STAGED_FIELDS) \
+                    .where(Bookmark.guid.in_(chunk)) \
+                    .namedtuples()
+            )
+
+            urls = {row.url: row for row in rows if row.url is not None}
+            place_ids = self._place_ids(urls.values())
+            created += len(urls) - len(place_ids)
+            place_ids.update(
+                self._create_places(row for url, row in urls.items()
+                                    if url not in place_ids))
+
+            self._places_database.cursor().executemany(
+                _insert_statement([
+                    FirefoxBookmark.id,
+                    FirefoxBookmark.type,
+                    FirefoxBookmark.fk,
+                    FirefoxBookmark.parent,
+                    FirefoxBookmark.position,
+                    FirefoxBookmark.title,
+                    FirefoxBookmark.date_added,
+                    FirefoxBookmark.last_modified,
+                    FirefoxBookmark.guid,
+                    FirefoxBookmark.sync_status,
+                    FirefoxBookmark.sync_change_counter,
+                ]),
+                ((
+                    row.id,
+                    row.type,
+                    place_ids.get(row.url),
+                    row.parent,
+                    row.position,
+                    row.title,
+                    row.date_added,
+                    row.last_modified,
+                    row.guid,
+                    row.sync_status,
+                    row.sync_change_counter,
+                ) for row in rows),
+            )
+            inserted += len(rows)
+
+            self._adjust_foreign_counts(
+                Counter(place_ids[row.url] for row in rows
+                        if row.url is not None))
+
+        return inserted, created
+
+    def _delete_old(self, guids: Iterable[str]) -> int:
+        """Deletes rows from the Places database, leaving tombstones for those that Sync knows of
+
+        Returns:
+            Number of bookmarks deleted
+        """
+
+        now = int(time() * 1_000_000)
+        deleted = 0
+        lost: Counter[int] = Counter()
+        ids: set[int] = set()
+        parents: set[int] = set()
+
+        for chunk in chunked(guids, MAX_QUERY_PARAMETERS):
+            rows = list(
+                FirefoxBookmark \
+                    .select(
+                        FirefoxBookmark.id,
+                        FirefoxBookmark.fk,
+                        FirefoxBookmark.guid,
+                        FirefoxBookmark.sync_status,
+                        FirefoxBookmark.parent,
+                    ) \
+                    .where(FirefoxBookmark.guid.in_(chunk)) \
+                    .tuples()
+            )
+            FirefoxBookmark \
+                .delete() \
+                .where(FirefoxBookmark.id.in_([row[0] for row in rows])) \
+                .execute()
+            deleted += len(rows)
+            lost.update(row[1] for row in rows if row[1] is not None)
+            ids.update(row[0] for row in rows)
+            parents.update(row[4] for row in rows)
+
+            # Like Firefox, only rows that were synced need Sync to delete
+            # them elsewhere
+            tombstones = [(row[2], now) for row in rows
+                          if row[3] == SYNC_STATUS_NORMAL]
+            for batch in chunked(tombstones, BATCH_SIZE):
+                FirefoxDeletedBookmark \
+                    .insert_many(
+                        batch,
+                        fields=[
+                            FirefoxDeletedBookmark.guid,
+                            FirefoxDeletedBookmark.date_removed,
+                        ],
+                    ) \
+                    .on_conflict_replace() \
+                    .execute()
+
+        # As `delete` did to our duplicate database, which left the rows that
+        # only moved out of the diff
+        for chunk in chunked(parents - ids, MAX_QUERY_PARAMETERS):
+            _renumber(FirefoxBookmark, chunk)
+
+        self._adjust_foreign_counts({
+            place_id: -count
+            for place_id, count in lost.items()
+        })
+
+        return deleted
+
+    def _adjust_foreign_counts(self, changes: dict[int, int]):
+        """Adds to the `foreign_count` of places, with one UPDATE per batch of places that change by the same amount
+
+        Firefox keeps `foreign_count` up to date with triggers of its own, \
+        which are not part of the database.
+
+        Args:
+            changes: `dict` from place `id` to the number of bookmarks it \
+            gained, or lost if negative
+        """
+
+        by_change: dict[int, list[int]] = {}
+        for place_id, change in changes.items():
+            by_change.setdefault(change, []).append(place_id)
+
+        for change, place_ids in by_change.items():
+            for ids in chunked(place_ids, MAX_QUERY_PARAMETERS):
+                FirefoxPlace \
+                    .update(foreign_count=fn.MAX(
+                        FirefoxPlace.foreign_count + change, 0)) \
+                    .where(FirefoxPlace.id.in_(ids)) \
+                    .execute()
+
+    def _place_ids(self, rows: Iterable[Any]) -> dict[str, int]:
+        """Looks up the places of the URLs of some staged rows, by `url_hash` and then by URL
+
+        URLs not found by hash are looked for again by URL alone, so that \
+        places with a wrong `url_hash` are not duplicated.
+        """
+
+        rows = list(rows)
+        place_ids = {}
+
+        for batch in chunked(rows, MAX_QUERY_PARAMETERS):
+            urls = {row.url for row in batch}
+            found = FirefoxPlace \
+                .select(FirefoxPlace.url, FirefoxPlace.id) \
+                .where(FirefoxPlace.url_hash.in_(
+                    {row.url_hash for row in batch})) \
+                .tuples()
+            place_ids.update(
+                (url, place_id) for url, place_id in found if url in urls)
+
+            missing = urls - place_ids.keys()
+            if missing:
+                place_ids.update(
+                    FirefoxPlace \
+                        .select(FirefoxPlace.url, FirefoxPlace.id) \
+                        .where(FirefoxPlace.url.in_(missing)) \
+                        .tuples())
+
+        return place_ids
+
+    def _create_places(self, rows: Iterable[Any]) -> dict[str, int]:
+        """Creates the places of the URLs of some staged rows, and any origins they need
+
+        Returns:
+            `dict` from each URL to the `id` of its new place
+        """
+
+        place_ids = {}
+
+        for batch in chunked(rows, BATCH_SIZE):
+            origins = {(row.origin_prefix, row.origin_host) for row in batch}
+            FirefoxOrigin \
+                .insert_many(
+                    [(prefix, host, 0, 1) for prefix, host in origins],
+                    fields=[
+                        FirefoxOrigin.prefix,
+                        FirefoxOrigin.host,
+                        FirefoxOrigin.frecency,
+                        FirefoxOrigin.recalc_frecency,
+                    ],
+                ) \
+                .on_conflict_ignore() \
+                .execute()
+            origin_ids = {
+                (prefix, host): origin_id
+                for prefix, host, origin_id in FirefoxOrigin \
+                    .select(
+                        FirefoxOrigin.prefix,
+                        FirefoxOrigin.host,
+                        FirefoxOrigin.id,
+                    ) \
+                    .where(FirefoxOrigin.host.in_(
+                        {host for _, host in origins})) \
+                    .tuples()
+            }
+
+            guids = {row.url: make_guid() for row in batch}
+            self._places_database.cursor().executemany(
+                _insert_statement([
+                    FirefoxPlace.url,
+                    FirefoxPlace.rev_host,
+                    FirefoxPlace.guid,
+                    FirefoxPlace.url_hash,
+                    FirefoxPlace.origin,
+                    FirefoxPlace.recalc_frecency,
+                    FirefoxPlace.recalc_alt_frecency,
+                ]),
+                ((
+                    row.url,
+                    row.rev_host,
+                    guids[row.url],
+                    row.url_hash,
+                    origin_ids.get((row.origin_prefix, row.origin_host)),
+                    1,
+                    1,
+                ) for row in batch),
+            )
+            place_ids.update(
+                FirefoxPlace \
+                    .select(FirefoxPlace.url, FirefoxPlace.id) \
+                    .where(FirefoxPlace.guid.in_(list(guids.values()))) \
+                    .tuples())
+
+        return place_ids
+
+    def _copy_back(self, new_guids: set[str]):
+        """Copies newly created rows back from the Places database, with the places they were given"""
+
+        with self._database.atomic(), untracked(self._database):
+            for chunk in chunked(new_guids, MAX_QUERY_PARAMETERS):
+                created = self._combined_query() \
+                    .where(FirefoxBookmark.guid.in_(chunk)) \
+                    .tuples()
+                self._upsert(created)
+
+    def _upsert(self, rows: Iterable[tuple]):
+        """Writes rows of `_combined_query` over the same rows of our duplicate database"""
+
+        self._database.cursor().executemany(
+            _insert_statement(
+                self._loaded_translation("COMBINE")["TO"],
+                upsert=True,
+            ),
+            rows,
+        )
+
+    def _update_statement(self, table: str) -> str:
+        """Builds an UPDATE statement for `table`, with a parameter for each translated column and then one for `guid`"""
+
+        assignments = ", ".join(
+            f'"{field.column_name}" = ?'
+            for field in self._loaded_translation("SEPARATE", table)["TO"])
+
+        return f'UPDATE "{table}" SET {assignments} WHERE "guid" = ?'
+
+    def _back_up_places(self, *, rows_changed: int | None = None):
+        self._backup_store().add(
+            self._places_path,
+            rows_changed=rows_changed,
+            **self._copy_options,
+        )
+
+    def _backup_store(self) -> BackupStore:
+        # Opened on first use, so that read-only sessions leave the profile be
+        if self._backups is None:
+            self._backups = BackupStore(
+                os.path.join(
+                    os.path.dirname(self._places_path),
+                    BACKUP_DIR_NAME,
+                ),
+                **self._backup_options,
+            )
+            self._backups.import_legacy(
+                os.path.dirname(self._places_path),
+                **self._copy_options,
+            )
+
+        return self._backups
+
+    @_bound_method
+    def persist(self, path: str | None = None):
+        """Saves the duplicate database to a file, using the SQLite backup API
+
+        Args:
+            path: Where to save the duplicate database. Defaults to the \
+            `persist_to` path passed to the constructor.
+        """
+
+        path = path or self._persist_to
+        if path is None:
+            raise ValueError("No path given to persist the database to")
+
+        self._ensure_loaded()
+        with closing(sqlite3.connect(path)) as target:
+            self._database.connection().backup(target)
 
     def disconnect(self):
         """Disconnects from databases and removes the duplicate database"""
 
-        self._places_database.close()
+        if self._persist_to is not None:
+            self.persist()
+
+        if self._backups is not None:
+            self._backups.close()
+            self._backups = None
+        if self._snapshot is None:
+            close_places_db(self._places_database)
+        self._database.detach(PLACES_SCHEMA)
         self._database.close()
-        os.remove(self._db_path)
 
-    def restore_backup(self, *, index=0):
+        if self._storage == Storage.DISK:
+            os.remove(self._db_path)
+
+    def restore_backup(self, *, index=0, timestamp: int | None = None):
         """Finds the latest backup and copies it to the Places database
 
         Args:
             index: Index of backup to restore when sorted in a descending \
             order. Defaults to 0 (which refers to the latest backup).
+            timestamp: If supplied, restores the backup with this timestamp \
+            instead. Defaults to `None`.
         """
 
-        dir_path, timestamps = self._get_backups()
-        timestamps.sort(reverse=True)
-        backup_path = os.path.join(
-            dir_path,
-            f"backup-{timestamps[index]}.sqlite",
+        if timestamp is None:
+            timestamp = self._backup_store().nth_latest(index).timestamp
+
+        self._backup_store().restore(
+            timestamp,
+            self._places_path,
+            **self._copy_options,
         )
-        shutil.copy(backup_path, self._places_path)
-
-    def _get_backups(self) -> tuple[str, list[int]]:
-        dir_path = os.path.dirname(self._places_path)
-        files = os.listdir(dir_path)
-        timestamps = [
-            int(file.split('-')[1].split('.')[0]) for file in files
-            if file.startswith('backup-') and file.endswith('.sqlite')
+
+    def list_backups(self) -> list[Snapshot]:
+        """Lists the backups of the Places database, from latest to oldest
+
+        Returns:
+            List of catalogue entries, each with the `timestamp`, `size`, \
+            `checksum`, `source` and `rows_changed` of a backup
+        """
+
+        return self._backup_store().entries()
+
+    def get_backup(self, timestamp: int) -> Snapshot:
+        """Looks up a backup of the Places database by its timestamp
+
+        Args:
+            timestamp: Timestamp of the backup, in microseconds
+
+        Returns:
+            The backup's catalogue entry
+        """
+
+        return self._backup_store().get(timestamp)
+
+    def prune_backups(
+            self,
+            retention: RetentionPolicy = RetentionPolicy(),
+    ) -> list[int]:
+        """Removes the backups of the Places database that a retention policy does not keep
+
+        Args:
+            retention: Which backups to keep. Defaults to `RetentionPolicy()`.
+
+        Returns:
+            Timestamps of the removed backups
+        """
+
+        return self._backup_store().prune(retention)
+
+
+class MultiProfileBookmarks:
+    """Class that loads several Firefox profiles in parallel, and answers queries across all of them
+
+    Each profile gets a `FirefoxBookmarks` of its own. Every row returned is
+    a read-only `ProfileBookmarkRecord`, tagged with the profile it came from
+    as its `profile` attribute. Unlike `Bookmark`s, records hold no link to a
+    database, so they cannot be misread through another profile's database.
+
+    Example:
+        >>> from firefox_bookmarks import *
+        >>> mpb = MultiProfileBookmarks(storage="memory")
+
+        # Loads every profile under the default profiles directory.
+        >>> reports = mpb.connect(readonly=True)
+
+        >>> for bookmark in mpb.bookmarks(
+        ...     where=Bookmark.url.contains("mozilla.org"),
+        ... ):
+        ...     print(bookmark.profile, bookmark.url) # doctest: +SKIP
+
+        >>> mpb.disconnect()
+
+    Attributes:
+        connect: Duplicates the Places databases and connects to them
+        refresh: Copies over the changes made to the Places databases since connecting
+        disconnect: Disconnects and cleans up
+        profiles: The manager of each profile
+
+        select: Executes a SELECT query in every profile
+        bookmarks: Executes a SELECT query over the bookmarks of every profile
+        folders: Executes a SELECT query over the folders of every profile
+    """
+
+    def __init__(self, *, max_workers: int | None = None, **options):
+        """Initializes the manager, without connecting to any database
+
+        Args:
+            max_workers: Number of threads to load and query the profiles \
+            with. Defaults to the number of CPUs.
+            options: Keyword arguments passed to the `FirefoxBookmarks` of \
+            each profile.
+        """
+
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._options = options
+        self._profiles: dict[str, FirefoxBookmarks] = {}
+        self._workers: list[ThreadPoolExecutor] = []
+
+    @property
+    def profiles(self) -> dict[str, FirefoxBookmarks]:
+        """The manager of each profile, by profile directory"""
+
+        return dict(self._profiles)
+
+    def connect(
+        self,
+        *,
+        db_paths: Iterable[str] | None = None,
+        look_under_path: str | None = None,
+        readonly: bool = False,
+        immutable: bool = False,
+        engine: LoadEngine = LoadEngine.ATTACH,
+    ) -> dict[str, LoadReport]:
+        """Duplicates several Places databases in parallel, and connects to them
+
+        Args:
+            db_paths: Paths of the Places databases. If not supplied, all \
+            those found under `look_under_path` are used.
+            look_under_path: Path from where to start searching. \
+            If not supplied, looks under default profiles directory.
+            readonly: If `True`, the Places databases are opened in \
+            read-only mode. Defaults to `False`.
+            immutable: Read-only mode only. If `True`, tells SQLite that the \
+            Places databases cannot change. Defaults to `False`.
+            engine: How to copy the Places databases into the duplicate \
+            databases. Defaults to `LoadEngine.ATTACH`.
+
+        Returns:
+            Number of rows copied, and the time it took, by profile directory
+        """
+
+        if db_paths is None:
+            db_paths = locate_db_candidates(look_under_path=look_under_path)
+
+        paths = {os.path.dirname(db_path): db_path for db_path in db_paths}
+        self._profiles = {
+            profile: FirefoxBookmarks(**self._options)
+            for profile in paths
+        }
+        self._workers = [
+            ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="firefox-bookmarks",
+            ) for _ in range(min(self._max_workers, len(paths)))
         ]
 
-        return dir_path, timestamps
+        return self._map(lambda profile, fb: fb.connect(
+            db_path=paths[profile],
+            readonly=readonly,
+            immutable=immutable,
+            engine=engine,
+        ))
+
+    def _map(self, call: Callable[[str, FirefoxBookmarks],
+                                  _T]) -> dict[str, _T]:
+        """Calls a function with each profile's directory and manager, in parallel
+
+        Each profile is always handled by the same thread, because SQLite
+        connections are opened, and must be closed, per thread.
+        """
+
+        futures: dict[str, Future[_T]] = {
+            profile:
+            self._workers[index % len(self._workers)].submit(
+                call, profile, fb)
+            for index, (profile, fb) in enumerate(self._profiles.items())
+        }
+
+        return {
+            profile: future.result()
+            for profile, future in futures.items()
+        }
+
+    def refresh(self) -> dict[str, RefreshReport]:
+        """Copies over the changes made to every Places database since loading or the last refresh
+
+        Returns:
+            Number of rows copied and removed, and the time it took, by \
+            profile directory
+        """
+
+        return self._map(lambda profile, fb: fb.refresh())
+
+    def select(
+        self,
+        *,
+        fields: Iterable[Field] = [],
+        where: Expression | None = None,
+        with_paths: bool = False,
+    ) -> list[ProfileBookmarkRecord]:
+        """Executes a SELECT query in every profile
+
+        Args:
+            fields: Iterable of fields to select. Defaults to all.
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query, and read through `.path`. \
+            Defaults to `False`.
+
+        Returns:
+            List of records of the bookmarks and folders matching the \
+            SELECT query in any profile, each tagged with its `profile`
+        """
+
+        return self._gather(lambda fb: fb.select(
+            fields=fields,
+            where=where,
+            with_paths=with_paths,
+            lightweight=True,
+        ))
+
+    def bookmarks(
+        self,
+        *,
+        fields: Iterable[Field] = [],
+        where: Expression | None = None,
+        with_paths: bool = False,
+    ) -> list[ProfileBookmarkRecord]:
+        """Executes a SELECT query over only the rows representing bookmarks, in every profile
+
+        Args:
+            fields: Iterable of fields to select. Defaults to all.
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query, and read through `.path`. \
+            Defaults to `False`.
+
+        Returns:
+            List of records of the bookmarks matching the SELECT query in \
+            any profile, each tagged with its `profile`
+        """
+
+        return self._gather(lambda fb: fb.bookmarks(
+            fields=fields,
+            where=where,
+            with_paths=with_paths,
+            lightweight=True,
+        ))
+
+    def folders(
+        self,
+        *,
+        fields: Iterable[Field] = [],
+        where: Expression | None = None,
+        with_paths: bool = False,
+    ) -> list[ProfileBookmarkRecord]:
+        """Executes a SELECT query over only the rows representing folders, in every profile
+
+        Args:
+            fields: Iterable of fields to select. Defaults to all.
+            where: An `Expression` used in the WHERE clause. Defaults to `None`.
+            with_paths: If `True`, the paths of all selected rows are \
+            computed in the same query, and read through `.path`. \
+            Defaults to `False`.
+
+        Returns:
+            List of records of the folders matching the SELECT query in \
+            any profile, each tagged with its `profile`
+        """
+
+        return self._gather(lambda fb: fb.folders(
+            fields=fields,
+            where=where,
+            with_paths=with_paths,
+            lightweight=True,
+        ))
+
+    def _gather(
+        self,
+        query: Callable[[FirefoxBookmarks], Iterable[BookmarkRecord]],
+    ) -> list[ProfileBookmarkRecord]:
+        """Runs a query in every profile, and tags and concatenates the records"""
+
+        def tagged(profile: str,
+                   fb: FirefoxBookmarks) -> list[ProfileBookmarkRecord]:
+            return [
+                ProfileBookmarkRecord(*record, profile) for record in query(fb)
+            ]
+
+        return [row for rows in self._map(tagged).values() for row in rows]
+
+    def disconnect(self):
+        """Disconnects from all databases and removes the duplicate databases"""
+
+        try:
+            self._map(lambda profile, fb: fb.disconnect())
+        finally:
+            for worker in self._workers:
+                worker.shutdown()
+            self._profiles = {}
+            self._workers = []
 
 
 __all__ = [
     'FirefoxBookmarks',
+    'MultiProfileBookmarks',
+    'aggregate_bookmarks',
     'Bookmark',  # For convenience
+    'BookmarkRecord',  # For convenience
+    'ProfileBookmarkRecord',  # For convenience
     'ProfileCriterion',  # For convenience
+    'LoadEngine',  # For convenience
+    'Source',  # For convenience
+    'Storage',  # For convenience
+    'RowType',  # For convenience
+    'OutputFormat',  # For convenience
+    'ExportFormat',  # For convenience
+    'RetentionPolicy',  # For convenience
 ]
@@ -0,0 +1,206 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from queue import Queue
+from time import perf_counter
+from typing import Iterable
+
+from peewee import IntegerField, Model, SqliteDatabase, TextField, chunked
+
+from .binding import BoundDatabase
+from .connect import close_places_db, connect_to_places_db
+from .constants import BATCH_SIZE, BOOKMARK_TYPE, EXTRACT_CHUNK_SIZE, OutputFormat
+from .locate import locate_db_candidates
+from .models import FirefoxBookmark, FirefoxPlace, places_database
+from .reports import AggregateReport
+
+# Columns of each extracted row, in order
+_COLUMNS = ("url_hash", "url", "title", "date_added", "last_modified")
+
+# `_write_sqlite` binds the model to each output, see `BoundDatabase`
+merged_database = BoundDatabase(SqliteDatabase(None))
+
+
+class MergedBookmark(Model):
+    """Represents an entry in the `merged_bookmark` table, which `aggregate_bookmarks` writes
+
+    Attributes:
+        url: URL of the bookmark
+        url_hash: Firefox's hash of `url`
+        title: Title of the most recently modified bookmark of `url`
+        date_added: When that bookmark was added, in microseconds
+        last_modified: When that bookmark was last modified, in microseconds
+        profile: Directory of the profile that bookmark is in
+    """
+
+    url = TextField(primary_key=True)
+    url_hash = IntegerField(index=True)
+    title = TextField(null=True)
+    date_added = IntegerField(null=True)
+    last_modified = IntegerField(null=True)
+    profile = TextField()
+
+    class Meta:
+        database = merged_database
+        table_name = 'merged_bookmark'
+
+
+def aggregate_bookmarks(
+    output_path: str,
+    *,
+    db_paths: Iterable[str] | None = None,
+    look_under_path: str | None = None,
+    output_format: OutputFormat | str | None = None,
+    max_workers: int | None = None,
+) -> AggregateReport:
+    """Merges the bookmarks of several Places databases, one per URL, and writes them to a file
+
+    Each Places database is opened once, in a worker process, which sends
+    its bookmarks back `EXTRACT_CHUNK_SIZE` at a time. Each chunk is merged as
+    it arrives, while the workers read on. Of the bookmarks of the same URL,
+    the most recently modified one wins.
+
+    Args:
+        output_path: Where to write the merged bookmarks. Overwritten if it \
+        exists.
+        db_paths: Paths of the Places databases. If not supplied, all those \
+        found under `look_under_path` are used.
+        look_under_path: Path from where to start searching. \
+        If not supplied, looks under default profiles directory.
+        output_format: `OutputFormat.SQLITE` writes the `merged_bookmark` \
+        table, and `OutputFormat.JSON` writes a list of objects. Defaults \
+        to `OutputFormat.JSON` if `output_path` ends in `.json`, and to \
+        `OutputFormat.SQLITE` otherwise.
+        max_workers: Number of processes to read the Places databases with. \
+        Defaults to the number of CPUs.
+
+    Returns:
+        Number of profiles read, rows read and bookmarks written, and the \
+        time it took
+    """
+
+    start = perf_counter()
+
+    if db_paths is None:
+        db_paths = locate_db_candidates(look_under_path=look_under_path)
+    db_paths = list(db_paths)
+
+    if output_format is None:
+        is_json = output_path.lower().endswith(".json")
+        output_format = OutputFormat.JSON if is_json else OutputFormat.SQLITE
+    output_format = OutputFormat(output_format)
+
+    # `url_hash` narrows down the lookup. The URL itself settles collisions.
+    merged: dict[tuple[int, str], tuple] = {}
+    rows = 0
+
+    with Manager() as manager, \
+            ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Bounded, so that workers wait for the merge rather than pile up rows
+        chunks = manager.Queue(maxsize=2 * len(db_paths))
+        futures = [
+            executor.submit(_extract, db_path, chunks) for db_path in db_paths
+        ]
+
+        remaining = len(db_paths)
+        while remaining:
+            db_path, chunk = chunks.get()
+            if chunk is None:
+                remaining -= 1
+                continue
+
+            profile = os.path.dirname(db_path)
+            for row in chunk:
+                rows += 1
+                key = (row[0], row[1])
+                if key not in merged or _is_newer(row, merged[key]):
+                    merged[key] = (*row, profile)
+
+        # Raises whatever stopped a worker early
+        for future in futures:
+            future.result()
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    if output_format == OutputFormat.JSON:
+        _write_json(output_path, merged.values())
+    else:
+        _write_sqlite(output_path, merged.values())
+
+    return AggregateReport(
+        profiles=len(db_paths),
+        rows=rows,
+        bookmarks=len(merged),
+        seconds=perf_counter() - start,
+    )
+
+
+def _extract(db_path: str, chunks: Queue):
+    """Reads the `_COLUMNS` of every bookmark of a Places database over one connection, in a worker process
+
+    Puts `(db_path, rows)` on `chunks` for every `EXTRACT_CHUNK_SIZE` rows,
+    then `(db_path, None)`, even if reading fails.
+    """
+
+    try:
+        database = connect_to_places_db(db_path=db_path, readonly=True)
+        try:
+            with places_database.bound(database):
+                query = FirefoxBookmark \
+                    .select(
+                        FirefoxPlace.url_hash,
+                        FirefoxPlace.url,
+                        FirefoxBookmark.title,
+                        FirefoxBookmark.date_added,
+                        FirefoxBookmark.last_modified,
+                    ) \
+                    .join(
+                        FirefoxPlace,
+                        on=(FirefoxBookmark.fk == FirefoxPlace.id),
+                    ) \
+                    .where(FirefoxBookmark.type == BOOKMARK_TYPE) \
+                    .where(FirefoxPlace.url.is_null(False))
+                cursor = database.execute(query)
+                while rows := cursor.fetchmany(EXTRACT_CHUNK_SIZE):
+                    chunks.put((db_path, rows))
+        finally:
+            close_places_db(database)
+    finally:
+        chunks.put((db_path, None))
+
+
+def _is_newer(row: tuple, other: tuple) -> bool:
+    return (row[4] or 0) > (other[4] or 0)
+
+
+def _write_json(output_path: str, merged: Iterable[tuple]):
+    with open(output_path, "w", encoding="utf-8") as output:
+        output.write("[")
+        for index, row in enumerate(merged):
+            if index:
+                output.write(",")
+            output.write("\n")
+            json.dump(dict(zip((*_COLUMNS, "profile"), row)), output)
+        output.write("\n]\n")
+
+
+def _write_sqlite(output_path: str, merged: Iterable[tuple]):
+    database = SqliteDatabase(output_path)
+    fields = [getattr(MergedBookmark, column) for column in _COLUMNS]
+
+    with merged_database.bound(database), database.atomic():
+        database.create_tables([MergedBookmark])
+        for rows in chunked(merged, BATCH_SIZE):
+            MergedBookmark \
+                .insert_many(rows, fields=[*fields, MergedBookmark.profile]) \
+                .execute()
+
+    database.close()
+
+
+__all__ = [
+    'aggregate_bookmarks',
+    'MergedBookmark',
+    'OutputFormat',  # For convenience
+]
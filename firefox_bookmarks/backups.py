@@ -0,0 +1,524 @@
+import hashlib
+import lzma
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from time import time_ns
+from typing import Iterable, Iterator
+
+from peewee import CompositeKey, IntegerField, Model, SqliteDatabase, TextField
+
+from .binding import BoundDatabase
+from .connect import Progress, copy_database
+from .constants import BACKUP_CHUNK_SIZE, BACKUP_PAGES, BACKUP_SLEEP
+
+# Each `BackupStore` binds the models to its own manifest, see `_bound`
+manifest_database = BoundDatabase(SqliteDatabase(None))
+
+MANIFEST_NAME = "manifest.sqlite"
+CHUNKS_DIR_NAME = "chunks"
+
+# Full copies of the Places database, written next to it by older versions
+LEGACY_BACKUP_PATTERN = re.compile(r"backup-(\d+)\.sqlite")
+
+
+class Compression(Enum):
+    """Algorithms to compress backup chunks with"""
+
+    ZLIB = "zlib"
+    LZMA = "lzma"
+
+
+class _ManifestModel(Model):
+
+    class Meta:
+        database = manifest_database
+
+
+class Snapshot(_ManifestModel):
+    """Represents an entry in the `snapshot` table, which catalogues the stored backups
+
+    Attributes:
+        timestamp: When the backup was taken, in microseconds since the epoch
+        size: Size of the backed up database, in bytes
+        checksum: SHA-256 digest of the backed up database
+        source: Path of the backed up database
+        rows_changed: Number of rows changed by the commit that the backup \
+        was taken for, if known
+    """
+
+    timestamp = IntegerField(primary_key=True)
+    size = IntegerField()
+    checksum = TextField()
+    source = TextField()
+    rows_changed = IntegerField(null=True)
+
+    class Meta:
+        table_name = 'snapshot'
+
+
+class Chunk(_ManifestModel):
+    """Represents an entry in the `chunk` table, which lists the stored pieces of backups"""
+
+    digest = TextField(primary_key=True)
+    compression = TextField()
+    size = IntegerField()
+
+    class Meta:
+        table_name = 'chunk'
+
+
+class SnapshotChunk(_ManifestModel):
+    """Represents an entry in the `snapshot_chunk` table, which maps backups to their pieces"""
+
+    snapshot = IntegerField()
+    position = IntegerField()
+    digest = TextField(index=True)
+
+    class Meta:
+        table_name = 'snapshot_chunk'
+        primary_key = CompositeKey('snapshot', 'position')
+
+
+_MODELS = [Snapshot, Chunk, SnapshotChunk]
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Rules for which backups to keep. A backup is kept if any rule keeps it.
+
+    Attributes:
+        keep_last: Number of latest backups to keep
+        keep_daily: Number of latest days to keep the last backup of
+        keep_weekly: Number of latest weeks to keep the last backup of
+    """
+
+    keep_last: int = 10
+    keep_daily: int = 7
+    keep_weekly: int = 4
+
+    def select(self, timestamps: Iterable[int]) -> set[int]:
+        """Chooses the backups to keep
+
+        Args:
+            timestamps: Timestamps of all backups, in microseconds
+
+        Returns:
+            Timestamps of the backups to keep
+        """
+
+        latest_first = sorted(timestamps, reverse=True)
+        keep = set(latest_first[:self.keep_last])
+
+        for count, period in ((self.keep_daily, _day), (self.keep_weekly,
+                                                        _week)):
+            seen = []
+            for timestamp in latest_first:
+                if len(seen) >= count:
+                    break
+                if period(timestamp) not in seen:
+                    seen.append(period(timestamp))
+                    keep.add(timestamp)
+
+        return keep
+
+
+class BackupStore:
+    """A directory of compressed backups, which share their unchanged chunks
+
+    Each backup is split into fixed-size chunks, and each distinct chunk is
+    stored once, compressed, under its SHA-256 digest. The manifest, a small
+    SQLite database, records which chunks make up each backup.
+
+    Args:
+        dir_path: Directory to keep the backups in. Created if missing.
+        compression: How to compress new chunks. Defaults to `Compression.ZLIB`.
+        retention: Which backups to keep after adding one. If `None`, all \
+        are kept. Defaults to `RetentionPolicy()`.
+    """
+
+    def __init__(
+            self,
+            dir_path: str,
+            *,
+            compression: Compression = Compression.ZLIB,
+            retention: RetentionPolicy | None = RetentionPolicy(),
+    ):
+        self._dir_path = dir_path
+        self._compression = compression
+        self._retention = retention
+
+        os.makedirs(os.path.join(dir_path, CHUNKS_DIR_NAME), exist_ok=True)
+        self._database = SqliteDatabase(os.path.join(dir_path, MANIFEST_NAME))
+        with self._bound():
+            self._database.create_tables(_MODELS)
+
+    def _bound(self):
+        return manifest_database.bound(self._database)
+
+    def close(self):
+        """Closes the manifest"""
+
+        self._database.close()
+
+    def add(
+        self,
+        source_path: str,
+        *,
+        timestamp: int | None = None,
+        rows_changed: int | None = None,
+        pages: int = BACKUP_PAGES,
+        progress: Progress | None = None,
+        sleep: float = BACKUP_SLEEP,
+    ) -> int:
+        """Backs up a database, then applies the retention policy
+
+        Args:
+            source_path: Path of the database to back up
+            timestamp: Timestamp of the backup, in microseconds. Defaults to now.
+            rows_changed: Number of rows changed by the commit that the \
+            backup is taken for. Defaults to `None`.
+            pages: Number of pages to copy per step. Defaults to `BACKUP_PAGES`.
+            progress: Called after each step, with the status, and the \
+            remaining and total number of pages. Defaults to `None`.
+            sleep: Seconds to wait between steps. Defaults to `BACKUP_SLEEP`.
+
+        Returns:
+            Timestamp of the backup
+        """
+
+        if timestamp is None:
+            timestamp = time_ns() // 1000
+
+        self._add(
+            source_path,
+            timestamp=timestamp,
+            rows_changed=rows_changed,
+            pages=pages,
+            progress=progress,
+            sleep=sleep,
+        )
+
+        if self._retention is not None:
+            self.prune(self._retention)
+
+        return timestamp
+
+    def import_legacy(
+        self,
+        dir_path: str,
+        *,
+        pages: int = BACKUP_PAGES,
+        progress: Progress | None = None,
+        sleep: float = BACKUP_SLEEP,
+    ) -> list[int]:
+        """Adds the `backup-<unixtime>.sqlite` files that older versions wrote, then applies the retention policy
+
+        Each file is imported with its time converted to microseconds, and
+        removed once its backup is stored, as its chunks are kept instead.
+
+        Args:
+            dir_path: Directory holding the files, next to the Places database
+            pages: Number of pages to copy per step. Defaults to `BACKUP_PAGES`.
+            progress: Called after each step, with the status, and the \
+            remaining and total number of pages. Defaults to `None`.
+            sleep: Seconds to wait between steps. Defaults to `BACKUP_SLEEP`.
+
+        Returns:
+            Timestamps of the imported backups
+        """
+
+        taken = set(self.timestamps())
+
+        added = []
+        for file_name in sorted(os.listdir(dir_path)):
+            match = LEGACY_BACKUP_PATTERN.fullmatch(file_name)
+            if match is None:
+                continue
+
+            path = os.path.join(dir_path, file_name)
+            timestamp = int(match.group(1)) * 10**6
+            # Taken if a previous import stopped before removing the file
+            if timestamp not in taken:
+                self._add(
+                    path,
+                    timestamp=timestamp,
+                    pages=pages,
+                    progress=progress,
+                    sleep=sleep,
+                )
+                added.append(timestamp)
+            os.remove(path)
+
+        if added and self._retention is not None:
+            self.prune(self._retention)
+
+        return added
+
+    def _add(
+        self,
+        source_path: str,
+        *,
+        timestamp: int,
+        rows_changed: int | None = None,
+        pages: int,
+        progress: Progress | None,
+        sleep: float,
+    ):
+        # Chunk a consistent snapshot, rather than the live file
+        snapshot_path = os.path.join(self._dir_path, f"{timestamp}.sqlite")
+        copy_database(
+            source_path,
+            snapshot_path,
+            pages=pages,
+            progress=progress,
+            sleep=sleep,
+        )
+
+        try:
+            with self._bound(), self._database.atomic():
+                size = 0
+                checksum = hashlib.sha256()
+                with open(snapshot_path, "rb") as snapshot:
+                    for position, data in enumerate(_read_chunks(snapshot)):
+                        digest = self._store_chunk(data)
+                        SnapshotChunk.create(
+                            snapshot=timestamp,
+                            position=position,
+                            digest=digest,
+                        )
+                        size += len(data)
+                        checksum.update(data)
+
+                Snapshot.create(
+                    timestamp=timestamp,
+                    size=size,
+                    checksum=checksum.hexdigest(),
+                    source=os.path.abspath(source_path),
+                    rows_changed=rows_changed,
+                )
+        finally:
+            os.remove(snapshot_path)
+
+    def _store_chunk(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        if Chunk.get_or_none(Chunk.digest == digest) is not None:
+            return digest
+
+        path = self._chunk_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as chunk:
+            chunk.write(_compress(self._compression, data))
+        os.replace(path + ".tmp", path)
+
+        Chunk.create(
+            digest=digest,
+            compression=self._compression.value,
+            size=len(data),
+        )
+
+        return digest
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self._dir_path, CHUNKS_DIR_NAME, digest[:2],
+                            digest)
+
+    def entries(self) -> list[Snapshot]:
+        """Lists all backups, from latest to oldest"""
+
+        with self._bound():
+            return list(Snapshot.select().order_by(Snapshot.timestamp.desc()))
+
+    def get(self, timestamp: int) -> Snapshot:
+        """Looks up a backup by its timestamp
+
+        Args:
+            timestamp: Timestamp of the backup
+
+        Returns:
+            The backup's entry in the catalogue
+        """
+
+        with self._bound():
+            snapshot = Snapshot.get_or_none(Snapshot.timestamp == timestamp)
+
+        if snapshot is None:
+            raise KeyError(f"No backup with timestamp {timestamp}")
+        return snapshot
+
+    def nth_latest(self, index: int) -> Snapshot:
+        """Looks up a backup by its position, when sorted from latest to oldest
+
+        Args:
+            index: Position of the backup. 0 refers to the latest backup.
+
+        Returns:
+            The backup's entry in the catalogue
+        """
+
+        with self._bound():
+            snapshot = Snapshot \
+                .select() \
+                .order_by(Snapshot.timestamp.desc()) \
+                .offset(index) \
+                .first()
+
+        if snapshot is None:
+            raise IndexError(f"There are fewer than {index + 1} backups")
+        return snapshot
+
+    def timestamps(self) -> list[int]:
+        """Lists the timestamps of all backups, from oldest to latest"""
+
+        with self._bound():
+            return [
+                timestamp for (timestamp, ) in Snapshot \
+                    .select(Snapshot.timestamp) \
+                    .order_by(Snapshot.timestamp) \
+                    .tuples()
+            ]
+
+    def restore(
+        self,
+        timestamp: int,
+        target_path: str,
+        *,
+        pages: int = BACKUP_PAGES,
+        progress: Progress | None = None,
+        sleep: float = BACKUP_SLEEP,
+    ):
+        """Restores a backup over a database
+
+        The chunks are decompressed one at a time into a file next to the
+        target, which is then copied into the target through the SQLite
+        backup API.
+
+        Args:
+            timestamp: Timestamp of the backup to restore
+            target_path: Path of the database to overwrite
+            pages: Number of pages to copy per step. Defaults to `BACKUP_PAGES`.
+            progress: Called after each step, with the status, and the \
+            remaining and total number of pages. Defaults to `None`.
+            sleep: Seconds to wait between steps. Defaults to `BACKUP_SLEEP`.
+        """
+
+        restored_path = os.path.join(
+            os.path.dirname(target_path),
+            f"restoring-{timestamp}.sqlite",
+        )
+
+        try:
+            with open(restored_path, "wb") as restored:
+                for data in self._iter_chunks(timestamp):
+                    restored.write(data)
+
+            copy_database(
+                restored_path,
+                target_path,
+                pages=pages,
+                progress=progress,
+                sleep=sleep,
+            )
+        finally:
+            os.remove(restored_path)
+
+    def _iter_chunks(self, timestamp: int) -> Iterator[bytes]:
+        with self._bound():
+            chunks = list(
+                Chunk \
+                    .select(Chunk.digest, Chunk.compression) \
+                    .join(
+                        SnapshotChunk,
+                        on=(SnapshotChunk.digest == Chunk.digest),
+                    ) \
+                    .where(SnapshotChunk.snapshot == timestamp) \
+                    .order_by(SnapshotChunk.position) \
+                    .tuples()
+            )
+
+        if not chunks:
+            raise KeyError(f"No backup with timestamp {timestamp}")
+
+        for digest, compression in chunks:
+            decompressor = _decompressor(Compression(compression))
+            with open(self._chunk_path(digest), "rb") as chunk:
+                while block := chunk.read(BACKUP_CHUNK_SIZE):
+                    yield decompressor.decompress(block)
+
+    def prune(self, retention: RetentionPolicy) -> list[int]:
+        """Removes the backups that a retention policy does not keep, and the chunks only they used
+
+        Args:
+            retention: Which backups to keep
+
+        Returns:
+            Timestamps of the removed backups
+        """
+
+        timestamps = self.timestamps()
+        keep = retention.select(timestamps)
+        removed = [
+            timestamp for timestamp in timestamps if timestamp not in keep
+        ]
+
+        with self._bound(), self._database.atomic():
+            for timestamp in removed:
+                SnapshotChunk \
+                    .delete() \
+                    .where(SnapshotChunk.snapshot == timestamp) \
+                    .execute()
+                Snapshot.delete_by_id(timestamp)
+
+            unused = Chunk \
+                .select(Chunk.digest) \
+                .where(Chunk.digest.not_in(
+                    SnapshotChunk.select(SnapshotChunk.digest)))
+            digests = [digest for (digest, ) in unused.tuples()]
+            Chunk.delete().where(Chunk.digest.in_(unused)).execute()
+
+        for digest in digests:
+            os.remove(self._chunk_path(digest))
+
+        return removed
+
+
+def _read_chunks(file) -> Iterator[bytes]:
+    while data := file.read(BACKUP_CHUNK_SIZE):
+        yield data
+
+
+def _compress(compression: Compression, data: bytes) -> bytes:
+    if compression == Compression.LZMA:
+        return lzma.compress(data)
+    return zlib.compress(data)
+
+
+def _decompressor(compression: Compression):
+    if compression == Compression.LZMA:
+        return lzma.LZMADecompressor()
+    return zlib.decompressobj()
+
+
+def _day(timestamp: int) -> str:
+    return _utc(timestamp).strftime("%Y-%m-%d")
+
+
+def _week(timestamp: int) -> str:
+    return _utc(timestamp).strftime("%G-%V")
+
+
+def _utc(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp / 1e6, tz=timezone.utc)
+
+
+__all__ = [
+    'BackupStore',
+    'Compression',
+    'RetentionPolicy',
+    'Snapshot',
+    'Chunk',
+    'SnapshotChunk',
+]
@@ -0,0 +1,68 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from peewee import Database, DatabaseProxy
+
+
+class BoundDatabase(DatabaseProxy):
+    """Stands in for the database bound in the current thread, or else for a default database
+
+    Unlike `bind_ctx`, which rebinds models for every thread at once, binding
+    through this proxy only affects the current thread. Models that use it
+    can therefore be bound to different databases in different threads.
+
+    Args:
+        default: The database to stand in for, where none is bound.
+    """
+
+    __slots__ = ('_default', '_initial', '_local')
+
+    def __init__(self, default: Database):
+        self._local = threading.local()
+        self._initial = default
+        super().__init__()
+        self.initialize(default)
+
+    def __setattr__(self, attr, value):
+        object.__setattr__(self, attr, value)
+
+    @property
+    def obj(self) -> Database:
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else self._default
+
+    @obj.setter
+    def obj(self, database: Database):
+        self._default = database
+
+    @property
+    def default(self) -> Database:
+        """The database stood in for, where none is bound"""
+
+        return self._default
+
+    def reset(self):
+        """Goes back to standing in for the database passed to the constructor, where none is bound"""
+
+        self.initialize(self._initial)
+
+    @contextmanager
+    def bound(self, database: Database) -> Iterator[None]:
+        """Context manager, within which the current thread uses the given database
+
+        Args:
+            database: The database to bind.
+        """
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(database)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+
+__all__ = [
+    'BoundDatabase',
+]
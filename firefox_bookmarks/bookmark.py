@@ -1,9 +1,52 @@
-from peewee import SQL, ForeignKeyField, IntegerField, Model, SqliteDatabase, TextField
+from collections import namedtuple
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from functools import reduce
+from typing import Iterable, Iterator
 
-from .constants import BOOKMARK_TYPE, FOLDER_TYPE
+from peewee import (
+    CTE,
+    JOIN,
+    SQL,
+    AutoField,
+    Case,
+    CompositeKey,
+    Database,
+    ForeignKeyAccessor,
+    ForeignKeyField,
+    IntegerField,
+    Model,
+    ModelAlias,
+    SqliteDatabase,
+    TextField,
+    Value,
+    chunked,
+    fn,
+)
+from playhouse.sqlite_ext import FTS5Model, RowIDField, SearchField
+
+from .binding import BoundDatabase
+from .constants import BATCH_SIZE, BOOKMARK_TYPE, FOLDER_TYPE, MAX_QUERY_PARAMETERS
 
 database_obj = SqliteDatabase(None)
 
+# Each `FirefoxBookmarks` binds the models to its own database, see `_bound`
+bookmark_database = BoundDatabase(database_obj)
+
+
+class _RowForeignKeyAccessor(ForeignKeyAccessor):
+    """Looks up related rows in the database that the row was read from, see `Bookmark.bound`"""
+
+    def get_rel_instance(self, instance):
+        with instance.bound():
+            related = super().get_rel_instance(instance)
+        if isinstance(related, Bookmark) and related._database is None:
+            related._database = instance._database
+        return related
+
+
+class _RowForeignKeyField(ForeignKeyField):
+    accessor_class = _RowForeignKeyAccessor
+
 
 class Bookmark(Model):
     """Represents an entry in the `bookmark` table"""
@@ -13,7 +56,7 @@ class Bookmark(Model):
     url = TextField(null=True)
     description = TextField(null=True)
     type = IntegerField(null=True)
-    parent = ForeignKeyField(model='self', null=True)
+    parent = _RowForeignKeyField(model='self', null=True)
     place_id = IntegerField(null=True)
     origin_id = IntegerField(null=True)
 
@@ -71,8 +114,12 @@ class Bookmark(Model):
         null=True,
     )
 
+    # Not part of the Places database. Filled in by `FirefoxBookmarks` when
+    # asked to select or materialize paths, see `bookmark_paths`
+    materialized_path = TextField(null=True)
+
     class Meta:
-        database = database_obj
+        database = bookmark_database
         table_name = 'bookmark'
         indexes = (
             (('place_id', 'last_modified'), False),
@@ -81,6 +128,29 @@ class Bookmark(Model):
             (('origin_prefix', 'origin_host'), False),
         )
 
+    # Database the row was read from, set by `FirefoxBookmarks`
+    _database: Database | None = None
+
+    def bound(self) -> AbstractContextManager:
+        """Context manager, within which the models use the database that the row was read from, in the current thread
+
+        Rows that `FirefoxBookmarks` returns remember their database, so that
+        `.path`, `.parent` and `.save` read and write the right profile. Other
+        rows use whatever database is bound already.
+        """
+
+        if self._database is None:
+            return nullcontext()
+        return bookmark_database.bound(self._database)
+
+    def save(self, *args, **kwargs) -> int:
+        with self.bound():
+            return super().save(*args, **kwargs)
+
+    def delete_instance(self, *args, **kwargs) -> int:
+        with self.bound():
+            return super().delete_instance(*args, **kwargs)
+
     @property
     def is_bookmark(self) -> bool:
         """Returns whether the object represents a bookmark"""
@@ -105,34 +175,655 @@ class Bookmark(Model):
     def path(self) -> str:
         """Generates the 'path' of the object, which is a string resembling a *nix path leading thru parents back to the root
 
+        Uses the materialized path if it was selected, and otherwise walks \
+        the parents one query at a time. To get many paths at once, use \
+        `FirefoxBookmarks.paths` or `with_paths=True` instead.
+
         Returns:
             str: The 'path' of the bookmark/folder
         """
+        if self.materialized_path is not None:
+            return self.materialized_path
+
         curr: Bookmark = self
         path = ""
 
-        while curr.parent_id != 0 and curr.parent_id is not None:  # type: ignore
-            path = repr(curr) + path
-            curr = curr.parent  # type: ignore
+        with self.bound():
+            while curr.parent_id != 0 and curr.parent_id is not None:  # type: ignore
+                path = repr(curr) + path
+                curr = curr.parent  # type: ignore
 
         return "/" + path
 
 
-def connect_bookmark_model(*, db_path: str) -> SqliteDatabase:
+class BookmarkRecord(
+        namedtuple(
+            "BookmarkRecord",
+            [
+                field.object_id_name
+                if isinstance(field, ForeignKeyField) else field.name
+                for field in Bookmark._meta.sorted_fields
+            ],
+        )):
+    """A read-only row of the `bookmark` table, much lighter than a `Bookmark`
+
+    Has a read-only attribute for each field of `Bookmark`, in the same
+    order, with `parent_id` standing in for `parent`. Fields that were not
+    selected are `None`. Returned by `FirefoxBookmarks` when asked for
+    `lightweight` rows.
+    """
+
+    __slots__ = ()
+
+    @property
+    def is_bookmark(self) -> bool:
+        """Returns whether the record represents a bookmark"""
+        return self.type == BOOKMARK_TYPE
+
+    @property
+    def is_folder(self) -> bool:
+        """Returns whether the record represents a folder"""
+        return self.type == FOLDER_TYPE
+
+    def __str__(self) -> str:
+        return str(self.title or ".")
+
+    def __repr__(self) -> str:
+        if self.is_bookmark:
+            return f"[{self.title}]({self.url})"
+        elif self.is_folder:
+            return f"{self.title}/"
+        return f"<Bookmark {self.id}, {self.type}, {self.title}>"
+
+    @property
+    def path(self) -> str | None:
+        """The 'path' of the bookmark/folder, if paths were selected or materialized, else `None`"""
+        return self.materialized_path
+
+
+class ProfileBookmarkRecord(
+        namedtuple(
+            "ProfileBookmarkRecord",
+            BookmarkRecord._fields + ("profile", ),
+        ),
+        BookmarkRecord,
+):
+    """A `BookmarkRecord` that also holds the `profile` it was read from
+
+    Returned by `MultiProfileBookmarks`. Like any record, it holds no link to
+    a database, so it reads the same whichever profile is connected.
+    """
+
+    __slots__ = ()
+
+    # `namedtuple` defines its own, which would take precedence
+    __repr__ = BookmarkRecord.__repr__
+
+
+class BookmarkChange(Model):
+    """Represents an entry in the `bookmark_change` table, which logs every change made to `bookmark`"""
+
+    seq = AutoField()
+    bookmark_id = IntegerField(index=True)
+    guid = TextField(null=True)
+    operation = TextField()
+    column = TextField(null=True)
+
+    class Meta:
+        database = bookmark_database
+        table_name = 'bookmark_change'
+
+
+class BookmarkClosure(Model):
+    """Represents an entry in the `bookmark_closure` table, which pairs every row in `bookmark` with each of its ancestors
+
+    Every row is also paired with itself, at depth 0.
+
+    Attributes:
+        ancestor: `id` of the ancestor
+        descendant: `id` of the descendant
+        depth: Number of levels between the two
+    """
+
+    ancestor = IntegerField()
+    descendant = IntegerField()
+    depth = IntegerField()
+
+    class Meta:
+        database = bookmark_database
+        table_name = 'bookmark_closure'
+        primary_key = CompositeKey('ancestor', 'descendant')
+        indexes = ((('descendant', 'depth'), False), )
+
+
+class BookmarkSearch(FTS5Model):
+    """Represents the `bookmark_search` FTS5 table, a full-text index over the text columns of `bookmark`
+
+    The table holds no text of its own, and reads it from `bookmark` instead.
+    """
+
+    rowid = RowIDField()
+    title = SearchField()
+    url = SearchField()
+    description = SearchField()
+    site_name = SearchField()
+
+    class Meta:
+        database = bookmark_database
+        table_name = 'bookmark_search'
+        options = {'content': 'bookmark', 'content_rowid': 'id'}
+
+
+class BookmarkTrigrams(FTS5Model):
+    """Represents the `bookmark_trigram` FTS5 table, a trigram index over `title` and `url` of `bookmark`, for substring matches
+
+    The table holds no text of its own, and reads it from `bookmark` instead.
+    Needs SQLite 3.34 or later.
+    """
+
+    rowid = RowIDField()
+    title = SearchField()
+    url = SearchField()
+
+    class Meta:
+        database = bookmark_database
+        table_name = 'bookmark_trigram'
+        options = {
+            'content': 'bookmark',
+            'content_rowid': 'id',
+            'tokenize': 'trigram',
+        }
+
+
+class BookmarkTrigram(Model):
+    """Represents an entry in the `bookmark_trigram_list` table, which lists the trigrams in `title` and `url` of each row in `bookmark`
+
+    Stands in for `BookmarkTrigrams` where SQLite lacks the trigram tokenizer.
+    """
+
+    column = TextField()
+    trigram = TextField()
+    bookmark_id = IntegerField(index=True)
+
+    class Meta:
+        database = bookmark_database
+        table_name = 'bookmark_trigram_list'
+        primary_key = CompositeKey('column', 'trigram', 'bookmark_id')
+        without_rowid = True
+
+
+def bookmark_paths() -> CTE:
+    """Builds a recursive CTE, `bookmark_path(id, path)`, that holds the path of every row in `bookmark`
+
+    The paths are built top-down from the root, in a single pass over the \
+    tree, and match `Bookmark.path`.
+
+    Returns:
+        The CTE, to be added to a query with `.with_cte`
+    """
+
+    root = Bookmark \
+        .select(Bookmark.id, Value("/")) \
+        .where(Bookmark.parent.is_null() | (Bookmark.parent == 0))
+    paths = root.cte(
+        "bookmark_path",
+        recursive=True,
+        columns=("id", "path"),
+    )
+
+    child = Bookmark.alias()
+    children = child \
+        .select(child.id, paths.c.path.concat(_path_segment(child))) \
+        .join(paths, on=(child.parent == paths.c.id))
+
+    return paths.union_all(children)
+
+
+def subtree_paths(ids: Iterable[int]) -> tuple[CTE, CTE]:
+    """Builds recursive CTEs, `bookmark_subtree(id)` and `bookmark_path(id, path)`, that hold the paths of the given rows in `bookmark` and of every row under them
+
+    The paths are built on the `materialized_path` of the rows just outside
+    of those subtrees, which must be up to date.
+
+    Args:
+        ids: `id`s of the rows at the top of the subtrees
+
+    Returns:
+        Both CTEs, to be added to a query with `.with_cte`, in that order
+    """
+
+    subtree = Bookmark \
+        .select(Bookmark.id) \
+        .where(Bookmark.id.in_(list(ids))) \
+        .cte("bookmark_subtree", recursive=True, columns=("id", ))
+    below = Bookmark.alias()
+    # `UNION` rather than `UNION ALL`, as subtrees may be nested
+    subtree = subtree.union(
+        below \
+            .select(below.id) \
+            .join(subtree, on=(below.parent == subtree.c.id)))
+
+    # The tops of the subtrees are the rows whose parent is outside of them
+    top = Bookmark.alias()
+    parent = Bookmark.alias()
+    tops = top \
+        .select(
+            top.id,
+            Case(
+                None,
+                ((top.parent.is_null() | (top.parent == 0), Value("/")), ),
+                parent.materialized_path.concat(_path_segment(top)),
+            ),
+        ) \
+        .join(subtree, on=(top.id == subtree.c.id)) \
+        .join(parent, JOIN.LEFT_OUTER, on=(parent.id == top.parent)) \
+        .where(top.parent.is_null() |
+               top.parent.not_in(subtree.select(subtree.c.id)))
+    paths = tops.cte(
+        "bookmark_path",
+        recursive=True,
+        columns=("id", "path"),
+    )
+
+    child = Bookmark.alias()
+    children = child \
+        .select(child.id, paths.c.path.concat(_path_segment(child))) \
+        .join(paths, on=(child.parent == paths.c.id))
+
+    return subtree, paths.union_all(children)
+
+
+def _path_segment(bookmark: ModelAlias) -> Case:
+    # Mirrors `Bookmark.__repr__`, down to how `None` is formatted
+    title = fn.COALESCE(bookmark.title, "None")
+    url = fn.COALESCE(bookmark.url, "None")
+    type_ = fn.COALESCE(bookmark.type, "None")
+
+    return Case(
+        bookmark.type,
+        (
+            (BOOKMARK_TYPE, _concat("[", title, "](", url, ")")),
+            (FOLDER_TYPE, _concat(title, "/")),
+        ),
+        _concat("<Bookmark ", bookmark.id, ", ", type_, ", ", title, ">"),
+    )
+
+
+def _concat(*parts):
+    return reduce(lambda left, right: left.concat(right), parts[1:],
+                  Value(parts[0]))
+
+
+def track_changes(database: SqliteDatabase):
+    """Installs triggers that log every change made to `bookmark` into `bookmark_change`
+
+    Inserts, deletes and updates are each logged once per row. Updates that
+    change `title` or `url` also record which of the two changed, in
+    `column`, as the trigram index is the only consumer of column names.
+    The triggers stay installed, and are switched off by `untracked`.
+
+    Args:
+        database: The database holding both tables.
+    """
+
+    database.execute_sql(
+        f"CREATE TABLE IF NOT EXISTS {_TRACKING_TABLE} (enabled INTEGER NOT NULL)"
+    )
+    database.execute_sql(f"INSERT INTO {_TRACKING_TABLE} (enabled) "
+                         f"SELECT 1 WHERE NOT EXISTS "
+                         f"(SELECT 1 FROM {_TRACKING_TABLE})")
+    database.execute_sql(f"UPDATE {_TRACKING_TABLE} SET enabled = 1")
+
+    enabled = f"(SELECT enabled FROM {_TRACKING_TABLE})"
+
+    for operation, row in (("INSERT", "NEW"), ("DELETE", "OLD")):
+        database.execute_sql(
+            f"CREATE TRIGGER IF NOT EXISTS bookmark_change_{operation.lower()} "
+            f"AFTER {operation} ON bookmark WHEN {enabled} BEGIN "
+            "INSERT INTO bookmark_change (bookmark_id, guid, operation) "
+            f"VALUES ({row}.id, {row}.guid, '{operation}'); END")
+
+    changed = " OR ".join(f'OLD."{column}" IS NOT NEW."{column}"'
+                          for column in _tracked_columns())
+    names = " || ".join(f"CASE WHEN OLD.\"{column}\" IS NOT NEW.\"{column}\" "
+                        f"THEN '{column},' ELSE '' END"
+                        for column in _NAMED_COLUMNS)
+    database.execute_sql(
+        "CREATE TRIGGER IF NOT EXISTS bookmark_change_update "
+        f"AFTER UPDATE ON bookmark WHEN {enabled} AND ({changed}) BEGIN "
+        'INSERT INTO bookmark_change (bookmark_id, guid, operation, "column") '
+        "VALUES (NEW.id, NEW.guid, 'UPDATE', "
+        f"rtrim(NULLIF({names}, ''), ',')); END")
+
+
+def untrack_changes(database: SqliteDatabase):
+    """Removes the triggers installed by `track_changes`
+
+    To pause logging for a while, use `untracked` instead.
+
+    Args:
+        database: The database holding both tables.
+    """
+
+    for operation in ("insert", "delete", "update"):
+        database.execute_sql(
+            f"DROP TRIGGER IF EXISTS bookmark_change_{operation}")
+
+
+@contextmanager
+def untracked(database: SqliteDatabase) -> Iterator[None]:
+    """Context manager, within which changes to `bookmark` are not logged
+
+    The triggers are switched off through a flag rather than dropped, and
+    the flag is restored on exit, even after an exception.
+
+    Args:
+        database: The database holding both tables.
+    """
+
+    (enabled, ) = database.execute_sql(
+        f"SELECT enabled FROM {_TRACKING_TABLE}").fetchone()
+    database.execute_sql(f"UPDATE {_TRACKING_TABLE} SET enabled = 0")
+    try:
+        yield
+    finally:
+        database.execute_sql(f"UPDATE {_TRACKING_TABLE} SET enabled = ?",
+                             (enabled, ))
+
+
+def build_closure(database: SqliteDatabase):
+    """Fills `bookmark_closure` from scratch, with a recursive query over `bookmark`
+
+    Args:
+        database: The database holding both tables.
+    """
+
+    database.execute_sql("DELETE FROM bookmark_closure")
+    database.execute_sql(
+        "INSERT INTO bookmark_closure (ancestor, descendant, depth) "
+        "WITH RECURSIVE pair (ancestor, descendant, depth) AS ("
+        "SELECT id, id, 0 FROM bookmark "
+        "UNION ALL "
+        "SELECT pair.ancestor, bookmark.id, pair.depth + 1 "
+        "FROM pair JOIN bookmark ON bookmark.parent_id = pair.descendant) "
+        "SELECT ancestor, descendant, depth FROM pair")
+
+
+def track_closure(database: SqliteDatabase):
+    """Installs triggers that keep `bookmark_closure` up to date as rows are inserted, deleted or moved
+
+    Args:
+        database: The database holding both tables.
+    """
+
+    database.execute_sql(
+        "CREATE TRIGGER IF NOT EXISTS bookmark_closure_insert "
+        "AFTER INSERT ON bookmark BEGIN "
+        "INSERT INTO bookmark_closure (ancestor, descendant, depth) "
+        "SELECT ancestor, NEW.id, depth + 1 FROM bookmark_closure "
+        "WHERE descendant = NEW.parent_id "
+        "UNION ALL SELECT NEW.id, NEW.id, 0; END")
+
+    database.execute_sql(
+        "CREATE TRIGGER IF NOT EXISTS bookmark_closure_delete "
+        "AFTER DELETE ON bookmark BEGIN "
+        "DELETE FROM bookmark_closure "
+        "WHERE ancestor = OLD.id OR descendant = OLD.id; END")
+
+    # Detach the moved subtree from its old ancestors, then attach it below
+    # each of its new ones
+    database.execute_sql(
+        "CREATE TRIGGER IF NOT EXISTS bookmark_closure_move "
+        "AFTER UPDATE OF parent_id ON bookmark "
+        "WHEN OLD.parent_id IS NOT NEW.parent_id BEGIN "
+        "DELETE FROM bookmark_closure "
+        "WHERE descendant IN ("
+        "SELECT descendant FROM bookmark_closure WHERE ancestor = NEW.id) "
+        "AND ancestor NOT IN ("
+        "SELECT descendant FROM bookmark_closure WHERE ancestor = NEW.id); "
+        "INSERT INTO bookmark_closure (ancestor, descendant, depth) "
+        "SELECT above.ancestor, below.descendant, "
+        "above.depth + below.depth + 1 "
+        "FROM bookmark_closure AS above, bookmark_closure AS below "
+        "WHERE above.descendant = NEW.parent_id "
+        "AND below.ancestor = NEW.id; END")
+
+
+def untrack_closure(database: SqliteDatabase):
+    """Removes the triggers installed by `track_closure`
+
+    Args:
+        database: The database holding both tables.
+    """
+
+    for operation in ("insert", "delete", "move"):
+        database.execute_sql(
+            f"DROP TRIGGER IF EXISTS bookmark_closure_{operation}")
+
+
+@contextmanager
+def rebuilding_closure(database: SqliteDatabase) -> Iterator[None]:
+    """Context manager, within which `bookmark_closure` is left alone, and after which it is rebuilt
+
+    Use around bulk loads, where rows may arrive before their parents.
+
+    Args:
+        database: The database holding both tables.
+    """
+
+    untrack_closure(database)
+    try:
+        yield
+    finally:
+        build_closure(database)
+        track_closure(database)
+
+
+def build_index(database: SqliteDatabase, index: type[FTS5Model]):
+    """Fills an FTS5 index over `bookmark` from scratch, from the current contents of `bookmark`
+
+    Args:
+        database: The database holding both tables.
+        index: `BookmarkSearch` or `BookmarkTrigrams`
+    """
+
+    table = index._meta.table_name
+    database.execute_sql(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+
+
+def track_index(database: SqliteDatabase, index: type[FTS5Model]):
+    """Installs triggers that keep an FTS5 index over `bookmark` in sync with it
+
+    Args:
+        database: The database holding both tables.
+        index: `BookmarkSearch` or `BookmarkTrigrams`
+    """
+
+    table = index._meta.table_name
+    indexed = _indexed_columns(index)
+    columns = ", ".join(indexed)
+    old = ", ".join(f"OLD.{column}" for column in indexed)
+    new = ", ".join(f"NEW.{column}" for column in indexed)
+
+    remove_old = (f"INSERT INTO {table} ({table}, rowid, {columns}) "
+                  f"VALUES ('delete', OLD.id, {old}); ")
+    add_new = (f"INSERT INTO {table} (rowid, {columns}) "
+               f"VALUES (NEW.id, {new}); ")
+
+    database.execute_sql(f"CREATE TRIGGER IF NOT EXISTS {table}_insert "
+                         f"AFTER INSERT ON bookmark BEGIN {add_new}END")
+    database.execute_sql(f"CREATE TRIGGER IF NOT EXISTS {table}_delete "
+                         f"AFTER DELETE ON bookmark BEGIN {remove_old}END")
+    database.execute_sql(f"CREATE TRIGGER IF NOT EXISTS {table}_update "
+                         f"AFTER UPDATE OF {columns} ON bookmark "
+                         f"BEGIN {remove_old}{add_new}END")
+
+
+def untrack_index(database: SqliteDatabase, index: type[FTS5Model]):
+    """Removes the triggers installed by `track_index`
+
+    Args:
+        database: The database holding both tables.
+        index: `BookmarkSearch` or `BookmarkTrigrams`
+    """
+
+    table = index._meta.table_name
+    for operation in ("insert", "delete", "update"):
+        database.execute_sql(f"DROP TRIGGER IF EXISTS {table}_{operation}")
+
+
+@contextmanager
+def rebuilding_index(
+    database: SqliteDatabase,
+    index: type[FTS5Model],
+) -> Iterator[None]:
+    """Context manager, within which an FTS5 index over `bookmark` is left alone, and after which it is rebuilt
+
+    Args:
+        database: The database holding both tables.
+        index: `BookmarkSearch` or `BookmarkTrigrams`
+    """
+
+    untrack_index(database, index)
+    try:
+        yield
+    finally:
+        build_index(database, index)
+        track_index(database, index)
+
+
+def _indexed_columns(index: type[FTS5Model]) -> list[str]:
+    return [
+        field.column_name for field in index._meta.sorted_fields
+        if field is not index.rowid
+    ]
+
+
+def trigrams(text: str | None) -> set[str]:
+    """Lists the distinct, lowercased, three-character substrings of a string
+
+    Args:
+        text: The string, which may be `None`
+
+    Returns:
+        Set of trigrams
+    """
+
+    text = (text or "").lower()
+    return {text[idx:idx + 3] for idx in range(len(text) - 2)}
+
+
+def index_trigrams(
+    database: SqliteDatabase,
+    ids: Iterable[int] | None = None,
+):
+    """Fills `bookmark_trigram_list` for some or all rows in `bookmark`
+
+    Args:
+        database: The database holding both tables.
+        ids: `id`s of the rows to index again, e.g. because they changed. \
+        Defaults to `None`, which indexes all rows from scratch.
+    """
+
+    if ids is None:
+        BookmarkTrigram.delete().execute()
+        sources = [Bookmark.select(Bookmark.id, Bookmark.title, Bookmark.url)]
+    else:
+        sources = []
+        for chunk in chunked(ids, MAX_QUERY_PARAMETERS):
+            BookmarkTrigram \
+                .delete() \
+                .where(BookmarkTrigram.bookmark_id.in_(chunk)) \
+                .execute()
+            sources.append(
+                Bookmark \
+                    .select(Bookmark.id, Bookmark.title, Bookmark.url) \
+                    .where(Bookmark.id.in_(chunk)))
+
+    # There are dozens of trigrams per row, too many to insert through models
+    rows = ((column, trigram, id_) for source in sources
+            for id_, title, url in source.tuples().iterator()
+            for column, text in (("title", title), ("url", url))
+            for trigram in trigrams(text))
+    database.cursor().executemany(
+        "INSERT INTO bookmark_trigram_list (column, trigram, bookmark_id) "
+        "VALUES (?, ?, ?)",
+        rows,
+    )
+
+
+# One-row table holding the flag that switches the change triggers on and off
+_TRACKING_TABLE = "bookmark_change_tracking"
+
+# Columns whose names are logged with updates, for the trigram index
+_NAMED_COLUMNS = ("title", "url")
+
+
+def _tracked_columns() -> list[str]:
+    # Paths are derived from other columns, so changes to them are not changes
+    return [
+        field.column_name for field in Bookmark._meta.sorted_fields
+        if field is not Bookmark.materialized_path
+    ]
+
+
+def connect_bookmark_model(
+    *,
+    db_path: str,
+    database: SqliteDatabase | None = None,
+    closure_table: bool = False,
+) -> SqliteDatabase:
     """Connects the `Bookmark` model to the database at the given path
 
     Args:
-        db_path: Path of the database to connect to.
+        db_path: Path or `file:` URI of the database to connect to.
+        database: A dummy pre-existing `SqliteDatabase` object to be \
+        initialized with the path, which the models must be bound to \
+        through `bookmark_database`. If not supplied, the module's own \
+        database is used, and becomes what the models use by default.
+        closure_table: If `True`, the `bookmark_closure` table is created \
+        too. Defaults to `False`.
     """
 
-    database_obj.init(db_path)
-    database_obj.connect(reuse_if_open=True)
-    database_obj.create_tables([Bookmark])
+    if database is None:
+        database = database_obj
+        bookmark_database.reset()
+
+    database.init(db_path, uri=True)
+    database.connect(reuse_if_open=True)
+    with bookmark_database.bound(database):
+        database.create_tables([Bookmark, BookmarkChange])
+        if closure_table:
+            database.create_tables([BookmarkClosure])
+    track_changes(database)
 
-    return database_obj
+    return database
 
 
 __all__ = [
     'Bookmark',
+    'bookmark_database',
+    'BookmarkChange',
+    'BookmarkClosure',
+    'BookmarkRecord',
+    'BookmarkSearch',
+    'BookmarkTrigram',
+    'BookmarkTrigrams',
+    'ProfileBookmarkRecord',
+    'bookmark_paths',
+    'build_closure',
+    'build_index',
     'connect_bookmark_model',
+    'index_trigrams',
+    'rebuilding_closure',
+    'rebuilding_index',
+    'subtree_paths',
+    'track_changes',
+    'track_closure',
+    'track_index',
+    'trigrams',
+    'untrack_changes',
+    'untrack_closure',
+    'untrack_index',
+    'untracked',
 ]
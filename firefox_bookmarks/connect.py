@@ -1,19 +1,47 @@
+import os
+import pathlib
 import shutil
+import sqlite3
 import tempfile
+import time
 import warnings
+import weakref
+from contextlib import closing, contextmanager
+from typing import Callable, Iterator
 
 from peewee import OperationalError, SqliteDatabase
 
-from .constants import ProfileCriterion
+from .constants import (
+    BACKUP_PAGES,
+    BACKUP_RETRIES,
+    BACKUP_SLEEP,
+    MMAP_SIZE,
+    ProfileCriterion,
+)
 from .locate import locate_db
 
+Progress = Callable[[int, int, int], object]
+
+_SQLITE_BUSY = 5
+_SQLITE_LOCKED = 6
+
+# Temporary duplicates made by read-only connections, removed when the
+# connection is closed through `close_places_db`, or else on exit
+_temp_copies: weakref.WeakKeyDictionary[SqliteDatabase, weakref.finalize] = \
+    weakref.WeakKeyDictionary()
+
 
 def connect_to_places_db(
     *,
     database: SqliteDatabase | None = None,
+    db_path: str | None = None,
     look_under_path: str | None = None,
     criterion: ProfileCriterion = ProfileCriterion.LATEST,
     readonly: bool = False,
+    immutable: bool = False,
+    pages: int = BACKUP_PAGES,
+    progress: Progress | None = None,
+    sleep: float = BACKUP_SLEEP,
 ) -> SqliteDatabase:
     """Connects to a Places database according to the chosen criterion
 
@@ -21,34 +49,50 @@ def connect_to_places_db(
         database: A dummy pre-existing `SqliteDatabase` object to be \
         initialized with the actual path. If not supplied, a new one is \
         created.
+        db_path: Path of the Places database. If supplied, no profile is \
+        searched for, and `look_under_path` and `criterion` are ignored.
         look_under_path: Path from where to start searching. \
         If not supplied, looks under default profiles directory.
         criterion: Which profile to choose, in case there are multiple. \
         Defaults to `ProfileCriterion.LATEST`.
-        readonly: If `True`, connects to a temporary duplicate of the \
-        database, which will not be synced with the original. Defaults to `False`.
+        readonly: If `True`, opens the database in read-only, memory-mapped \
+        mode. If it is locked, connects to a temporary duplicate instead, \
+        which is removed by `close_places_db`. Defaults to `False`.
+        immutable: Read-only mode only. If `True`, tells SQLite that the \
+        database cannot change, so that it skips locking altogether. Only \
+        use this while Firefox is not running. Defaults to `False`.
+        pages: Read-only mode only. Number of pages to copy per step. \
+        Defaults to `BACKUP_PAGES`.
+        progress: Read-only mode only. Called after each step, with the \
+        status, and the remaining and total number of pages. Defaults to `None`.
+        sleep: Read-only mode only. Seconds to wait between steps. \
+        Defaults to `BACKUP_SLEEP`.
 
     Returns:
         A connection to the Places database under the chosen profile
     """
 
-    db_path = locate_db(look_under_path=look_under_path, criterion=criterion)
+    if db_path is None:
+        db_path = locate_db(
+            look_under_path=look_under_path,
+            criterion=criterion,
+        )
+
+    if database is None:
+        database = SqliteDatabase(None)
 
     if readonly:
-        temp_db_path = tempfile.mkstemp()[1]
-        shutil.copyfile(db_path, temp_db_path)
-        db_path = temp_db_path
-        warnings.warn(
-            "Connected to a temporary duplicate of the Places database. " + \
-            "Any changes made will not be synced with the original. " + \
-            f"Please run `os.remove(r'{temp_db_path}')` to clean up before exit.",
+        return _connect_readonly(
+            database,
+            db_path,
+            immutable=immutable,
+            pages=pages,
+            progress=progress,
+            sleep=sleep,
         )
 
     try:
-        if database is None:
-            database = SqliteDatabase(db_path)
-        else:
-            database.init(db_path)
+        database.init(db_path)
     except OperationalError:
         raise Exception(
             "Could not connect to Places database due to sqlite error. " + \
@@ -61,7 +105,154 @@ def connect_to_places_db(
     return database
 
 
+def _connect_readonly(
+    database: SqliteDatabase,
+    db_path: str,
+    *,
+    immutable: bool,
+    pages: int,
+    progress: Progress | None,
+    sleep: float,
+) -> SqliteDatabase:
+    uri = pathlib.Path(db_path).absolute().as_uri() + "?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+
+    database.init(uri, uri=True, pragmas={"mmap_size": MMAP_SIZE})
+    try:
+        database.connect(reuse_if_open=True)
+        # Opening is lazy, so read something to find out about locks
+        database.execute_sql("SELECT COUNT(*) FROM sqlite_master")
+        return database
+    except OperationalError:
+        database.close()
+
+    temp_db_path = tempfile.mkstemp(suffix=".sqlite")[1]
+    try:
+        # Fails fast, as copying the files is the fallback
+        copy_database(
+            db_path,
+            temp_db_path,
+            pages=pages,
+            progress=progress,
+            sleep=sleep,
+            retries=0,
+        )
+    except sqlite3.OperationalError:
+        # An exclusive lock, as held by a running Firefox, keeps out even the
+        # backup API, so copy the files as they are
+        shutil.copyfile(db_path, temp_db_path)
+        if os.path.exists(db_path + "-wal"):
+            shutil.copyfile(db_path + "-wal", temp_db_path + "-wal")
+
+    warnings.warn(
+        "The Places database is locked, so connected to a temporary " + \
+        "duplicate of it instead. It will be removed on `close_places_db`.",
+    )
+
+    database.init(temp_db_path, pragmas={"mmap_size": MMAP_SIZE})
+    database.connect(reuse_if_open=True)
+    _temp_copies[database] = weakref.finalize(
+        database,
+        _remove_copy,
+        temp_db_path,
+    )
+
+    return database
+
+
+def close_places_db(database: SqliteDatabase):
+    """Closes a connection to a Places database, and removes the temporary duplicate it was connected to, if any
+
+    Args:
+        database: A connection returned by `connect_to_places_db`
+    """
+
+    database.close()
+
+    finalizer = _temp_copies.pop(database, None)
+    if finalizer is not None:
+        finalizer()
+
+
+@contextmanager
+def places_db(**kwargs) -> Iterator[SqliteDatabase]:
+    """Context manager around `connect_to_places_db` and `close_places_db`
+
+    Args:
+        **kwargs: Passed on to `connect_to_places_db`
+    """
+
+    database = connect_to_places_db(**kwargs)
+    try:
+        yield database
+    finally:
+        close_places_db(database)
+
+
+def _remove_copy(db_path: str):
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def copy_database(
+    source_path: str,
+    target_path: str,
+    *,
+    pages: int = BACKUP_PAGES,
+    progress: Progress | None = None,
+    sleep: float = BACKUP_SLEEP,
+    retries: int = BACKUP_RETRIES,
+):
+    """Copies a database through the SQLite online backup API
+
+    Unlike copying the file, this includes changes still in the source's
+    write-ahead log, and yields a consistent snapshot even if the source is
+    written to meanwhile. The source is only locked while each step runs.
+
+    Args:
+        source_path: Path of the database to copy
+        target_path: Path to copy the database to. Overwritten if it exists.
+        pages: Number of pages to copy per step. Defaults to `BACKUP_PAGES`.
+        progress: Called after each step, with the status, and the remaining \
+        and total number of pages. Defaults to `None`.
+        sleep: Seconds to wait between steps. Defaults to `BACKUP_SLEEP`.
+        retries: Number of times in a row to retry a step that finds the \
+        source locked, `sleep` seconds apart. Defaults to `BACKUP_RETRIES`.
+
+    Raises:
+        sqlite3.OperationalError: If the source stays locked
+    """
+
+    busy = 0
+
+    def after_step(status: int, remaining: int, total: int):
+        nonlocal busy
+        # SQLite would otherwise retry the step for as long as the lock is held
+        if status in (_SQLITE_BUSY, _SQLITE_LOCKED):
+            busy += 1
+            if busy > retries:
+                raise sqlite3.OperationalError("database is locked")
+            # The backup API sleeps before retrying
+            return
+        busy = 0
+
+        if progress is not None:
+            progress(status, remaining, total)
+        if remaining:
+            time.sleep(sleep)
+
+    # Without a busy timeout, so that `retries` alone bounds the wait
+    with closing(sqlite3.connect(source_path, timeout=0)) as source, \
+            closing(sqlite3.connect(target_path)) as target:
+        source.backup(target, pages=pages, progress=after_step, sleep=sleep)
+
+
 __all__ = [
     'connect_to_places_db',
+    'close_places_db',
+    'places_db',
+    'copy_database',
     'ProfileCriterion',  # For convenience
 ]
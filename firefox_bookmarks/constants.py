@@ -8,13 +8,125 @@ class ProfileCriterion(Enum):
     LATEST = "Choose the profile with the most recent changes in its Places DB"
 
 
+class LoadEngine(Enum):
+    """Strategies to copy the Places database into the duplicate database"""
+
+    ATTACH = "Attach the Places DB and copy all rows with one INSERT ... SELECT"
+    BATCH = "Copy rows through Python in batches of `BATCH_SIZE` ids"
+
+
+class Source(Enum):
+    """Places to load bookmarks from"""
+
+    PLACES = "places"
+    JSONLZ4 = "jsonlz4"
+
+
+class Storage(Enum):
+    """Places to keep the duplicate database in"""
+
+    DISK = "disk"
+    MEMORY = "memory"
+
+
+class RowType(Enum):
+    """Forms that streamed rows take"""
+
+    MODEL = "model"
+    RECORD = "record"
+    TUPLE = "tuple"
+    DICT = "dict"
+    NAMEDTUPLE = "namedtuple"
+
+
+class OutputFormat(Enum):
+    """Formats to write merged bookmarks in"""
+
+    JSON = "json"
+    SQLITE = "sqlite"
+
+
+class ExportFormat(Enum):
+    """Formats to export bookmarks in"""
+
+    HTML = "html"
+    JSON = "json"
+    CSV = "csv"
+
+
+BACKUP_CHUNK_SIZE = 64 * 1024
+BACKUP_DIR_NAME = "firefox_bookmarks_backups"
+BACKUP_PAGES = 1024
+BACKUP_RETRIES = 500
+BACKUP_SLEEP = 0.01
+BOOKMARK_BACKUPS_DIR_NAME = "bookmarkbackups"
 BATCH_SIZE = 100
+EXTRACT_CHUNK_SIZE = 10000
+FETCH_SIZE = 1000
+MAX_QUERY_PARAMETERS = 999
+MMAP_SIZE = 256 * 1024 * 1024
+TRIGRAM_COUNT_LIMIT = 1000
+TRIGRAMS_PER_MATCH = 3
+PLACES_SCHEMA = "places"
 BOOKMARK_TYPE = 1
 FOLDER_TYPE = 2
+SEPARATOR_TYPE = 3
+SYNC_STATUS_NEW = 1
+SYNC_STATUS_NORMAL = 2
+ROOT_GUIDS = frozenset((
+    "root________",
+    "menu________",
+    "toolbar_____",
+    "tags________",
+    "unfiled_____",
+    "mobile______",
+))
+GZIP_LEVEL = 6
+MAX_WALK_DEPTH = 3
+SKIPPED_DIR_NAMES = frozenset((
+    BOOKMARK_BACKUPS_DIR_NAME,
+    "cache2",
+    "crashes",
+    "datareporting",
+    BACKUP_DIR_NAME,
+    "minidumps",
+    "safebrowsing",
+    "saved-telemetry-pings",
+    "sessionstore-backups",
+    "startupCache",
+    "storage",
+    "thumbnails",
+))
 
 __all__ = [
     'ProfileCriterion',
+    'LoadEngine',
+    'Source',
+    'Storage',
+    'RowType',
+    'OutputFormat',
+    'ExportFormat',
+    'BACKUP_CHUNK_SIZE',
+    'BACKUP_DIR_NAME',
+    'BACKUP_PAGES',
+    'BACKUP_RETRIES',
+    'BACKUP_SLEEP',
+    'BOOKMARK_BACKUPS_DIR_NAME',
     'BATCH_SIZE',
+    'EXTRACT_CHUNK_SIZE',
+    'FETCH_SIZE',
+    'MAX_QUERY_PARAMETERS',
+    'MMAP_SIZE',
+    'TRIGRAM_COUNT_LIMIT',
+    'TRIGRAMS_PER_MATCH',
+    'PLACES_SCHEMA',
     'BOOKMARK_TYPE',
     'FOLDER_TYPE',
+    'SEPARATOR_TYPE',
+    'SYNC_STATUS_NEW',
+    'SYNC_STATUS_NORMAL',
+    'ROOT_GUIDS',
+    'GZIP_LEVEL',
+    'MAX_WALK_DEPTH',
+    'SKIPPED_DIR_NAMES',
 ]
@@ -0,0 +1,370 @@
+import csv
+import gzip
+import html
+import json
+from time import perf_counter
+from typing import IO, Iterable, Iterator
+
+from peewee import JOIN, Value, fn
+
+from .bookmark import Bookmark, bookmark_paths
+from .constants import (
+    BOOKMARK_TYPE,
+    FOLDER_TYPE,
+    GZIP_LEVEL,
+    SEPARATOR_TYPE,
+    ExportFormat,
+)
+from .reports import ExportReport
+
+# Fields that exports are made of
+EXPORT_FIELDS = (
+    Bookmark.id,
+    Bookmark.type,
+    Bookmark.parent,
+    Bookmark.position,
+    Bookmark.title,
+    Bookmark.url,
+    Bookmark.guid,
+    Bookmark.date_added,
+    Bookmark.last_modified,
+)
+
+TAGS_GUID = "tags________"
+
+# Root folder `guid` -> name of the root in Firefox's JSON backups
+_JSON_ROOTS = {
+    "root________": "placesRoot",
+    "menu________": "bookmarksMenuFolder",
+    "toolbar_____": "toolbarFolder",
+    TAGS_GUID: "tagsFolder",
+    "unfiled_____": "unfiledBookmarksFolder",
+    "mobile______": "mobileFolder",
+}
+
+# Root folder `guid` -> (title, attribute) in Netscape bookmark files
+_HTML_ROOTS = {
+    "menu________": ("Bookmarks Menu", ""),
+    "toolbar_____": ("Bookmarks Toolbar", ' PERSONAL_TOOLBAR_FOLDER="true"'),
+    "unfiled_____": ("Other Bookmarks", ' UNFILED_BOOKMARKS_FOLDER="true"'),
+    "mobile______": ("Mobile Bookmarks", ""),
+}
+
+_JSON_TYPES = {
+    BOOKMARK_TYPE: "text/x-moz-place",
+    FOLDER_TYPE: "text/x-moz-place-container",
+    SEPARATOR_TYPE: "text/x-moz-place-separator",
+}
+
+_HTML_HEADER = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<!-- This is an automatically generated file.
+     It will be read and overwritten.
+     DO NOT EDIT! -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+
+<DL><p>
+"""
+
+_CSV_HEADER = (
+    "id",
+    "guid",
+    "type",
+    "title",
+    "url",
+    "path",
+    "position",
+    "date_added",
+    "last_modified",
+)
+
+# Position of each column in the rows that `_tree_rows` yields
+_DEPTH, _ID, _TYPE, _TITLE, _URL, _GUID, _POSITION, _ADDED, _MODIFIED, \
+    _PATH = range(10)
+
+
+def export_bookmarks(
+    output_path: str,
+    *,
+    output_format: ExportFormat | str | None = None,
+    compress: bool | None = None,
+) -> ExportReport:
+    """Writes every row of `bookmark` to a file, in the order they appear in the bookmark tree
+
+    Rows are streamed from a single recursive query and written as they \
+    arrive, so memory use does not grow with the number of bookmarks. \
+    Needs `Bookmark` to be connected, e.g. by `FirefoxBookmarks.connect`.
+
+    Args:
+        output_path: Where to write the bookmarks. Overwritten if it exists.
+        output_format: `ExportFormat.HTML` writes a Netscape bookmark file, \
+        which browsers can import, `ExportFormat.JSON` writes the nested \
+        format of Firefox's bookmark backups, and `ExportFormat.CSV` \
+        writes a row per bookmark, folder and separator, with its path. \
+        Defaults to the format named by the extension of `output_path`, \
+        ignoring any `.gz`.
+        compress: If `True`, the file is compressed with gzip as it is \
+        written. Defaults to whether `output_path` ends in `.gz`.
+
+    Returns:
+        Format and number of rows written, and the time it took
+    """
+
+    start = perf_counter()
+
+    if compress is None:
+        compress = output_path.lower().endswith(".gz")
+    if output_format is None:
+        output_format = _format_of(output_path)
+    output_format = ExportFormat(output_format)
+
+    rows = _tree_rows(
+        with_tags=output_format == ExportFormat.JSON,
+        with_paths=output_format == ExportFormat.CSV,
+    )
+
+    with _open(output_path, compress=compress) as output:
+        if output_format == ExportFormat.HTML:
+            written = _write_html(output, rows)
+        elif output_format == ExportFormat.JSON:
+            written = _write_json(output, rows)
+        else:
+            written = _write_csv(output, rows)
+
+    return ExportReport(
+        format=output_format,
+        rows=written,
+        seconds=perf_counter() - start,
+    )
+
+
+def _format_of(output_path: str) -> ExportFormat:
+    name = output_path.lower().removesuffix(".gz")
+    extension = name.rsplit(".", 1)[-1]
+    if extension == "htm":
+        extension = "html"
+
+    try:
+        return ExportFormat(extension)
+    except ValueError:
+        raise ValueError(
+            f"Cannot tell the format of {output_path!r}. " + \
+            "Pass `output_format`.",
+        ) from None
+
+
+def _open(output_path: str, *, compress: bool) -> IO[str]:
+    # `newline=""` leaves line endings to the writers, as `csv` requires
+    if compress:
+        return gzip.open(
+            output_path,
+            "wt",
+            compresslevel=GZIP_LEVEL,
+            encoding="utf-8",
+            newline="",
+        )
+    return open(output_path, "w", encoding="utf-8", newline="")
+
+
+def _tree_rows(*, with_tags: bool, with_paths: bool) -> Iterator[tuple]:
+    """Streams every row of `bookmark` with its depth, parents before children and siblings by `position`
+
+    Each row is ordered by a key made of the positions of its ancestors and
+    itself, so a single sort puts the whole tree in depth-first order.
+    """
+
+    root = Bookmark \
+        .select(Bookmark.id, Value(0), Value("")) \
+        .where(Bookmark.parent.is_null() | (Bookmark.parent == 0))
+    tree = root.cte(
+        "bookmark_tree",
+        recursive=True,
+        columns=("id", "depth", "sort_key"),
+    )
+
+    child = Bookmark.alias()
+    children = child \
+        .select(
+            child.id,
+            tree.c.depth + 1,
+            tree.c.sort_key.concat(
+                fn.printf("%010d%010d", fn.COALESCE(child.position, 0),
+                          child.id)),
+        ) \
+        .join(tree, on=(child.parent == tree.c.id))
+    if not with_tags:
+        children = children.where(child.guid != TAGS_GUID)
+    tree = tree.union_all(children)
+
+    ctes = [tree]
+    path = Value(None)
+    if with_paths:
+        paths = bookmark_paths()
+        ctes.append(paths)
+        path = paths.c.path
+
+    selected = Bookmark \
+        .select(
+            tree.c.depth,
+            Bookmark.id,
+            Bookmark.type,
+            Bookmark.title,
+            Bookmark.url,
+            Bookmark.guid,
+            Bookmark.position,
+            Bookmark.date_added,
+            Bookmark.last_modified,
+            path,
+        ) \
+        .join(tree, on=(tree.c.id == Bookmark.id))
+    if with_paths:
+        selected = selected.join(
+            paths,
+            join_type=JOIN.LEFT_OUTER,
+            on=(paths.c.id == Bookmark.id),
+        )
+
+    return selected \
+        .order_by(tree.c.sort_key) \
+        .with_cte(*ctes) \
+        .tuples() \
+        .iterator()
+
+
+def _closing_folders(open_depths: list[int], depth: int) -> Iterator[int]:
+    """Pops and yields the depths of the open folders that a row at `depth` is outside of"""
+
+    while open_depths and open_depths[-1] >= depth:
+        yield open_depths.pop()
+
+
+def _write_html(output: IO[str], rows: Iterable[tuple]) -> int:
+    output.write(_HTML_HEADER)
+    open_depths: list[int] = []
+    written = 0
+
+    for row in rows:
+        depth = row[_DEPTH]
+        if depth == 0:
+            # The root folder is the file itself
+            continue
+
+        for closed in _closing_folders(open_depths, depth):
+            output.write(f"{_indent(closed)}</DL><p>\n")
+
+        indent = _indent(depth)
+        title = html.escape(row[_TITLE] or "")
+        dates = _html_dates(row)
+        if row[_TYPE] == FOLDER_TYPE:
+            if depth == 1 and row[_GUID] in _HTML_ROOTS:
+                # Browsers recognise the toolbar and others by attribute
+                title, attribute = _HTML_ROOTS[row[_GUID]]
+                dates += attribute
+            output.write(f"{indent}<DT><H3{dates}>{title}</H3>\n"
+                         f"{indent}<DL><p>\n")
+            open_depths.append(depth)
+        elif row[_TYPE] == SEPARATOR_TYPE:
+            output.write(f"{indent}<HR>\n")
+        else:
+            url = html.escape(row[_URL] or "")
+            output.write(f'{indent}<DT><A HREF="{url}"{dates}>{title}</A>\n')
+        written += 1
+
+    for closed in _closing_folders(open_depths, 0):
+        output.write(f"{_indent(closed)}</DL><p>\n")
+    output.write("</DL>\n")
+
+    return written
+
+
+def _indent(depth: int) -> str:
+    return "    " * depth
+
+
+def _html_dates(row: tuple) -> str:
+    # Netscape bookmark files count seconds, where Places counts microseconds
+    dates = ""
+    if row[_ADDED] is not None:
+        dates += f' ADD_DATE="{row[_ADDED] // 1_000_000}"'
+    if row[_MODIFIED] is not None:
+        dates += f' LAST_MODIFIED="{row[_MODIFIED] // 1_000_000}"'
+    return dates
+
+
+def _write_json(output: IO[str], rows: Iterable[tuple]) -> int:
+    open_depths: list[int] = []
+    first = True
+    written = 0
+
+    for row in rows:
+        depth = row[_DEPTH]
+        for _ in _closing_folders(open_depths, depth):
+            output.write("]}")
+            first = False
+
+        if not first:
+            output.write(",")
+        first = False
+
+        node = {
+            "guid": row[_GUID],
+            "title": row[_TITLE] or "",
+            "index": row[_POSITION] or 0,
+            "dateAdded": row[_ADDED],
+            "lastModified": row[_MODIFIED],
+            "id": row[_ID],
+            "typeCode": row[_TYPE],
+            "type": _JSON_TYPES.get(row[_TYPE], _JSON_TYPES[BOOKMARK_TYPE]),
+        }
+        if row[_GUID] in _JSON_ROOTS:
+            node["root"] = _JSON_ROOTS[row[_GUID]]
+        if row[_TYPE] == BOOKMARK_TYPE:
+            node["uri"] = row[_URL]
+
+        encoded = json.dumps(node, ensure_ascii=False)
+        if row[_TYPE] == FOLDER_TYPE:
+            # Left open, for the children that follow
+            output.write(encoded[:-1] + ', "children": [')
+            open_depths.append(depth)
+            first = True
+        else:
+            output.write(encoded)
+        written += 1
+
+    for _ in _closing_folders(open_depths, 0):
+        output.write("]}")
+    output.write("\n")
+
+    return written
+
+
+def _write_csv(output: IO[str], rows: Iterable[tuple]) -> int:
+    writer = csv.writer(output)
+    writer.writerow(_CSV_HEADER)
+    written = 0
+
+    for row in rows:
+        if row[_DEPTH] == 0:
+            continue
+        writer.writerow((
+            row[_ID],
+            row[_GUID],
+            row[_TYPE],
+            row[_TITLE],
+            row[_URL],
+            row[_PATH],
+            row[_POSITION],
+            row[_ADDED],
+            row[_MODIFIED],
+        ))
+        written += 1
+
+    return written
+
+
+__all__ = [
+    'export_bookmarks',
+    'EXPORT_FIELDS',
+    'ExportFormat',  # For convenience
+]
@@ -0,0 +1,152 @@
+import gzip
+import json
+from html.parser import HTMLParser
+from typing import IO, Any, Iterator
+
+from .constants import BOOKMARK_TYPE, FOLDER_TYPE, SEPARATOR_TYPE
+
+# Number of characters of a Netscape bookmark file to parse at a time
+READ_SIZE = 64 * 1024
+
+# `root` of the folders in Firefox's JSON backups that are left out
+_SKIPPED_JSON_ROOTS = frozenset(("tagsFolder", ))
+
+# `type` of the nodes in Firefox's JSON backups -> `type` in Places
+JSON_TYPES = {
+    "text/x-moz-place": BOOKMARK_TYPE,
+    "text/x-moz-place-container": FOLDER_TYPE,
+    "text/x-moz-place-separator": SEPARATOR_TYPE,
+}
+
+ImportedRow = tuple[int, dict[str, Any]]
+
+
+def open_text(path: str) -> IO[str]:
+    """Opens a file to import from, decompressing it with gzip if its name ends in `.gz`"""
+
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def read_html(file: IO[str]) -> Iterator[ImportedRow]:
+    """Reads a Netscape bookmark file, as browsers export, a chunk at a time
+
+    Args:
+        file: The file, opened in text mode
+
+    Returns:
+        Iterator over each bookmark, folder and separator, parents before \
+        children. Each is a pair of its depth, where 0 is the top level, and \
+        a `dict` of `type`, `title`, `url`, `date_added` and `last_modified`.
+    """
+
+    parser = _NetscapeParser()
+    while chunk := file.read(READ_SIZE):
+        parser.feed(chunk)
+        yield from parser.pop_rows()
+    parser.close()
+    yield from parser.pop_rows()
+
+
+class _NetscapeParser(HTMLParser):
+
+    def __init__(self):
+        super().__init__()
+        self._rows: list[ImportedRow] = []
+        # Number of `<DL>`s open. The file's own list makes it 1.
+        self._lists = 0
+        # Row whose title is being read, until its tag closes
+        self._titled: dict[str, Any] | None = None
+
+    def pop_rows(self) -> list[ImportedRow]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        attributes = dict(attrs)
+        depth = max(self._lists - 1, 0)
+
+        if tag == "dl":
+            self._lists += 1
+        elif tag == "h3":
+            self._titled = _html_row(FOLDER_TYPE, attributes)
+            self._rows.append((depth, self._titled))
+        elif tag == "a":
+            self._titled = _html_row(BOOKMARK_TYPE, attributes)
+            self._titled["url"] = attributes.get("href")
+            self._rows.append((depth, self._titled))
+        elif tag == "hr":
+            self._rows.append((depth, _html_row(SEPARATOR_TYPE, attributes)))
+
+    def handle_endtag(self, tag: str):
+        if tag == "dl":
+            self._lists = max(self._lists - 1, 0)
+        elif tag in ("h3", "a"):
+            self._titled = None
+
+    def handle_data(self, data: str):
+        if self._titled is not None:
+            self._titled["title"] = (self._titled["title"] or "") + data
+
+
+def _html_row(type_: int, attributes: dict[str, str | None]) -> dict[str, Any]:
+    return {
+        "type": type_,
+        "title": None,
+        "url": None,
+        "date_added": _microseconds(attributes.get("add_date")),
+        "last_modified": _microseconds(attributes.get("last_modified")),
+    }
+
+
+def _microseconds(seconds: str | None) -> int | None:
+    # Netscape bookmark files count seconds, where Places counts microseconds
+    try:
+        return int(seconds) * 1_000_000 if seconds else None
+    except ValueError:
+        return None
+
+
+def read_json(file: IO[str]) -> Iterator[ImportedRow]:
+    """Reads a bookmark backup in Firefox's JSON format
+
+    The outermost folder, and the tags folder, are left out.
+
+    Args:
+        file: The file, opened in text mode
+
+    Returns:
+        Iterator over each bookmark, folder and separator, parents before \
+        children, in the same form as `read_html`
+    """
+
+    tree = json.load(file)
+    for child in tree.get("children", []):
+        yield from _json_rows(child, 0)
+
+
+def _json_rows(node: dict[str, Any], depth: int) -> Iterator[ImportedRow]:
+    if node.get("root") in _SKIPPED_JSON_ROOTS:
+        return
+
+    type_ = JSON_TYPES.get(node.get("type"), BOOKMARK_TYPE)
+    yield depth, {
+        "type": type_,
+        "title": node.get("title") or None,
+        "url": node.get("uri") if type_ == BOOKMARK_TYPE else None,
+        "date_added": node.get("dateAdded"),
+        "last_modified": node.get("lastModified"),
+    }
+
+    for child in node.get("children", []):
+        yield from _json_rows(child, depth + 1)
+
+
+__all__ = [
+    'open_text',
+    'read_html',
+    'read_json',
+    'ImportedRow',
+    'JSON_TYPES',
+]
@@ -0,0 +1,196 @@
+import json
+from typing import Any, Iterator
+
+from .bookmark import Bookmark
+from .constants import BOOKMARK_TYPE
+from .importers import JSON_TYPES
+from .urls import hash_url, reverse_host, split_origin
+
+# First bytes of every mozLz4 file, before the decompressed size
+MOZLZ4_MAGIC = b"mozLz40\0"
+
+# Fields of `bookmark` that Firefox's JSON backups hold, in the order of the
+# rows that `read_jsonlz4` yields
+SNAPSHOT_FIELDS = (
+    Bookmark.id,
+    Bookmark.guid,
+    Bookmark.title,
+    Bookmark.url,
+    Bookmark.type,
+    Bookmark.parent,
+    Bookmark.position,
+    Bookmark.date_added,
+    Bookmark.last_modified,
+)
+
+# Fields of `bookmark` that follow from `url`, in the order that
+# `url_columns` returns them
+URL_FIELDS = (
+    Bookmark.url_hash,
+    Bookmark.rev_host,
+    Bookmark.origin_prefix,
+    Bookmark.origin_host,
+)
+
+# `parent` of the root folder in Places
+_ROOT_PARENT = 0
+
+# Shortest match that LZ4 encodes, which match lengths are counted from
+_MIN_MATCH = 4
+
+
+def read_jsonlz4(path: str) -> Iterator[tuple]:
+    """Reads a bookmark backup that Firefox keeps under `bookmarkbackups` into rows of `bookmark`
+
+    Args:
+        path: Path of the `.jsonlz4` file
+
+    Returns:
+        Iterator over a tuple of `SNAPSHOT_FIELDS` for each bookmark, folder \
+        and separator, with the `id`s they have in Places, parents before \
+        children
+    """
+
+    tree = json.loads(read_mozlz4(path))
+    return _snapshot_rows(tree)
+
+
+def url_columns(url: str) -> tuple:
+    """Computes the values of `URL_FIELDS` for a URL, as Places stores them
+
+    Args:
+        url: The URL
+
+    Returns:
+        Its `url_hash`, `rev_host`, and the `prefix` and `host` of its origin
+    """
+
+    return hash_url(url), reverse_host(url), *split_origin(url)
+
+
+def read_mozlz4(path: str) -> bytes:
+    """Reads and decompresses a file in Mozilla's mozLz4 format, an LZ4 block behind a small header
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        The decompressed contents
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if not data.startswith(MOZLZ4_MAGIC):
+        raise ValueError(f"{path!r} is not a mozLz4 file")
+
+    header = len(MOZLZ4_MAGIC)
+    size = int.from_bytes(data[header:header + 4], "little")
+
+    return decompress_block(data[header + 4:], size=size)
+
+
+def decompress_block(block: bytes, *, size: int) -> bytes:
+    """Decompresses a single LZ4 block, as the LZ4 block format specifies
+
+    Args:
+        block: The compressed block
+        size: Size of the decompressed data
+
+    Returns:
+        The decompressed data
+    """
+
+    output = bytearray()
+    position = 0
+
+    try:
+        while position < len(block):
+            token = block[position]
+            position += 1
+
+            # Literals, copied as they are
+            length = token >> 4
+            if length == 15:
+                length, position = _extended_length(block, position, length)
+            if position + length > len(block):
+                raise ValueError("LZ4 block ends within its literals")
+            output += block[position:position + length]
+            position += length
+
+            # The last sequence has no match
+            if position == len(block):
+                break
+
+            # Match, copied from `offset` bytes back in the output
+            offset = block[position] | (block[position + 1] << 8)
+            position += 2
+            if not 0 < offset <= len(output):
+                raise ValueError(f"LZ4 match offset {offset} is out of range")
+
+            length = token & 15
+            if length == 15:
+                length, position = _extended_length(block, position, length)
+            length += _MIN_MATCH
+
+            start = len(output) - offset
+            if length <= offset:
+                output += output[start:start + length]
+            else:
+                # The match overlaps itself, repeating its last `offset` bytes
+                repeated = output[start:]
+                output += (repeated * (length // offset + 1))[:length]
+    except IndexError:
+        raise ValueError("LZ4 block ends within a sequence") from None
+
+    if len(output) != size:
+        raise ValueError(
+            f"LZ4 block decompressed to {len(output)} bytes, not {size}")
+
+    return bytes(output)
+
+
+def _extended_length(block: bytes, position: int,
+                     length: int) -> tuple[int, int]:
+    # Lengths of 15 or more go on in bytes of their own, until one is not 255
+    while True:
+        byte = block[position]
+        position += 1
+        length += byte
+        if byte != 255:
+            return length, position
+
+
+def _snapshot_rows(tree: dict[str, Any]) -> Iterator[tuple]:
+    nodes = [(tree, _ROOT_PARENT)]
+
+    while nodes:
+        node, parent = nodes.pop()
+        type_ = node.get("typeCode") or \
+            JSON_TYPES.get(node.get("type"), BOOKMARK_TYPE)
+        yield (
+            node.get("id"),
+            node.get("guid"),
+            node.get("title") or None,
+            node.get("uri") if type_ == BOOKMARK_TYPE else None,
+            type_,
+            parent,
+            node.get("index"),
+            node.get("dateAdded"),
+            node.get("lastModified"),
+        )
+
+        # Reversed, so that siblings come off the stack in order
+        children = node.get("children", [])
+        nodes.extend((child, node.get("id")) for child in reversed(children))
+
+
+__all__ = [
+    'decompress_block',
+    'read_jsonlz4',
+    'read_mozlz4',
+    'MOZLZ4_MAGIC',
+    'SNAPSHOT_FIELDS',
+    'URL_FIELDS',
+    'url_columns',
+]
@@ -1,9 +1,20 @@
+import configparser
 import os
 import sys
 
-from .constants import ProfileCriterion
+from .constants import (
+    BOOKMARK_BACKUPS_DIR_NAME,
+    MAX_WALK_DEPTH,
+    SKIPPED_DIR_NAMES,
+    ProfileCriterion,
+)
 
 FILE_NAME = "places.sqlite"
+BOOKMARK_BACKUP_EXTENSION = ".jsonlz4"
+INI_FILE_NAMES = ("profiles.ini", "installs.ini")
+
+# Profiles directory -> (modification times it was found under, candidates)
+_candidates_cache: dict[str, tuple[tuple[float, ...], list[str]]] = {}
 
 
 def locate_db(
@@ -36,6 +47,11 @@ def locate_db(
 def locate_db_candidates(*, look_under_path: str | None = None) -> list[str]:
     """Locates all `places.sqlite` under the given directory OR under the default profiles directory
 
+    Profiles listed in `profiles.ini` and `installs.ini` are used if there \
+    are any. Otherwise, the directory is searched a few levels deep, \
+    skipping caches and other large subdirectories. Results are cached \
+    until the directory or its INI files change.
+
     Args:
         look_under_path: Path from where to start searching. \
         If not supplied, looks under default profiles directory.
@@ -45,15 +61,137 @@ def locate_db_candidates(*, look_under_path: str | None = None) -> list[str]:
     """
 
     profiles_dir: str = look_under_path or _get_profiles_dir()
+    ini_dirs = [profiles_dir]
+    if look_under_path is None:
+        # On Windows and macOS, the INI files sit next to `Profiles`
+        ini_dirs.append(os.path.dirname(profiles_dir))
+
+    stamp = _modification_times(profiles_dir, ini_dirs)
+    cached = _candidates_cache.get(profiles_dir)
+    if cached is not None and cached[0] == stamp:
+        return list(cached[1])
+
+    candidates = _candidates_from_ini(ini_dirs) or \
+        _candidates_from_walk(profiles_dir)
+    _candidates_cache[profiles_dir] = (stamp, candidates)
+
+    return list(candidates)
+
+
+def locate_bookmark_backup(*, db_path: str) -> str | None:
+    """Returns the path to the latest of the bookmark backups that Firefox keeps next to a Places database
+
+    Args:
+        db_path: Path of the Places database. It need not exist, or be \
+        readable.
+
+    Returns:
+        Path of the most recently modified `.jsonlz4` file under the \
+        profile's `bookmarkbackups` directory, or `None` if there are none
+    """
+
+    backups_dir = os.path.join(
+        os.path.dirname(db_path),
+        BOOKMARK_BACKUPS_DIR_NAME,
+    )
+    try:
+        names = os.listdir(backups_dir)
+    except OSError:
+        return None
+
+    backups = [
+        os.path.join(backups_dir, name) for name in names
+        if name.lower().endswith(BOOKMARK_BACKUP_EXTENSION)
+    ]
+
+    return max(backups, key=_last_modified, default=None)
+
+
+def clear_candidates_cache():
+    """Forgets the Places databases found so far, so that the next search starts afresh"""
+
+    _candidates_cache.clear()
+
+
+def _candidates_from_ini(ini_dirs: list[str]) -> list[str]:
     candidates: list[str] = []
 
-    for dir_path, _, filenames in os.walk(profiles_dir):
+    for ini_dir in ini_dirs:
+        for ini_name in INI_FILE_NAMES:
+            for profile_dir in _profiles_in_ini(os.path.join(
+                    ini_dir, ini_name)):
+                db_path = os.path.join(profile_dir, FILE_NAME)
+                if db_path not in candidates and os.path.isfile(db_path):
+                    candidates.append(db_path)
+
+    return candidates
+
+
+def _profiles_in_ini(ini_path: str) -> list[str]:
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str  # type: ignore
+    try:
+        if not parser.read(ini_path, encoding="utf-8"):
+            return []
+    except configparser.Error:
+        return []
+
+    ini_dir = os.path.dirname(ini_path)
+    profile_dirs: list[str] = []
+
+    for name in parser.sections():
+        section = parser[name]
+        if name.startswith("Profile") and "Path" in section:
+            # `profiles.ini` lists every profile, relative paths by default
+            path = section["Path"]
+            if section.get("IsRelative", "1") == "1":
+                path = os.path.join(ini_dir, path)
+        elif not name.startswith("Profile") and "Default" in section:
+            # `installs.ini` lists each installation's default profile, under
+            # a hash of its directory
+            path = section["Default"]
+            if not os.path.isabs(path):
+                path = os.path.join(ini_dir, path)
+        else:
+            continue
+
+        profile_dirs.append(os.path.normpath(path))
+
+    return profile_dirs
+
+
+def _candidates_from_walk(profiles_dir: str) -> list[str]:
+    candidates: list[str] = []
+    base_depth = profiles_dir.rstrip(os.sep).count(os.sep)
+
+    for dir_path, dir_names, filenames in os.walk(profiles_dir):
         if FILE_NAME in filenames:
             candidates.append(os.path.join(dir_path, FILE_NAME))
 
+        if dir_path.count(os.sep) - base_depth >= MAX_WALK_DEPTH:
+            dir_names.clear()
+        else:
+            dir_names[:] = [
+                name for name in dir_names if name not in SKIPPED_DIR_NAMES
+            ]
+
     return candidates
 
 
+def _modification_times(
+    profiles_dir: str,
+    ini_dirs: list[str],
+) -> tuple[float, ...]:
+    paths = [profiles_dir] + [
+        os.path.join(ini_dir, ini_name) for ini_dir in ini_dirs
+        for ini_name in INI_FILE_NAMES
+    ]
+
+    return tuple(
+        os.path.getmtime(path) if os.path.exists(path) else -1
+        for path in paths)
+
+
 def _get_profiles_dir() -> str:
     # ref: https://support.mozilla.org/en-US/kb/profiles-where-firefox-stores-user-data
     if sys.platform.startswith("win"):
@@ -73,6 +211,8 @@ def _file_size(file_path: str) -> float:
 
 
 __all__ = [
+    'clear_candidates_cache',
+    'locate_bookmark_backup',
     'locate_db',
     'locate_db_candidates',
     'ProfileCriterion',  # For convenience
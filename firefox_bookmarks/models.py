@@ -1,15 +1,21 @@
+from typing import Callable
+
 from peewee import SQL, ForeignKeyField, IntegerField, Model, SqliteDatabase, TextField
 
-from .constants import ProfileCriterion
+from .binding import BoundDatabase
+from .constants import BACKUP_PAGES, BACKUP_SLEEP, ProfileCriterion
 
 database_obj = SqliteDatabase(None)
 
+# Each `FirefoxBookmarks` binds the models to its own database, see `_bound`
+places_database = BoundDatabase(database_obj)
+
 
 class _BaseModel(Model):
     id = IntegerField(primary_key=True)
 
     class Meta:
-        database = database_obj
+        database = places_database
 
 
 class FirefoxOrigin(_BaseModel):
@@ -93,36 +99,75 @@ class FirefoxBookmark(_BaseModel):
         )
 
 
+class FirefoxDeletedBookmark(Model):
+    """Represents an entry in the `moz_bookmarks_deleted` table, the tombstone of a synced bookmark"""
+
+    guid = TextField(primary_key=True)
+    date_removed = IntegerField(
+        column_name='dateRemoved',
+        constraints=[SQL("DEFAULT 0")],
+    )
+
+    class Meta:
+        database = places_database
+        table_name = 'moz_bookmarks_deleted'
+
+
 def connect_firefox_models(
     *,
+    db_path: str | None = None,
     look_under_path: str | None = None,
     criterion: ProfileCriterion = ProfileCriterion.LATEST,
     readonly: bool = False,
+    immutable: bool = False,
+    pages: int = BACKUP_PAGES,
+    progress: Callable[[int, int, int], object] | None = None,
+    sleep: float = BACKUP_SLEEP,
 ):
     """Connects `Firefox*` models to a Places database according to the chosen criterion
 
     Args:
+        db_path: Path of the Places database. If supplied, no profile is \
+        searched for, and `look_under_path` and `criterion` are ignored.
         look_under_path: Path from where to start searching. \
         If not supplied, looks under default profiles directory.
         criterion: Which profile to choose, in case there are multiple. \
         Defaults to `ProfileCriterion.LATEST`.
-        readonly: If `True`, connects to a temporary duplicate of the \
-        database, which will not be synced with the original. Defaults to `False`.
+        readonly: If `True`, opens the database in read-only mode, or \
+        connects to a temporary duplicate of it if it is locked. \
+        Defaults to `False`.
+        immutable: Read-only mode only. If `True`, tells SQLite that the \
+        database cannot change, so that it skips locking altogether. Only \
+        use this while Firefox is not running. Defaults to `False`.
+        pages: Read-only mode only. Number of pages to copy per step. \
+        Defaults to `BACKUP_PAGES`.
+        progress: Read-only mode only. Called after each step, with the \
+        status, and the remaining and total number of pages. Defaults to `None`.
+        sleep: Read-only mode only. Seconds to wait between steps. \
+        Defaults to `BACKUP_SLEEP`.
     """
     from .connect import connect_to_places_db
 
+    places_database.reset()
     connect_to_places_db(
         database=database_obj,
+        db_path=db_path,
         look_under_path=look_under_path,
         criterion=criterion,
         readonly=readonly,
+        immutable=immutable,
+        pages=pages,
+        progress=progress,
+        sleep=sleep,
     )
 
 
 __all__ = [
     'connect_firefox_models',
     'FirefoxBookmark',
+    'FirefoxDeletedBookmark',
     'FirefoxPlace',
     'FirefoxOrigin',
+    'places_database',
     'ProfileCriterion',  # For convenience
 ]
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+
+from .constants import ExportFormat, LoadEngine
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    """Summary of copying the Places database into the duplicate database"""
+
+    engine: LoadEngine
+    rows: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class RefreshReport:
+    """Summary of copying changes from the Places database into the duplicate database"""
+
+    copied: int
+    removed: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class CommitReport:
+    """Summary of committing the duplicate database to the Places database
+
+    `bookmarks` and `places` count the rows updated, created or deleted, of \
+    which `inserted` counts the bookmarks created, and `deleted` those deleted.
+    """
+
+    bookmarks: int
+    places: int
+    seconds: float
+    inserted: int = 0
+    deleted: int = 0
+
+
+@dataclass(frozen=True)
+class AggregateReport:
+    """Summary of merging the bookmarks of several Places databases"""
+
+    profiles: int
+    rows: int
+    bookmarks: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class ExportReport:
+    """Summary of exporting the duplicate database to a file"""
+
+    format: ExportFormat
+    rows: int
+    seconds: float
+
+
+__all__ = [
+    'LoadReport',
+    'RefreshReport',
+    'CommitReport',
+    'AggregateReport',
+    'ExportReport',
+]
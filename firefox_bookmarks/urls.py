@@ -0,0 +1,93 @@
+import base64
+import os
+from urllib.parse import urlsplit
+
+# Places hashes at most this many bytes of a URL
+MAX_CHARS_TO_HASH = 1500
+
+# Places looks for the `:` after a scheme in this many bytes at most
+_MAX_PREFIX_LENGTH = 50
+
+_GOLDEN_RATIO = 0x9E3779B9
+
+
+def hash_url(url: str) -> int:
+    """Computes the `url_hash` that Places stores for a URL, as its `hash()` SQL function does
+
+    The top 16 of its 48 bits hash the scheme, so that URLs of a scheme can \
+    be found by range, and the other 32 hash the URL itself.
+
+    Args:
+        url: The URL, as stored in `moz_places.url`
+
+    Returns:
+        The hash
+    """
+
+    data = url.encode("utf-8")
+    url_hash = _hash_string(data[:MAX_CHARS_TO_HASH])
+
+    colon = data.find(b":", 0, _MAX_PREFIX_LENGTH)
+    if colon == -1:
+        return url_hash
+
+    return ((_hash_string(data[:colon]) & 0xFFFF) << 32) + url_hash
+
+
+def _hash_string(data: bytes) -> int:
+    # `mozilla::HashString`, over unsigned bytes
+    value = 0
+    for byte in data:
+        rotated = ((value << 5) | (value >> 27)) & 0xFFFFFFFF
+        value = (_GOLDEN_RATIO * (rotated ^ byte)) & 0xFFFFFFFF
+    return value
+
+
+def reverse_host(url: str) -> str:
+    """Computes the `rev_host` that Places stores for a URL, e.g. `"gro.allizom.www."` for `https://www.mozilla.org/`
+
+    Args:
+        url: The URL
+
+    Returns:
+        The lower-cased host, reversed, with a trailing `.`. Just `.` if \
+        the URL has no host.
+    """
+
+    host = urlsplit(url).hostname or ""
+    return host[::-1] + "."
+
+
+def split_origin(url: str) -> tuple[str, str]:
+    """Splits a URL into the `prefix` and `host` of its entry in `moz_origins`
+
+    Args:
+        url: The URL
+
+    Returns:
+        The scheme with `://` (or just `:` for URLs without a host), and the \
+        lower-cased host with any port, e.g. `("https://", "www.mozilla.org")`
+    """
+
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if host and parts.port is not None:
+        host += f":{parts.port}"
+
+    if not parts.netloc:
+        return f"{parts.scheme}:", host
+    return f"{parts.scheme}://", host
+
+
+def make_guid() -> str:
+    """Makes a new `guid`, the way Places does: 12 URL-safe base64 characters"""
+
+    return base64.urlsafe_b64encode(os.urandom(9)).decode("ascii")
+
+
+__all__ = [
+    'hash_url',
+    'make_guid',
+    'reverse_host',
+    'split_origin',
+]
@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import pytest
+
+from firefox_bookmarks.locate import FILE_NAME, locate_db
+
+# region FIXTURES
+
+
+@pytest.fixture
+def profile_name() -> str:
+    """Name of the profile directory that `places_copy` is made in. Override it to use another."""
+
+    return "copy.default"
+
+
+@pytest.fixture
+def places_copy(tmp_path, profile_name: str) -> str:
+    """Path of a copy of the Places database, in a profile directory of its own"""
+
+    return _copy_places(tmp_path / profile_name)
+
+
+@pytest.fixture
+def profile_names() -> tuple[str, ...]:
+    """Names of the profile directories that `profile_copies` are made in. Override it to use others."""
+
+    return ("first.default", "second.default")
+
+
+@pytest.fixture
+def profile_copies(tmp_path, profile_names: tuple[str, ...]) -> list[str]:
+    """Paths of copies of the Places database, each in a profile directory of its own"""
+
+    return [_copy_places(tmp_path / name) for name in profile_names]
+
+
+def _copy_places(profile_dir) -> str:
+    os.mkdir(profile_dir)
+    db_path = str(profile_dir / FILE_NAME)
+    shutil.copyfile(locate_db(), db_path)
+    return db_path
+
+
+# endregion
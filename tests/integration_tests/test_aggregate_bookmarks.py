@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from firefox_bookmarks import *
+from firefox_bookmarks import aggregate
+from firefox_bookmarks.aggregate import MergedBookmark
+
+KIOSK_URL = "https://www.mozilla.org/about/"
+
+
+def test_newest_title_wins(profile_copies, tmp_path):
+    output_path = str(tmp_path / "merged.json")
+
+    report = aggregate_bookmarks(
+        output_path,
+        db_paths=profile_copies,
+        max_workers=2,
+    )
+
+    with open(output_path) as output:
+        merged = json.load(output)
+    by_url = {bookmark["url"]: bookmark for bookmark in merged}
+
+    assert report.profiles == 2
+    assert report.rows == 2 * report.bookmarks
+    assert len(by_url) == len(merged) == report.bookmarks
+    assert by_url[KIOSK_URL]["title"] == "Kiosk"
+    assert by_url[KIOSK_URL]["profile"] == os.path.dirname(profile_copies[1])
+
+
+def test_merges_in_chunks(profile_copies, tmp_path, monkeypatch):
+    whole_path = str(tmp_path / "whole.json")
+    chunked_path = str(tmp_path / "chunked.json")
+
+    whole = aggregate_bookmarks(whole_path, db_paths=profile_copies)
+    # Forked workers see the patched size too
+    monkeypatch.setattr(aggregate, "EXTRACT_CHUNK_SIZE", 3)
+    chunked = aggregate_bookmarks(chunked_path, db_paths=profile_copies)
+
+    assert (chunked.rows, chunked.bookmarks) == (whole.rows, whole.bookmarks)
+    # Ties between the identical copies go to whichever profile arrives first
+    assert _titles(chunked_path) == _titles(whole_path)
+
+
+def test_writes_sqlite(profile_copies, tmp_path):
+    output_path = str(tmp_path / "merged.sqlite")
+
+    report = aggregate_bookmarks(output_path, db_paths=profile_copies)
+
+    with closing(sqlite3.connect(output_path)) as output:
+        rows = output.execute(
+            f"SELECT url, title FROM {MergedBookmark._meta.table_name}",
+        ).fetchall()
+
+    assert len(rows) == report.bookmarks
+    assert (KIOSK_URL, "Kiosk") in rows
+
+
+# region HELPERS
+
+
+def _titles(output_path: str) -> dict[str, str]:
+    with open(output_path) as output:
+        return {
+            bookmark["url"]: bookmark["title"]
+            for bookmark in json.load(output)
+        }
+
+
+# endregion
+
+# region FIXTURES
+
+
+@pytest.fixture
+def profile_copies(profile_copies):
+    db_paths = profile_copies
+
+    # Rename a bookmark in the second copy, later than anything in the first
+    with closing(sqlite3.connect(db_paths[1])) as places:
+        with places:
+            places.execute(
+                "UPDATE moz_bookmarks "
+                "SET title = 'Kiosk', lastModified = lastModified + 1000000 "
+                "WHERE fk = (SELECT id FROM moz_places WHERE url = ?)",
+                (KIOSK_URL, ),
+            )
+
+    yield db_paths
+
+
+# endregion
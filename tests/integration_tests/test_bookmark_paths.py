@@ -0,0 +1,69 @@
+from firefox_bookmarks import *
+
+
+def test_paths_match_path_property():
+    fb = FirefoxBookmarks()
+    fb.connect()
+
+    walked = {bookmark.id: bookmark.path for bookmark in fb.select()}
+    computed = fb.paths()
+    selected = {
+        bookmark.id: bookmark.materialized_path
+        for bookmark in fb.bookmarks(with_paths=True)
+    }
+    filtered = fb.paths(where=Bookmark.type == 1)
+
+    fb.disconnect()
+
+    assert computed == walked
+    assert selected == filtered
+    assert filtered == {
+        id_: path
+        for id_, path in walked.items() if path.endswith(")")
+    }
+
+
+def test_materialized_paths_follow_moves():
+    fb = FirefoxBookmarks(materialize_paths=True)
+    fb.connect()
+
+    toolbar = fb.folders(where=Bookmark.guid == "toolbar_____")[0]
+    moved = fb.update(
+        where=(Bookmark.type == 1) & (Bookmark.parent != toolbar.id),
+        data={Bookmark.parent: toolbar.id},
+    )
+
+    materialized = {
+        bookmark.id: bookmark.materialized_path
+        for bookmark in fb.bookmarks()
+    }
+    walked = fb.paths(where=Bookmark.type == 1)
+    diff = fb.diff()
+
+    fb.disconnect()
+
+    assert materialized == walked
+    assert all(path.startswith(toolbar.path) for path in walked.values())
+    assert len(diff) == moved
+
+
+def test_materialized_paths_follow_renames_by_name():
+    fb = FirefoxBookmarks(materialize_paths=True)
+    fb.connect()
+
+    toolbar = fb.folders(where=Bookmark.guid == "toolbar_____")[0]
+    fb.update(where=Bookmark.id == toolbar.id, data={"title": "Renamed"})
+
+    materialized = {
+        bookmark.id: bookmark.materialized_path
+        for bookmark in fb.select()
+    }
+    walked = fb.paths()
+
+    fb.disconnect()
+
+    assert materialized == walked
+    assert walked[toolbar.id].endswith("/Renamed/")
+    assert any(
+        path.startswith(walked[toolbar.id]) and id_ != toolbar.id
+        for id_, path in walked.items())
@@ -0,0 +1,50 @@
+import pytest
+
+from firefox_bookmarks import *
+
+
+@pytest.mark.parametrize("closure_table", [False, True])
+def test_subtrees_follow_moves(closure_table):
+    fb = FirefoxBookmarks(closure_table=closure_table)
+    fb.connect()
+
+    menu = fb.folders(where=Bookmark.guid == "menu________")[0]
+    toolbar = fb.folders(where=Bookmark.guid == "toolbar_____")[0]
+    menu_before = set(fb.bookmarks(under=menu))
+
+    fb.update(
+        where=Bookmark.id.in_([bookmark.id for bookmark in menu_before]),
+        data={Bookmark.parent: toolbar.id},
+    )
+    moved = next(iter(menu_before))
+
+    menu_after = set(fb.bookmarks(under=menu))
+    toolbar_after = set(fb.descendants(toolbar.id))
+    lineage = fb.ancestors(moved)
+
+    fb.disconnect()
+
+    assert menu_before
+    assert not menu_after
+    assert menu_before <= toolbar_after
+    assert [folder.id for folder in lineage] == [toolbar.parent_id, toolbar.id]
+
+
+def test_closure_table_agrees():
+    results = []
+
+    for closure_table in (False, True):
+        fb = FirefoxBookmarks(closure_table=closure_table)
+        fb.connect()
+        root = fb.folders(where=Bookmark.parent == 0)[0]
+        results.append({
+            folder.id: (
+                {bookmark.id
+                 for bookmark in fb.descendants(folder)},
+                [ancestor.id for ancestor in fb.ancestors(folder)],
+            )
+            for folder in fb.folders(under=root)
+        })
+        fb.disconnect()
+
+    assert results[0] == results[1]
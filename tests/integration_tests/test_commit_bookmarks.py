@@ -0,0 +1,79 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_writes_shared_place_once(places_copy, shared_place):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy)
+    updated = fb.update(
+        where=Bookmark.place_id == shared_place,
+        data={
+            Bookmark.title: "<updated> " + Bookmark.title,
+            Bookmark.description: "A shared description",
+        },
+    )
+    report = fb.commit()
+    diff = fb.diff()
+    fb.disconnect()
+
+    with closing(sqlite3.connect(places_copy)) as places:
+        titles = places.execute(
+            "SELECT title FROM moz_bookmarks WHERE fk = ? ORDER BY id",
+            (shared_place, ),
+        ).fetchall()
+        description = places.execute(
+            "SELECT description FROM moz_places WHERE id = ?",
+            (shared_place, ),
+        ).fetchone()[0]
+
+    assert updated == 2
+    assert (report.bookmarks, report.places) == (2, 1)
+    assert (report.inserted, report.deleted) == (0, 0)
+    assert report.seconds >= 0
+    assert diff == []
+    assert all(title.startswith("<updated> ") for (title, ) in titles)
+    assert len(titles) == 2
+    assert description == "A shared description"
+
+
+def test_reports_nothing_without_changes(places_copy):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy)
+    report = fb.commit()
+    fb.disconnect()
+
+    assert (report.bookmarks, report.places) == (0, 0)
+
+
+# region FIXTURES
+
+
+@pytest.fixture
+def shared_place(places_copy) -> int:
+    """Adds a second bookmark of the place of the first bookmark, and returns that place's `id`"""
+
+    with closing(sqlite3.connect(places_copy)) as places, places:
+        parent, place_id = places.execute(
+            "SELECT parent, fk FROM moz_bookmarks "
+            "WHERE type = 1 ORDER BY id LIMIT 1").fetchone()
+        places.execute(
+            "INSERT INTO moz_bookmarks "
+            "(type, fk, parent, position, title, guid) "
+            "SELECT 1, ?, ?, COUNT(*), 'Twin', 'twin00000000' "
+            "FROM moz_bookmarks WHERE parent = ?",
+            (place_id, parent, parent),
+        )
+        places.execute(
+            "UPDATE moz_places SET foreign_count = foreign_count + 1 "
+            "WHERE id = ?",
+            (place_id, ),
+        )
+
+    return place_id
+
+
+# endregion
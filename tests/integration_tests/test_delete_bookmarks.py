@@ -0,0 +1,127 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from firefox_bookmarks import *
+from firefox_bookmarks.constants import ROOT_GUIDS
+
+
+def test_renumbers_siblings(fb):
+    folder = first_folder(fb)
+    before = children(fb, folder)
+
+    deleted = fb.delete(where=Bookmark.id == before[1].id)
+    after = children(fb, folder)
+    diff = fb.diff()
+
+    assert deleted == 1
+    assert [bkmk.id for bkmk in after] == \
+        [before[0].id, *(bkmk.id for bkmk in before[2:])]
+    assert [bkmk.position for bkmk in after] == list(range(len(after)))
+    assert fb.folders(where=Bookmark.id == folder.id)[0].last_modified > \
+        folder.last_modified
+    assert diff[-1] == before[1].guid
+    assert folder.guid in diff
+
+
+def test_deletes_descendants(fb):
+    folder = first_folder(fb)
+    count = len(children(fb, folder))
+
+    deleted = fb.delete(where=Bookmark.id == folder.id)
+
+    assert deleted == count + 1
+    assert list(fb.select(where=Bookmark.parent == folder.id)) == []
+
+
+def test_rejects_root_folders(fb):
+    with pytest.raises(ValueError):
+        fb.delete(where=Bookmark.guid == "menu________")
+
+    assert fb.diff() == []
+
+
+def test_commits_deletions(places_copy):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy)
+    folder = first_folder(fb)
+    doomed, *kept = children(fb, folder)
+    with closing(sqlite3.connect(places_copy)) as places, places:
+        places.execute("UPDATE moz_bookmarks SET syncStatus = 2 WHERE id = ?",
+                       (doomed.id, ))
+
+    fb.delete(where=Bookmark.id == doomed.id)
+    report = fb.commit()
+    diff = fb.diff()
+    fb.disconnect()
+
+    with closing(sqlite3.connect(places_copy)) as places:
+        remaining = places.execute(
+            "SELECT id, position FROM moz_bookmarks "
+            "WHERE parent = ? ORDER BY position",
+            (folder.id, ),
+        ).fetchall()
+        foreign_count = places.execute(
+            "SELECT foreign_count FROM moz_places WHERE id = ?",
+            (doomed.place_id, ),
+        ).fetchone()[0]
+        tombstones = places.execute(
+            "SELECT guid FROM moz_bookmarks_deleted").fetchall()
+
+    assert (report.deleted, diff) == (1, [])
+    assert remaining == [(bkmk.id, idx) for idx, bkmk in enumerate(kept)]
+    assert foreign_count == doomed.foreign_count - 1
+    assert tombstones == [(doomed.guid, )]
+
+
+def test_commits_deleted_folders(places_copy):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy)
+    folder = first_folder(fb)
+    count = len(children(fb, folder)) + 1
+
+    fb.delete(where=Bookmark.id == folder.id)
+    report = fb.commit()
+    fb.disconnect()
+
+    with closing(sqlite3.connect(places_copy)) as places:
+        left = places.execute(
+            "SELECT COUNT(*) FROM moz_bookmarks WHERE id = ? OR parent = ?",
+            (folder.id, folder.id),
+        ).fetchone()[0]
+        tombstones = places.execute(
+            "SELECT COUNT(*) FROM moz_bookmarks_deleted").fetchone()[0]
+
+    assert report.deleted == count
+    assert left == 0
+    assert tombstones == 0
+
+
+# region FIXTURES
+
+
+def first_folder(fb: FirefoxBookmarks) -> Bookmark:
+    """The first folder, other than the root folders, that has bookmarks in it"""
+
+    parents = Bookmark.select(Bookmark.parent).where(Bookmark.type == 1)
+    return fb.folders(where=Bookmark.id.in_(parents)
+                      & Bookmark.guid.not_in(ROOT_GUIDS))[0]
+
+
+def children(fb: FirefoxBookmarks, folder: Bookmark) -> list[Bookmark]:
+    return sorted(
+        fb.select(where=Bookmark.parent == folder.id),
+        key=lambda bkmk: bkmk.position,
+    )
+
+
+@pytest.fixture
+def fb():
+    fb = FirefoxBookmarks()
+    fb.connect()
+    yield fb
+    fb.disconnect()
+
+
+# endregion
@@ -0,0 +1,19 @@
+from firefox_bookmarks import *
+
+
+def test_diff_bookmarks():
+    fb = FirefoxBookmarks()
+    fb.connect()
+    untouched_diff = fb.diff()
+    fb.update(
+        where=Bookmark.url.contains("mozilla.org"),
+        data={Bookmark.title: "<updated> " + Bookmark.title},
+    )
+    updated_guids = set(
+        bkmk.guid
+        for bkmk in fb.bookmarks(where=Bookmark.url.contains("mozilla.org")))
+    updated_diff = fb.diff()
+    fb.disconnect()
+
+    assert untouched_diff == []
+    assert set(updated_diff) == updated_guids
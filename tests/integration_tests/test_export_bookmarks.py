@@ -0,0 +1,88 @@
+import csv
+import gzip
+import json
+from html.parser import HTMLParser
+
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_exports_html(fb, tmp_path):
+    output_path = str(tmp_path / "bookmarks.html")
+    report = fb.export(output_path)
+
+    links = LinkParser()
+    with open(output_path, encoding="utf-8") as output:
+        links.feed(output.read())
+
+    urls = [bkmk.url for bkmk in fb.bookmarks(where=Bookmark.type == 1)]
+    assert report.format == ExportFormat.HTML
+    assert sorted(links.urls) == sorted(urls)
+    assert links.folders[0] == "Bookmarks Menu"
+
+
+def test_exports_json_in_tree_order(fb, tmp_path):
+    output_path = str(tmp_path / "bookmarks.json.gz")
+    report = fb.export(output_path)
+
+    with gzip.open(output_path, "rt", encoding="utf-8") as output:
+        tree = json.load(output)
+
+    walked = list(walk(tree))
+    assert report.rows == len(walked) == len(fb.select())
+    assert tree["root"] == "placesRoot"
+    for node in walked:
+        indexes = [child["index"] for child in node.get("children", [])]
+        assert indexes == sorted(indexes)
+
+
+def test_exports_csv_with_paths(fb, tmp_path):
+    output_path = str(tmp_path / "bookmarks.csv")
+    fb.export(output_path)
+
+    with open(output_path, encoding="utf-8", newline="") as output:
+        rows = list(csv.DictReader(output))
+
+    paths = fb.paths()
+    assert rows
+    assert all(row["path"] == paths[int(row["id"])] for row in rows)
+
+
+# region FIXTURES
+
+
+class LinkParser(HTMLParser):
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+        self.folders = []
+        self._in_folder = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self.urls.append(dict(attrs)["href"])
+        self._in_folder = tag == "h3"
+
+    def handle_data(self, data):
+        if self._in_folder:
+            self.folders.append(data)
+            self._in_folder = False
+
+
+def walk(node):
+    yield node
+    for child in node.get("children", []):
+        yield from walk(child)
+
+
+@pytest.fixture
+def fb():
+    fb = FirefoxBookmarks()
+    fb.connect(readonly=True)
+    yield fb
+    fb.disconnect()
+
+
+# endregion
@@ -0,0 +1,95 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from firefox_bookmarks import *
+from firefox_bookmarks.urls import hash_url
+
+
+def test_creates_bookmarks_and_places(places_copy):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy)
+    folder = fb.folders(where=Bookmark.guid == "unfiled_____")[0]
+    known = fb.bookmarks()[0].url
+
+    fb.insert_many(
+        [
+            {
+                Bookmark.title: "New",
+                Bookmark.url: "https://new.example.org/"
+            },
+            {
+                "title": "Known",
+                "url": known
+            },
+            {
+                "title": "Folder"
+            },
+        ],
+        parent=folder,
+    )
+    report = fb.commit()
+    diff = fb.diff()
+    fb.disconnect()
+
+    with closing(sqlite3.connect(places_copy)) as places:
+        created = places.execute(
+            "SELECT b.title, b.position, p.url_hash, p.rev_host, o.host "
+            "FROM moz_bookmarks b JOIN moz_places p ON p.id = b.fk "
+            "JOIN moz_origins o ON o.id = p.origin_id WHERE b.title = 'New'",
+        ).fetchall()
+        known_places = places.execute(
+            "SELECT foreign_count FROM moz_places WHERE url = ?",
+            (known, ),
+        ).fetchall()
+
+    assert report.inserted == 3
+    assert diff == []
+    assert created == [(
+        "New",
+        0,
+        hash_url("https://new.example.org/"),
+        "gro.elpmaxe.wen.",
+        "new.example.org",
+    )]
+    assert len(known_places) == 1
+    assert known_places[0][0] >= 2
+
+
+def test_imports_own_export(places_copy, tmp_path):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy)
+    folder = fb.folders(where=Bookmark.guid == "unfiled_____")[0]
+    exported = str(tmp_path / "bookmarks.html")
+    fb.export(exported)
+    urls = [bkmk.url for bkmk in fb.bookmarks(where=Bookmark.type == 1)]
+    urls += [bkmk.url for bkmk in fb.descendants(folder) if bkmk.is_bookmark]
+
+    imported = fb.import_html(exported, parent=folder)
+    fb.commit()
+    fb.disconnect()
+
+    with closing(sqlite3.connect(places_copy)) as places:
+        under_unfiled = places.execute(
+            "WITH RECURSIVE tree(id) AS (SELECT ?1 UNION ALL "
+            "SELECT b.id FROM moz_bookmarks b JOIN tree ON b.parent = tree.id) "
+            "SELECT p.url FROM moz_bookmarks b JOIN tree ON tree.id = b.id "
+            "JOIN moz_places p ON p.id = b.fk WHERE b.id != ?1",
+            (folder.id, ),
+        ).fetchall()
+
+    assert imported > len(urls)
+    assert sorted(url for (url, ) in under_unfiled) == sorted(urls)
+
+
+def test_rejects_missing_folder():
+    fb = FirefoxBookmarks()
+    fb.connect(readonly=True)
+    bookmark = fb.bookmarks(where=Bookmark.type == 1)[0]
+
+    with pytest.raises(ValueError):
+        fb.insert_many([{"title": "Lost"}], parent=bookmark)
+    with pytest.raises(ValueError):
+        fb.insert_many([{"description": "Not allowed"}], parent=1)
+    fb.disconnect()
@@ -0,0 +1,169 @@
+import os
+
+import pytest
+
+from firefox_bookmarks import *
+from firefox_bookmarks.constants import BOOKMARK_BACKUPS_DIR_NAME
+from firefox_bookmarks.jsonlz4 import MOZLZ4_MAGIC
+from firefox_bookmarks.locate import FILE_NAME
+
+
+def test_loads_latest_backup(full, profile_dir):
+    fb = FirefoxBookmarks()
+    report = fb.connect(
+        db_path=os.path.join(profile_dir, FILE_NAME),
+        source="jsonlz4",
+    )
+    loaded = [key(bkmk) for bkmk in fb.select()]
+    fb.disconnect()
+
+    assert report.rows == len(full)
+    assert loaded == [key(bkmk) for bkmk in full]
+    assert not os.path.exists(os.path.join(profile_dir, FILE_NAME))
+
+
+def test_loads_given_backup(full, backup_path):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=backup_path, source=Source.JSONLZ4)
+    urls = [bkmk.url for bkmk in fb.bookmarks()]
+    fb.disconnect()
+
+    assert urls == [bkmk.url for bkmk in full if bkmk.type == 1]
+
+
+def test_computes_url_fields_on_demand(backup_path):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=backup_path, source="jsonlz4")
+    unfiltered = list(fb.bookmarks())
+    filtered = list(fb.bookmarks(where=Bookmark.rev_host.startswith("gro.")))
+    fb.disconnect()
+
+    assert all(bkmk.rev_host is None for bkmk in unfiltered)
+    assert [bkmk.url for bkmk in filtered] == \
+        [bkmk.url for bkmk in unfiltered if ".org/" in bkmk.url]
+
+
+def test_computes_given_url_fields_on_load(backup_path):
+    fb = FirefoxBookmarks()
+    fb.connect(
+        db_path=backup_path,
+        source="jsonlz4",
+        columns=[Bookmark.title, Bookmark.rev_host],
+    )
+    bookmarks = list(fb.bookmarks())
+    fb.disconnect()
+
+    assert all(bkmk.title and bkmk.rev_host for bkmk in bookmarks)
+
+
+def test_rejects_columns_missing_from_backups(backup_path):
+    fb = FirefoxBookmarks()
+
+    with pytest.raises(ValueError, match="visit_count"):
+        fb.connect(
+            db_path=backup_path,
+            source="jsonlz4",
+            columns=[Bookmark.title, Bookmark.visit_count],
+        )
+
+
+def test_is_read_only(backup_path):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=backup_path, source="jsonlz4")
+    fb.update(
+        where=Bookmark.type == 1,
+        data={Bookmark.title: "<updated> " + Bookmark.title},
+    )
+    guids = [bkmk.guid for bkmk in fb.bookmarks()]
+    diff = fb.diff()
+    with pytest.warns(UserWarning):
+        refreshed = fb.refresh()
+    with pytest.warns(UserWarning):
+        committed = fb.commit()
+    fb.disconnect()
+
+    assert diff == guids
+    assert refreshed.copied == 0
+    assert committed.bookmarks == 0
+
+
+def test_requires_a_backup(tmp_path):
+    fb = FirefoxBookmarks()
+
+    with pytest.raises(FileNotFoundError):
+        fb.connect(db_path=str(tmp_path / FILE_NAME), source="jsonlz4")
+
+
+# region FIXTURES
+
+
+def key(bkmk: Bookmark) -> tuple:
+    return (
+        bkmk.id,
+        bkmk.guid,
+        bkmk.title or None,
+        bkmk.url,
+        bkmk.type,
+        bkmk.parent_id,
+        bkmk.position,
+        bkmk.date_added,
+        bkmk.last_modified,
+    )
+
+
+@pytest.fixture
+def full() -> list[Bookmark]:
+    fb = FirefoxBookmarks()
+    fb.connect(readonly=True)
+    bookmarks = list(fb.select())
+    fb.disconnect()
+    return bookmarks
+
+
+@pytest.fixture
+def profile_dir(tmp_path) -> str:
+    """A profile with a bookmark backup of the test profile, and no Places database"""
+
+    fb = FirefoxBookmarks()
+    fb.connect(readonly=True)
+    json_path = str(tmp_path / "bookmarks.json")
+    fb.export(json_path)
+    fb.disconnect()
+
+    with open(json_path, "rb") as json_file:
+        data = json_file.read()
+
+    backups_dir = tmp_path / "profile" / BOOKMARK_BACKUPS_DIR_NAME
+    backups_dir.mkdir(parents=True)
+    (backups_dir / "bookmarks-2023-01-01_1_old.jsonlz4").write_bytes(
+        mozlz4(b'{"guid": "root________", "id": 1}'))
+    latest = backups_dir / "bookmarks-2023-09-01_1_new.jsonlz4"
+    latest.write_bytes(mozlz4(data))
+    os.utime(latest, (2_000_000_000, 2_000_000_000))
+
+    return str(tmp_path / "profile")
+
+
+@pytest.fixture
+def backup_path(profile_dir) -> str:
+    return os.path.join(
+        profile_dir,
+        BOOKMARK_BACKUPS_DIR_NAME,
+        "bookmarks-2023-09-01_1_new.jsonlz4",
+    )
+
+
+def mozlz4(data: bytes) -> bytes:
+    """Compresses `data` into a mozLz4 file, as a single sequence of literals"""
+
+    length = len(data) - 15
+    if length < 0:
+        block = bytes([len(data) << 4]) + data
+    else:
+        block = b"\xf0" + b"\xff" * (length // 255) + \
+            bytes([length % 255]) + data
+
+    return MOZLZ4_MAGIC + len(data).to_bytes(4, "little") + block
+
+
+# endregion
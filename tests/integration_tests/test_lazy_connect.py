@@ -0,0 +1,46 @@
+import os
+
+from firefox_bookmarks import *
+from firefox_bookmarks.constants import BACKUP_DIR_NAME
+
+
+def test_loads_on_first_query(places_copy):
+    eager = FirefoxBookmarks()
+    eager.connect(db_path=places_copy, readonly=True)
+    expected = [repr(bkmk) for bkmk in eager.bookmarks()]
+    eager.disconnect()
+
+    fb = FirefoxBookmarks()
+    report = fb.connect(db_path=places_copy, lazy=True)
+    bookmarks = [repr(bkmk) for bkmk in fb.bookmarks()]
+    fb.disconnect()
+
+    assert report.rows == 0
+    assert bookmarks == expected
+
+
+def test_untouched_session_skips_diff_and_commit(places_copy):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy, lazy=True)
+    diff = fb.diff()
+    report = fb.commit()
+    fb.disconnect()
+
+    backups = os.path.join(os.path.dirname(places_copy), BACKUP_DIR_NAME)
+    assert diff == []
+    assert (report.bookmarks, report.places) == (0, 0)
+    assert not os.path.exists(backups)
+
+
+def test_update_loads_first(places_copy):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy, lazy=True)
+    rows = fb.update(
+        where=Bookmark.type == 1,
+        data={Bookmark.title: "Renamed"},
+    )
+    diff = fb.diff()
+    fb.disconnect()
+
+    assert rows > 0
+    assert len(diff) == rows
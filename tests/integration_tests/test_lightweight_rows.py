@@ -0,0 +1,43 @@
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_records_match_models(fb):
+    models = [repr(bkmk) for bkmk in fb.select()]
+    records = fb.select(lightweight=True)
+
+    assert all(isinstance(record, BookmarkRecord) for record in records)
+    assert [repr(record) for record in records] == models
+
+
+def test_records_fill_unselected_fields(fb):
+    records = fb.bookmarks(fields=[Bookmark.url], lightweight=True)
+
+    assert [record.url for record in records] == \
+        [bkmk.url for bkmk in fb.bookmarks()]
+    assert all(record.title is None for record in records)
+
+
+def test_records_have_paths(fb):
+    paths = fb.paths(where=Bookmark.type == 2)
+
+    folders = fb.folders(with_paths=True, lightweight=True)
+    streamed = fb.iter_folders(with_paths=True, rows="record")
+
+    assert {folder.id: folder.path for folder in folders} == paths
+    assert {folder.id: folder.path for folder in streamed} == paths
+
+
+# region FIXTURES
+
+
+@pytest.fixture
+def fb():
+    fb = FirefoxBookmarks()
+    fb.connect()
+    yield fb
+    fb.disconnect()
+
+
+# endregion
@@ -0,0 +1,41 @@
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_load_engines_agree():
+    fb = FirefoxBookmarks()
+
+    attached_report = fb.connect(engine=LoadEngine.ATTACH)
+    attached = [bookmark.__data__ for bookmark in fb.select()]
+    fb.disconnect()
+
+    batched_report = fb.connect(engine=LoadEngine.BATCH)
+    batched = [bookmark.__data__ for bookmark in fb.select()]
+    fb.disconnect()
+
+    assert attached_report.engine == LoadEngine.ATTACH
+    assert batched_report.engine == LoadEngine.BATCH
+    assert attached_report.rows == batched_report.rows == len(attached)
+    assert attached == batched
+
+
+def test_readonly_does_not_commit():
+    fb = FirefoxBookmarks()
+    fb.connect(readonly=True)
+    original = [bookmark.__data__ for bookmark in fb.select()]
+    fb.update(
+        where=Bookmark.title.is_null(False),
+        data={Bookmark.title: "Renamed"},
+    )
+
+    with pytest.warns(UserWarning):
+        report = fb.commit()
+    fb.disconnect()
+
+    fb.connect()
+    reloaded = [bookmark.__data__ for bookmark in fb.select()]
+    fb.disconnect()
+
+    assert report.bookmarks == report.places == 0
+    assert reloaded == original
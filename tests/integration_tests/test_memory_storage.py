@@ -0,0 +1,41 @@
+import os
+import sqlite3
+from contextlib import closing
+from tempfile import gettempdir
+
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_memory_storage_matches_disk(persist_path):
+    fb = FirefoxBookmarks()
+    fb.connect()
+    on_disk = set(repr(bkmk) for bkmk in fb.select())
+    fb.disconnect()
+
+    fb = FirefoxBookmarks(storage="memory", persist_to=persist_path)
+    fb.connect()
+    in_memory = set(repr(bkmk) for bkmk in fb.select())
+    fb.disconnect()
+
+    with closing(sqlite3.connect(persist_path)) as persisted:
+        (persisted_rows, ) = persisted \
+            .execute("SELECT COUNT(*) FROM bookmark") \
+            .fetchone()
+
+    assert in_memory == on_disk
+    assert persisted_rows == len(in_memory)
+
+
+# region FIXTURES
+
+
+@pytest.fixture
+def persist_path():
+    path = os.path.join(gettempdir(), "persisted-bookmarks.sqlite")
+    yield path
+    os.remove(path)
+
+
+# endregion
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_instances_keep_their_own_databases(profile_copies):
+    first, second = FirefoxBookmarks(), FirefoxBookmarks()
+    first.connect(db_path=profile_copies[0])
+    second.connect(db_path=profile_copies[1])
+
+    first.update(
+        where=Bookmark.type == 1,
+        data={Bookmark.title: "Renamed"},
+    )
+
+    first_titles = {bkmk.title for bkmk in first.bookmarks()}
+    second_titles = {bkmk.title for bkmk in second.bookmarks()}
+    first.disconnect()
+    second.disconnect()
+
+    assert first_titles == {"Renamed"}
+    assert "Renamed" not in second_titles
+    assert "Kiosk" in second_titles
+
+
+def test_rows_read_their_own_profile(profile_copies):
+    first, second = FirefoxBookmarks(), FirefoxBookmarks()
+    first.connect(db_path=profile_copies[0])
+    second.connect(db_path=profile_copies[1])
+    second.update(
+        where=Bookmark.type == 2,
+        data={Bookmark.title: "Elsewhere"},
+    )
+
+    # Read after `second` connected, outside of `first`'s methods
+    rows = list(first.bookmarks())
+    paths = [bkmk.path for bkmk in rows]
+    parents = [bkmk.parent.title for bkmk in rows]
+    first.disconnect()
+    second.disconnect()
+
+    assert not any("Elsewhere" in path for path in paths)
+    assert "Elsewhere" not in parents
+
+
+def test_queries_across_profiles(profile_copies):
+    mpb = MultiProfileBookmarks(max_workers=2, storage="memory")
+    reports = mpb.connect(db_paths=profile_copies, readonly=True)
+
+    bookmarks = mpb.bookmarks(with_paths=True)
+    kiosk = mpb.bookmarks(where=Bookmark.title == "Kiosk")
+    mpb.disconnect()
+
+    profiles = [os.path.dirname(db_path) for db_path in profile_copies]
+    assert list(reports) == profiles
+    assert sum(report.rows for report in reports.values()) > 0
+    assert {bkmk.profile for bkmk in bookmarks} == set(profiles)
+    assert all(isinstance(bkmk, BookmarkRecord) for bkmk in bookmarks)
+    assert all(bkmk.path for bkmk in bookmarks)
+    assert [bkmk.profile for bkmk in kiosk] == [profiles[1]]
+
+
+# region FIXTURES
+
+
+@pytest.fixture
+def profile_copies(profile_copies):
+    db_paths = profile_copies
+
+    # Tell the copies apart
+    with closing(sqlite3.connect(db_paths[1])) as places:
+        with places:
+            places.execute(
+                "UPDATE moz_bookmarks SET title = 'Kiosk' "
+                "WHERE id = (SELECT MIN(id) FROM moz_bookmarks WHERE type = 1)"
+            )
+
+    yield db_paths
+
+
+# endregion
@@ -0,0 +1,71 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from firefox_bookmarks import *
+from firefox_bookmarks.locate import locate_db
+
+
+def test_leaves_out_other_columns(fb, full):
+    bookmarks = fb.bookmarks()
+
+    assert [bkmk.url for bkmk in bookmarks] == [bkmk.url for bkmk in full]
+    assert all(bkmk.date_added is None for bkmk in bookmarks)
+    assert all(bkmk.guid for bkmk in bookmarks)
+
+
+def test_loads_columns_on_demand(fb, full):
+    filtered = fb.bookmarks(where=Bookmark.date_added == full[0].date_added)
+    selected = fb.bookmarks(fields=[Bookmark.id, Bookmark.date_added])
+
+    assert full[0].id in [bkmk.id for bkmk in filtered]
+    assert [bkmk.date_added for bkmk in selected] == \
+        [bkmk.date_added for bkmk in full]
+    assert fb.diff() == []
+
+
+def test_commits_loaded_columns_only(places_copy):
+    fb = FirefoxBookmarks()
+    fb.connect(db_path=places_copy, columns=[Bookmark.title, Bookmark.url])
+    fb.update(
+        where=Bookmark.type == 1,
+        data={Bookmark.title: "<updated> " + Bookmark.title},
+    )
+    guids = {bkmk.guid for bkmk in fb.bookmarks()}
+    diff = fb.diff()
+    fb.commit()
+    fb.disconnect()
+
+    assert set(diff) == guids
+    assert dates_added(places_copy) == dates_added(locate_db())
+
+
+# region FIXTURES
+
+
+def dates_added(db_path: str) -> list[tuple]:
+    with closing(sqlite3.connect(db_path)) as places:
+        return places.execute(
+            "SELECT guid, dateAdded FROM moz_bookmarks ORDER BY id",
+        ).fetchall()
+
+
+@pytest.fixture
+def fb():
+    fb = FirefoxBookmarks()
+    fb.connect(columns=[Bookmark.title, Bookmark.url])
+    yield fb
+    fb.disconnect()
+
+
+@pytest.fixture
+def full():
+    fb = FirefoxBookmarks()
+    fb.connect(readonly=True)
+    bookmarks = list(fb.bookmarks())
+    fb.disconnect()
+    return bookmarks
+
+
+# endregion
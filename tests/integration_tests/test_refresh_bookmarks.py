@@ -0,0 +1,35 @@
+import sqlite3
+from contextlib import closing
+
+from firefox_bookmarks import *
+
+
+def test_refresh_bookmarks():
+    fb = FirefoxBookmarks()
+    fb.connect()
+    (bookmark, ) = fb.bookmarks(where=Bookmark.url.contains("mozilla.org"))[:1]
+
+    with closing(sqlite3.connect(fb._places_path)) as places:
+        places.execute(
+            "UPDATE moz_bookmarks "
+            "SET title = 'Renamed by Firefox', "
+            "lastModified = (SELECT MAX(lastModified) + 1 FROM moz_bookmarks) "
+            "WHERE guid = ?",
+            (bookmark.guid, ),
+        )
+        places.commit()
+
+        try:
+            report = fb.refresh()
+            (refreshed, ) = fb.select(where=Bookmark.guid == bookmark.guid)
+        finally:
+            places.execute(
+                "UPDATE moz_bookmarks SET title = ? WHERE guid = ?",
+                (bookmark.title, bookmark.guid),
+            )
+            places.commit()
+            fb.disconnect()
+
+    assert report.copied >= 1
+    assert report.removed == 0
+    assert refreshed.title == "Renamed by Firefox"
@@ -0,0 +1,49 @@
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_search_matches_contains():
+    fb = FirefoxBookmarks(search_index=True)
+    fb.connect()
+
+    searched = set(fb.search("mozilla"))
+    scanned = set(
+        fb.select(where=(Bookmark.title.contains("mozilla")
+                         | Bookmark.url.contains("mozilla")
+                         | Bookmark.description.contains("mozilla")
+                         | Bookmark.site_name.contains("mozilla"))))
+    limited = list(fb.search("mozilla", limit=2, where=Bookmark.type == 1))
+
+    fb.disconnect()
+
+    assert searched == scanned
+    assert len(limited) == 2
+    assert all(bookmark.is_bookmark for bookmark in limited)
+    assert limited[0].rank <= limited[1].rank
+
+
+def test_search_follows_updates():
+    fb = FirefoxBookmarks(search_index=True)
+    fb.connect()
+
+    fb.update(
+        where=Bookmark.url.contains("mozilla.org"),
+        data={Bookmark.title: "Renamed"},
+    )
+    renamed = set(fb.search("renamed"))
+    expected = set(fb.bookmarks(where=Bookmark.url.contains("mozilla.org")))
+
+    fb.disconnect()
+
+    assert renamed == expected
+
+
+def test_search_requires_index():
+    fb = FirefoxBookmarks()
+    fb.connect()
+
+    with pytest.raises(ValueError):
+        fb.search("mozilla")
+
+    fb.disconnect()
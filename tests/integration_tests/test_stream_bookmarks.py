@@ -0,0 +1,51 @@
+import pytest
+
+from firefox_bookmarks import *
+
+
+def test_streams_same_rows(fb):
+    selected = [repr(bkmk) for bkmk in fb.bookmarks()]
+    streamed = [repr(bkmk) for bkmk in fb.iter_bookmarks(fetch_size=2)]
+
+    assert streamed == selected
+
+
+@pytest.mark.parametrize("rows", ["tuple", "dict", "namedtuple"])
+def test_streams_plain_rows(fb, rows):
+    fields = [Bookmark.id, Bookmark.title]
+    selected = [(bkmk.id, bkmk.title) for bkmk in fb.folders(fields=fields)]
+
+    streamed = list(fb.iter_folders(fields=fields, rows=rows, fetch_size=1))
+
+    if rows == "tuple":
+        assert streamed == selected
+    elif rows == "dict":
+        assert [(row["id"], row["title"]) for row in streamed] == selected
+    else:
+        assert [(row.id, row.title) for row in streamed] == selected
+
+
+def test_streams_paths(fb):
+    paths = fb.paths()
+
+    streamed = fb.iter_select(
+        fields=[Bookmark.id],
+        with_paths=True,
+        rows=RowType.DICT,
+    )
+
+    assert {row["id"]: row["materialized_path"] for row in streamed} == paths
+
+
+# region FIXTURES
+
+
+@pytest.fixture
+def fb():
+    fb = FirefoxBookmarks()
+    fb.connect()
+    yield fb
+    fb.disconnect()
+
+
+# endregion
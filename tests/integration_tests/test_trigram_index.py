@@ -0,0 +1,57 @@
+import pytest
+
+from firefox_bookmarks import *
+from firefox_bookmarks.bookmark import BookmarkTrigrams
+
+
+@pytest.mark.parametrize("tokenizer", ["trigram", "missing"])
+def test_trigram_index_keeps_results(tokenizer, monkeypatch):
+    # An unknown tokenizer makes the index fall back to a plain table
+    monkeypatch.setitem(BookmarkTrigrams._meta.options, "tokenize", tokenizer)
+    where = Bookmark.url.contains("mozilla.org/") | \
+        ~Bookmark.title.contains("get")
+
+    fb = FirefoxBookmarks()
+    fb.connect()
+    fb.update(
+        where=Bookmark.url.contains("support"),
+        data={Bookmark.title: "Renamed"},
+    )
+    scanned = (set(fb.select(where=where)),
+               set(fb.bookmarks(where=Bookmark.title.contains("name"))))
+    fb.disconnect()
+
+    fb = FirefoxBookmarks(trigram_index=True)
+    fb.connect()
+    fb.update(
+        where=Bookmark.url.contains("support"),
+        data={Bookmark.title: "Renamed"},
+    )
+    indexed = (set(fb.select(where=where)),
+               set(fb.bookmarks(where=Bookmark.title.contains("name"))))
+    fb.disconnect()
+
+    assert indexed == scanned
+    assert scanned[1]
+
+
+@pytest.mark.parametrize("tokenizer", ["trigram", "missing"])
+def test_trigram_index_keeps_negated_null_results(tokenizer, monkeypatch):
+    monkeypatch.setitem(BookmarkTrigrams._meta.options, "tokenize", tokenizer)
+    # Folders have no `url`, so `NOT url LIKE ...` is NULL for them
+    where = ~Bookmark.url.contains("mozilla")
+
+    fb = FirefoxBookmarks()
+    fb.connect()
+    scanned = set(fb.select(where=where))
+    fb.disconnect()
+
+    fb = FirefoxBookmarks(trigram_index=True)
+    fb.connect()
+    indexed = set(fb.select(where=where))
+    folders = [bkmk for bkmk in fb.select() if bkmk.is_folder]
+    fb.disconnect()
+
+    assert indexed == scanned
+    assert not any(bkmk.is_folder for bkmk in indexed)
+    assert folders
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import pytest
+
+from firefox_bookmarks.backups import *
+
+DAY = 24 * 60 * 60 * 10**6
+
+
+class TestBackupStore:
+
+    @pytest.mark.parametrize("compression", list(Compression))
+    def test_restores_backup(self, store_path, database_path, compression):
+        store = BackupStore(store_path, compression=compression)
+        timestamp = store.add(database_path)
+        _insert_rows(database_path, start=1000)
+
+        store.restore(timestamp, database_path)
+        store.close()
+
+        assert _count_rows(database_path) == 1000
+
+    def test_shares_unchanged_chunks(self, store_path, database_path):
+        store = BackupStore(store_path)
+        first = store.add(database_path)
+        _insert_rows(database_path, start=1000, count=10)
+        second = store.add(database_path)
+
+        with store._bound():
+            chunks = {
+                timestamp: set(digest for (digest, ) in SnapshotChunk \
+                    .select(SnapshotChunk.digest) \
+                    .where(SnapshotChunk.snapshot == timestamp) \
+                    .tuples())
+                for timestamp in (first, second)
+            }
+            stored = Chunk.select().count()
+        store.close()
+
+        assert chunks[first] & chunks[second]
+        assert stored < len(chunks[first]) + len(chunks[second])
+
+    def test_prunes_backups_and_chunks(self, store_path, database_path):
+        store = BackupStore(store_path, retention=None)
+        for day in range(3):
+            store.add(database_path, timestamp=day * DAY)
+            _insert_rows(database_path, start=1000 * (day + 1))
+
+        removed = store.prune(
+            RetentionPolicy(keep_last=1, keep_daily=0, keep_weekly=0))
+        timestamps = store.timestamps()
+        with store._bound():
+            digests = [chunk.digest for chunk in Chunk.select()]
+        store.close()
+
+        stored_files = [
+            file_name
+            for _, _, file_names in os.walk(os.path.join(store_path, "chunks"))
+            for file_name in file_names
+        ]
+
+        assert removed == [0, DAY]
+        assert timestamps == [2 * DAY]
+        assert sorted(stored_files) == sorted(digests)
+
+    def test_binds_models_per_thread(self, tmp_path, database_path):
+        first = BackupStore(os.path.join(tmp_path, "first"))
+        second = BackupStore(os.path.join(tmp_path, "second"))
+        first.add(database_path, timestamp=1)
+        second.add(database_path, timestamp=2)
+
+        with first._bound(), ThreadPoolExecutor(1) as executor:
+            elsewhere = executor.submit(second.timestamps).result()
+            here = [snapshot.timestamp for snapshot in Snapshot.select()]
+        first.close()
+        second.close()
+
+        assert (here, elsewhere) == ([1], [2])
+
+    def test_imports_legacy_backups(self, tmp_path, store_path, database_path):
+        shutil.copy(database_path, os.path.join(tmp_path, "backup-5.sqlite"))
+        _insert_rows(database_path, start=1000)
+        shutil.copy(database_path, os.path.join(tmp_path, "backup-7.sqlite"))
+
+        store = BackupStore(store_path)
+        imported = store.import_legacy(tmp_path)
+        # As left behind by an import that stopped before removing it
+        shutil.copy(database_path, os.path.join(tmp_path, "backup-5.sqlite"))
+        again = store.import_legacy(tmp_path)
+        store.restore(5 * 10**6, database_path)
+        store.close()
+
+        assert imported == [5 * 10**6, 7 * 10**6]
+        assert again == []
+        assert _count_rows(database_path) == 1000
+        assert not os.path.exists(os.path.join(tmp_path, "backup-5.sqlite"))
+
+
+class TestCatalogue:
+
+    def test_records_backups(self, store_path, database_path):
+        store = BackupStore(store_path)
+        timestamp = store.add(database_path, rows_changed=3)
+        (entry, ) = store.entries()
+        looked_up = store.get(timestamp)
+        contents = b"".join(store._iter_chunks(timestamp))
+        store.close()
+
+        assert entry.timestamp == looked_up.timestamp == timestamp
+        assert entry.size == len(contents) > 0
+        assert entry.checksum == hashlib.sha256(contents).hexdigest()
+        assert entry.source == os.path.abspath(database_path)
+        assert entry.rows_changed == 3
+
+    def test_looks_up_by_position(self, store_path, database_path):
+        store = BackupStore(store_path, retention=None)
+        for timestamp in (1, 3, 2):
+            store.add(database_path, timestamp=timestamp)
+
+        latest = store.nth_latest(0).timestamp
+        oldest = store.nth_latest(2).timestamp
+        with pytest.raises(IndexError):
+            store.nth_latest(3)
+        with pytest.raises(KeyError):
+            store.get(4)
+        store.close()
+
+        assert (latest, oldest) == (3, 1)
+
+
+class TestRetentionPolicy:
+
+    def test_keeps_last(self):
+        policy = RetentionPolicy(keep_last=2, keep_daily=0, keep_weekly=0)
+
+        assert policy.select([1, 2, 3]) == {2, 3}
+
+    def test_keeps_latest_per_day_and_week(self):
+        policy = RetentionPolicy(keep_last=0, keep_daily=2, keep_weekly=2)
+        # Thursday 1970-01-01, then 2 backups on Friday, then Monday 01-12
+        timestamps = [0, DAY, DAY + 1, 11 * DAY]
+
+        assert policy.select(timestamps) == {DAY + 1, 11 * DAY}
+
+
+# region HELPERS
+
+
+def _insert_rows(path: str, *, start: int = 0, count: int = 1000):
+    with closing(sqlite3.connect(path)) as connection:
+        connection.executemany(
+            "INSERT INTO numbers VALUES (?, ?)",
+            ((n, "x" * 200) for n in range(start, start + count)),
+        )
+        connection.commit()
+
+
+def _count_rows(path: str) -> int:
+    with closing(sqlite3.connect(path)) as connection:
+        (count, ) = connection.execute("SELECT COUNT(*) FROM numbers") \
+            .fetchone()
+    return count
+
+
+# endregion
+
+# region FIXTURES
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return os.path.join(tmp_path, "backups")
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = os.path.join(tmp_path, "places.sqlite")
+    with closing(sqlite3.connect(path)) as connection:
+        connection.execute("CREATE TABLE numbers (n INTEGER, padding TEXT)")
+    _insert_rows(path)
+    return path
+
+
+# endregion
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+from peewee import SqliteDatabase
+
+from firefox_bookmarks.binding import *
+
+
+class TestBoundDatabase:
+
+    def test_stands_in_for_default(self, databases):
+        default, _ = databases
+        proxy = BoundDatabase(default)
+
+        assert proxy.database == default.database
+
+    def test_binds_per_thread(self, databases):
+        default, other = databases
+        proxy = BoundDatabase(default)
+        seen = {}
+
+        def look():
+            seen["thread"] = proxy.database
+
+        with proxy.bound(other):
+            thread = threading.Thread(target=look)
+            thread.start()
+            thread.join()
+            seen["bound"] = proxy.database
+        seen["unbound"] = proxy.database
+
+        assert seen == {
+            "thread": default.database,
+            "bound": other.database,
+            "unbound": default.database,
+        }
+
+    def test_resets_default(self, databases):
+        default, other = databases
+        proxy = BoundDatabase(default)
+
+        proxy.initialize(other)
+        assert proxy.default is other
+        proxy.reset()
+        assert proxy.default is default
+
+
+# region FIXTURES
+
+
+@pytest.fixture
+def databases():
+    return SqliteDatabase("default.sqlite"), SqliteDatabase("other.sqlite")
+
+
+# endregion
@@ -0,0 +1,301 @@
+import pytest
+
+from firefox_bookmarks.bookmark import *
+
+
+class TestTrackChanges:
+
+    @pytest.mark.usefixtures("bookmark_database")
+    def test_logs_changed_columns_only(self):
+        Bookmark.update({
+            Bookmark.title: "Renamed",
+            Bookmark.url: "https://example.com",
+        }).where(Bookmark.id == 1).execute()
+
+        changes = [(change.bookmark_id, change.operation, change.column)
+                   for change in BookmarkChange.select()]
+
+        assert changes == [(1, "UPDATE", "title")]
+
+    @pytest.mark.usefixtures("bookmark_database")
+    def test_logs_updates_once_per_row(self):
+        Bookmark.update({
+            Bookmark.title: "Renamed",
+            Bookmark.url: "https://example.org",
+            Bookmark.description: "Described",
+        }).where(Bookmark.id == 1).execute()
+        Bookmark.update({
+            Bookmark.description: "Described again"
+        }).where(Bookmark.id == 1).execute()
+
+        changes = [(change.bookmark_id, change.operation, change.column)
+                   for change in BookmarkChange.select()]
+
+        assert changes == [(1, "UPDATE", "title,url"), (1, "UPDATE", None)]
+
+    @pytest.mark.usefixtures("bookmark_database")
+    def test_logs_inserts_and_deletes(self):
+        Bookmark.insert(id=2, guid="new", sync_change_counter=1,
+                        sync_status=0).execute()
+        Bookmark.delete().where(Bookmark.id == 1).execute()
+
+        changes = [(change.guid, change.operation)
+                   for change in BookmarkChange.select()]
+
+        assert changes == [("new", "INSERT"), ("old", "DELETE")]
+
+    def test_untracked(self, bookmark_database):
+        with untracked(bookmark_database):
+            Bookmark.update({
+                Bookmark.title: "Renamed"
+            }).where(Bookmark.id == 1).execute()
+
+        assert BookmarkChange.select().count() == 0
+
+    def test_untracked_resumes_after_error(self, bookmark_database):
+        with pytest.raises(RuntimeError):
+            with untracked(bookmark_database):
+                raise RuntimeError
+
+        Bookmark.update({
+            Bookmark.title: "Renamed"
+        }).where(Bookmark.id == 1).execute()
+
+        assert BookmarkChange.select().count() == 1
+
+
+class TestBookmarkPaths:
+
+    def test_matches_path_property(self, bookmark_tree):
+        paths = bookmark_paths()
+        computed = dict(paths.select_from(paths.c.id, paths.c.path).tuples())
+
+        assert computed == {
+            bookmark.id: bookmark.path
+            for bookmark in Bookmark.select()
+        }
+        assert computed[4] == "/menu/[None](https://example.com)"
+
+    def test_not_tracked(self, bookmark_tree):
+        paths = bookmark_paths()
+        Bookmark \
+            .update(materialized_path=paths.c.path) \
+            .from_(paths) \
+            .where(paths.c.id == Bookmark.id) \
+            .with_cte(paths) \
+            .execute()
+
+        assert Bookmark.get_by_id(5).path == "/menu/<Bookmark 5, 3, None>"
+        assert BookmarkChange.select().count() == 0
+
+    def test_subtree_paths(self, bookmark_tree):
+        paths = bookmark_paths()
+        Bookmark \
+            .update(materialized_path=paths.c.path) \
+            .from_(paths) \
+            .where(paths.c.id == Bookmark.id) \
+            .with_cte(paths) \
+            .execute()
+        Bookmark.update(title="Places").where(Bookmark.id == 2).execute()
+
+        # Nested subtrees are covered once
+        subtree, paths = subtree_paths([2, 4])
+        computed = paths \
+            .select_from(paths.c.id, paths.c.path) \
+            .with_cte(subtree, paths) \
+            .tuples()
+
+        assert sorted(computed) == [
+            (2, "/Places/"),
+            (4, "/Places/[None](https://example.com)"),
+            (5, "/Places/<Bookmark 5, 3, None>"),
+        ]
+
+
+class TestBookmarkRecord:
+
+    def test_matches_model(self, bookmark_tree):
+        models = list(Bookmark.select().order_by(Bookmark.id))
+        records = [
+            BookmarkRecord._make(row)
+            for row in Bookmark.select().order_by(Bookmark.id).tuples()
+        ]
+
+        assert [repr(record) for record in records] == \
+            [repr(model) for model in models]
+        assert [str(record) for record in records] == \
+            [str(model) for model in models]
+        assert [(record.is_bookmark, record.is_folder) for record in records] == \
+            [(model.is_bookmark, model.is_folder) for model in models]
+        assert [record.parent_id for record in records] == \
+            [model.parent_id for model in models]
+
+    def test_read_only(self):
+        record = BookmarkRecord._make([None] * len(BookmarkRecord._fields))
+
+        with pytest.raises(AttributeError):
+            record.title = "Title"
+        assert not hasattr(record, "__dict__")
+
+    def test_profile_record(self):
+        values = [None] * len(BookmarkRecord._fields)
+        record = ProfileBookmarkRecord(*values, "profile")
+
+        assert isinstance(record, BookmarkRecord)
+        assert record.profile == "profile"
+        assert repr(record) == repr(BookmarkRecord(*values))
+
+
+class TestClosure:
+
+    def test_build(self, bookmark_tree):
+        build_closure(bookmark_tree)
+
+        assert closure_rows() == {
+            (1, 1, 0),
+            (2, 2, 0),
+            (3, 3, 0),
+            (4, 4, 0),
+            (5, 5, 0),
+            (1, 2, 1),
+            (1, 3, 1),
+            (2, 4, 1),
+            (2, 5, 1),
+            (1, 4, 2),
+            (1, 5, 2),
+        }
+
+    def test_triggers_match_rebuild(self, bookmark_tree):
+        build_closure(bookmark_tree)
+        track_closure(bookmark_tree)
+
+        Bookmark.update(parent=3).where(Bookmark.id == 2).execute()
+        Bookmark.insert(id=6,
+                        parent=2,
+                        type=1,
+                        sync_change_counter=1,
+                        sync_status=0).execute()
+        Bookmark.delete().where(Bookmark.id == 5).execute()
+        maintained = closure_rows()
+
+        build_closure(bookmark_tree)
+
+        assert maintained == closure_rows()
+        assert (1, 6, 3) in maintained
+
+    def test_created_only_when_enabled(self, bookmark_database):
+        assert "bookmark_closure" not in bookmark_database.get_tables()
+
+
+class TestSearch:
+
+    def test_triggers_keep_index_in_sync(self, bookmark_tree):
+        bookmark_tree.create_tables([BookmarkSearch])
+        build_index(bookmark_tree, BookmarkSearch)
+        track_index(bookmark_tree, BookmarkSearch)
+
+        Bookmark.update(title="Tools").where(Bookmark.id == 3).execute()
+        Bookmark.delete().where(Bookmark.id == 2).execute()
+
+        assert search("toolbar") == []
+        assert search("tools") == [3]
+        assert search("menu") == []
+        assert search("example") == [4]
+
+    def test_rebuild(self, bookmark_tree):
+        bookmark_tree.create_tables([BookmarkSearch])
+        with rebuilding_index(bookmark_tree, BookmarkSearch):
+            Bookmark.update(title="Tools").where(Bookmark.id == 3).execute()
+
+        assert search("tools") == [3]
+
+
+class TestTrigrams:
+
+    def test_trigrams(self):
+        assert trigrams("Moz.org") == {"moz", "oz.", "z.o", ".or", "org"}
+        assert trigrams("ab") == set()
+        assert trigrams(None) == set()
+
+    def test_index_changed_rows(self, bookmark_tree):
+        bookmark_tree.create_tables([BookmarkTrigram])
+        index_trigrams(bookmark_tree)
+        Bookmark.update(title="Tools").where(Bookmark.id == 3).execute()
+        index_trigrams(bookmark_tree, [3])
+
+        indexed = set(
+            BookmarkTrigram \
+                .select(BookmarkTrigram.trigram) \
+                .where(BookmarkTrigram.bookmark_id == 3) \
+                .where(BookmarkTrigram.column == "title") \
+                .tuples())
+
+        assert indexed == {("too", ), ("ool", ), ("ols", )}
+
+
+def search(query: str) -> list[int]:
+    return [
+        rowid for (rowid, ) in BookmarkSearch \
+            .select(BookmarkSearch.rowid) \
+            .where(BookmarkSearch.match(query)) \
+            .tuples()
+    ]
+
+
+def closure_rows() -> set[tuple[int, int, int]]:
+    return set(
+        BookmarkClosure.select(
+            BookmarkClosure.ancestor,
+            BookmarkClosure.descendant,
+            BookmarkClosure.depth,
+        ).tuples())
+
+
+# region FIXTURES
+
+
+@pytest.fixture
+def bookmark_database():
+    database = connect_bookmark_model(db_path=":memory:")
+    with untracked(database):
+        Bookmark.insert(
+            id=1,
+            guid="old",
+            title="Title",
+            url="https://example.com",
+            sync_change_counter=1,
+            sync_status=0,
+        ).execute()
+
+    yield database
+
+    database.close()
+
+
+@pytest.fixture
+def bookmark_tree():
+    database = connect_bookmark_model(db_path=":memory:", closure_table=True)
+    with untracked(database):
+        Bookmark.insert_many(
+            [
+                (1, 0, 2, "root"),
+                (2, 1, 2, "menu"),
+                (3, 1, 2, "toolbar"),
+                (4, 2, 1, None),
+                (5, 2, 3, None),
+            ],
+            fields=[
+                Bookmark.id, Bookmark.parent, Bookmark.type, Bookmark.title
+            ],
+        ).execute()
+        Bookmark \
+            .update(url="https://example.com") \
+            .where(Bookmark.id == 4) \
+            .execute()
+
+    yield database
+
+    database.close()
+
+
+# endregion
@@ -1,5 +1,12 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+
 import pytest
-from peewee import SqliteDatabase
+from peewee import OperationalError, SqliteDatabase
 from pytest_mock import MockerFixture
 
 from firefox_bookmarks.connect import *
@@ -21,6 +28,13 @@ class TestConnect:
             criterion=my_criterion,
         )
 
+    def test_skips_locate_db_given_path(self, mock_locate_db, wal_database):
+        with places_db(db_path=wal_database, readonly=True) as database:
+            rows = database.execute_sql("SELECT COUNT(*) FROM numbers")
+            assert rows.fetchone() == (1000, )
+
+        mock_locate_db.assert_not_called()
+
     @pytest.mark.usefixtures("mock_locate_db")
     def test_connects(self, mock_peewee_connect):
         connection = connect_to_places_db()
@@ -29,6 +43,101 @@ class TestConnect:
         mock_peewee_connect.assert_called_once_with(reuse_if_open=True)
 
 
+class TestConnectReadonly:
+
+    def test_opens_in_place(self, wal_database, mocker: MockerFixture):
+        mocker.patch(
+            "firefox_bookmarks.connect.locate_db",
+            return_value=wal_database,
+        )
+        mock_mkstemp = mocker.spy(tempfile, "mkstemp")
+
+        with places_db(readonly=True) as database:
+            rows = database.execute_sql("SELECT COUNT(*) FROM numbers")
+            assert rows.fetchone() == (1000, )
+            with pytest.raises(OperationalError):
+                database.execute_sql("DELETE FROM numbers")
+
+        mock_mkstemp.assert_not_called()
+
+    def test_copies_locked_database(
+        self,
+        locked_database,
+        mocker: MockerFixture,
+    ):
+        mocker.patch(
+            "firefox_bookmarks.connect.locate_db",
+            return_value=locked_database,
+        )
+
+        with pytest.warns(UserWarning):
+            database = connect_to_places_db(readonly=True)
+        rows = database.execute_sql("SELECT COUNT(*) FROM numbers")
+        assert rows.fetchone() == (1, )
+
+        copy_path = database.database
+        assert os.path.exists(copy_path)
+        close_places_db(database)
+        assert not os.path.exists(copy_path)
+
+
+class TestCopyDatabase:
+
+    def test_includes_write_ahead_log(self, wal_database, tmp_path):
+        target_path = os.path.join(tmp_path, "copy.sqlite")
+
+        copy_database(wal_database, target_path)
+
+        with closing(sqlite3.connect(target_path)) as target:
+            rows = target.execute("SELECT COUNT(*) FROM numbers").fetchone()
+        assert rows == (1000, )
+
+    def test_reports_progress_per_step(self, wal_database, tmp_path):
+        steps = []
+
+        copy_database(
+            wal_database,
+            os.path.join(tmp_path, "copy.sqlite"),
+            pages=1,
+            progress=lambda status, remaining, total: steps.append(remaining),
+            sleep=0,
+        )
+
+        assert len(steps) > 1
+        assert steps[-1] == 0
+
+    def test_retries_while_briefly_locked(self, tmp_path):
+        path = os.path.join(tmp_path, "source.sqlite")
+        with closing(sqlite3.connect(path)) as connection:
+            connection.execute("CREATE TABLE numbers (n INTEGER)")
+            connection.commit()
+        locked = threading.Event()
+
+        def hold_lock():
+            with closing(sqlite3.connect(path)) as connection:
+                connection.execute("BEGIN EXCLUSIVE")
+                locked.set()
+                time.sleep(0.2)
+                connection.rollback()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait()
+        copy_database(path, os.path.join(tmp_path, "copy.sqlite"), sleep=0.01)
+        holder.join()
+
+        assert os.path.exists(os.path.join(tmp_path, "copy.sqlite"))
+
+    def test_gives_up_while_locked(self, locked_database, tmp_path):
+        with pytest.raises(sqlite3.OperationalError):
+            copy_database(
+                locked_database,
+                os.path.join(tmp_path, "copy.sqlite"),
+                sleep=0,
+                retries=2,
+            )
+
+
 # region FIXTURES
 
 
@@ -50,4 +159,36 @@ def mock_peewee_connect(mocker: MockerFixture):
     return mocked_peewee_connect
 
 
+@pytest.fixture
+def wal_database(tmp_path):
+    path = os.path.join(tmp_path, "source.sqlite")
+
+    # Keep the connection open, so that the rows stay in the write-ahead log
+    with closing(sqlite3.connect(path)) as connection:
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA wal_autocheckpoint = 0")
+        connection.execute("CREATE TABLE numbers (n INTEGER, padding TEXT)")
+        connection.executemany(
+            "INSERT INTO numbers VALUES (?, ?)",
+            ((n, "x" * 100) for n in range(1000)),
+        )
+        connection.commit()
+
+        yield path
+
+
+@pytest.fixture
+def locked_database(tmp_path):
+    path = os.path.join(tmp_path, "locked.sqlite")
+
+    # Hold an exclusive lock, as a running Firefox does
+    with closing(sqlite3.connect(path)) as connection:
+        connection.execute("PRAGMA locking_mode = EXCLUSIVE")
+        connection.execute("CREATE TABLE numbers (n INTEGER)")
+        connection.execute("INSERT INTO numbers VALUES (1)")
+        connection.commit()
+
+        yield path
+
+
 # endregion
@@ -0,0 +1,23 @@
+import pytest
+
+from firefox_bookmarks.export import *
+from firefox_bookmarks.export import _format_of
+
+
+class TestFormatOf:
+
+    @pytest.mark.parametrize(
+        "output_path, expected",
+        [
+            ("bookmarks.html", ExportFormat.HTML),
+            ("bookmarks.HTM", ExportFormat.HTML),
+            ("bookmarks.json.gz", ExportFormat.JSON),
+            ("nightly/bookmarks.csv", ExportFormat.CSV),
+        ],
+    )
+    def test_reads_extension(self, output_path, expected):
+        assert _format_of(output_path) == expected
+
+    def test_rejects_unknown_extension(self):
+        with pytest.raises(ValueError):
+            _format_of("bookmarks.txt")
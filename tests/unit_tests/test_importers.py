@@ -0,0 +1,89 @@
+import io
+import json
+
+from firefox_bookmarks.constants import BOOKMARK_TYPE, FOLDER_TYPE, SEPARATOR_TYPE
+from firefox_bookmarks.importers import *
+
+
+class TestReadHtml:
+
+    def test_reads_tree(self):
+        rows = list(read_html(io.StringIO(NETSCAPE)))
+
+        assert [(depth, row["type"], row["title"]) for depth, row in rows] == [
+            (0, FOLDER_TYPE, "Work"),
+            (1, BOOKMARK_TYPE, "Docs & more"),
+            (1, SEPARATOR_TYPE, None),
+            (0, BOOKMARK_TYPE, "Top"),
+        ]
+        assert rows[1][1]["url"] == "https://example.com/?a=1&b=2"
+        assert rows[1][1]["date_added"] == 1_700_000_000 * 1_000_000
+
+    def test_reads_in_chunks(self, monkeypatch):
+        monkeypatch.setattr("firefox_bookmarks.importers.READ_SIZE", 7)
+
+        rows = list(read_html(io.StringIO(NETSCAPE)))
+
+        assert [row["title"] for _, row in rows] == \
+            ["Work", "Docs & more", None, "Top"]
+
+
+class TestReadJson:
+
+    def test_reads_tree_without_tags(self):
+        rows = list(read_json(io.StringIO(json.dumps(BACKUP))))
+
+        assert [(depth, row["type"], row["title"]) for depth, row in rows] == [
+            (0, FOLDER_TYPE, "menu"),
+            (1, BOOKMARK_TYPE, "Example"),
+        ]
+        assert rows[1][1]["url"] == "https://example.com/"
+
+
+# region FIXTURES
+
+NETSCAPE = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1700000000">Work</H3>
+    <DL><p>
+        <DT><A HREF="https://example.com/?a=1&amp;b=2" ADD_DATE="1700000000">Docs &amp; more</A>
+        <HR>
+    </DL><p>
+    <DT><A HREF="https://example.org/">Top</A>
+</DL>
+"""
+
+BACKUP = {
+    "root":
+    "placesRoot",
+    "type":
+    "text/x-moz-place-container",
+    "children": [
+        {
+            "title":
+            "menu",
+            "root":
+            "bookmarksMenuFolder",
+            "type":
+            "text/x-moz-place-container",
+            "children": [{
+                "title": "Example",
+                "type": "text/x-moz-place",
+                "uri": "https://example.com/",
+            }],
+        },
+        {
+            "title": "tags",
+            "root": "tagsFolder",
+            "type": "text/x-moz-place-container",
+            "children": [{
+                "title": "tag",
+                "type": "text/x-moz-place-container",
+            }],
+        },
+    ],
+}
+
+# endregion
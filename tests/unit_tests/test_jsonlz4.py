@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+from firefox_bookmarks.constants import BOOKMARK_TYPE, FOLDER_TYPE, SEPARATOR_TYPE
+from firefox_bookmarks.jsonlz4 import *
+
+
+class TestDecompressBlock:
+
+    def test_copies_literals(self):
+        assert decompress_block(b"\x50hello", size=5) == b"hello"
+
+    def test_copies_matches(self):
+        # "abcd", then 6 bytes from 4 back, then "x"
+        block = b"\x42abcd\x04\x00" + b"\x10x"
+
+        assert decompress_block(block, size=11) == b"abcdabcdabx"
+
+    def test_repeats_overlapping_matches(self):
+        # "ab", then 9 bytes from 2 back
+        block = b"\x25ab\x02\x00" + b"\x10!"
+
+        assert decompress_block(block, size=12) == b"ababababab" + b"a!"
+
+    def test_reads_extended_lengths(self):
+        literals = bytes(range(256)) * 2
+        # 15 + 255 + 242 literals
+        block = b"\xf0\xff\xf2" + literals
+
+        assert decompress_block(block, size=512) == literals
+
+    def test_rejects_offsets_before_the_start(self):
+        with pytest.raises(ValueError):
+            decompress_block(b"\x40abc\x09\x00", size=8)
+
+    def test_rejects_truncated_blocks(self):
+        with pytest.raises(ValueError):
+            decompress_block(b"\x50hel", size=5)
+
+    def test_rejects_wrong_sizes(self):
+        with pytest.raises(ValueError):
+            decompress_block(b"\x50hello", size=6)
+
+
+class TestReadMozlz4:
+
+    def test_reads_header(self, tmp_path):
+        path = tmp_path / "bookmarks.jsonlz4"
+        path.write_bytes(MOZLZ4_MAGIC + (5).to_bytes(4, "little") +
+                         b"\x50hello")
+
+        assert read_mozlz4(str(path)) == b"hello"
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "bookmarks.json"
+        path.write_bytes(b'{"children": []}')
+
+        with pytest.raises(ValueError):
+            read_mozlz4(str(path))
+
+
+class TestReadJsonlz4:
+
+    def test_reads_tree(self, backup_path):
+        rows = [
+            dict(zip((field.name for field in SNAPSHOT_FIELDS), row))
+            for row in read_jsonlz4(backup_path)
+        ]
+
+        assert [(row["id"], row["parent"], row["position"], row["type"])
+                for row in rows] == [
+                    (1, 0, 0, FOLDER_TYPE),
+                    (2, 1, 0, FOLDER_TYPE),
+                    (7, 2, 0, BOOKMARK_TYPE),
+                    (8, 2, 1, SEPARATOR_TYPE),
+                    (3, 1, 1, FOLDER_TYPE),
+                ]
+        assert rows[2]["url"] == "https://www.mozilla.org/about/"
+        assert rows[3]["url"] is None
+
+
+class TestUrlColumns:
+
+    def test_computes_url_fields(self):
+        url_hash, rev_host, prefix, host = \
+            url_columns("https://www.mozilla.org/about/")
+
+        assert url_hash >> 32 == 11026
+        assert rev_host == "gro.allizom.www."
+        assert (prefix, host) == ("https://", "www.mozilla.org")
+
+
+# region FIXTURES
+
+BACKUP = {
+    "guid":
+    "root________",
+    "id":
+    1,
+    "index":
+    0,
+    "typeCode":
+    FOLDER_TYPE,
+    "children": [
+        {
+            "guid":
+            "menu________",
+            "id":
+            2,
+            "index":
+            0,
+            "typeCode":
+            FOLDER_TYPE,
+            "children": [
+                {
+                    "guid": "abcdefghijkl",
+                    "id": 7,
+                    "index": 0,
+                    "title": "About",
+                    "type": "text/x-moz-place",
+                    "uri": "https://www.mozilla.org/about/",
+                },
+                {
+                    "guid": "mnopqrstuvwx",
+                    "id": 8,
+                    "index": 1,
+                    "type": "text/x-moz-place-separator",
+                },
+            ],
+        },
+        {
+            "guid": "toolbar_____",
+            "id": 3,
+            "index": 1,
+            "typeCode": FOLDER_TYPE,
+        },
+    ],
+}
+
+
+@pytest.fixture
+def backup_path(tmp_path) -> str:
+    data = json.dumps(BACKUP).encode("utf-8")
+    path = tmp_path / "bookmarks.jsonlz4"
+    path.write_bytes(MOZLZ4_MAGIC + len(data).to_bytes(4, "little") +
+                     literal_block(data))
+    return str(path)
+
+
+def literal_block(data: bytes) -> bytes:
+    """Encodes `data` as an LZ4 block of a single sequence of literals"""
+
+    length = len(data) - 15
+    if length < 0:
+        return bytes([len(data) << 4]) + data
+    return b"\xf0" + b"\xff" * (length // 255) + bytes([length % 255]) + data
+
+
+# endregion
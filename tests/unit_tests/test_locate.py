@@ -1,7 +1,10 @@
+import os
+
 import pytest
 from pytest_mock import MockerFixture
 
 from firefox_bookmarks.locate import *
+from firefox_bookmarks.locate import FILE_NAME
 
 
 class TestLocate:
@@ -26,8 +29,52 @@ class TestLocate:
 
 
 class TestLocateCandidates:
-    # TODO
-    pass
+
+    def test_reads_profiles_ini(self, profiles_dir):
+        with open(os.path.join(profiles_dir, "profiles.ini"), "w") as ini:
+            ini.write("[General]\nStartWithLastProfile=1\n\n"
+                      "[Profile0]\nName=default\nIsRelative=1\n"
+                      "Path=Profiles/abcd.default\n")
+
+        candidates = locate_db_candidates(look_under_path=profiles_dir)
+
+        assert candidates == [
+            os.path.join(profiles_dir, "Profiles", "abcd.default", FILE_NAME)
+        ]
+
+    def test_reads_installs_ini(self, profiles_dir):
+        with open(os.path.join(profiles_dir, "installs.ini"), "w") as ini:
+            ini.write("[4F96D1932A9F858E]\nDefault=Profiles/efgh.dev\n")
+
+        candidates = locate_db_candidates(look_under_path=profiles_dir)
+
+        assert candidates == [
+            os.path.join(profiles_dir, "Profiles", "efgh.dev", FILE_NAME)
+        ]
+
+    def test_walk_skips_heavy_directories(self, profiles_dir):
+        candidates = locate_db_candidates(look_under_path=profiles_dir)
+
+        assert sorted(candidates) == [
+            os.path.join(profiles_dir, "Profiles", "abcd.default", FILE_NAME),
+            os.path.join(profiles_dir, "Profiles", "efgh.dev", FILE_NAME),
+        ]
+
+    def test_caches_until_directory_changes(
+        self,
+        profiles_dir,
+        mocker: MockerFixture,
+    ):
+        mock_walk = mocker.spy(os, "walk")
+
+        first = locate_db_candidates(look_under_path=profiles_dir)
+        second = locate_db_candidates(look_under_path=profiles_dir)
+        assert first == second
+        assert mock_walk.call_count == 1
+
+        os.utime(profiles_dir, (0, 0))
+        locate_db_candidates(look_under_path=profiles_dir)
+        assert mock_walk.call_count == 2
 
 
 # region FIXTURES
@@ -45,4 +92,18 @@ def mock_locate_db_candidates(mocker: MockerFixture):
     return mocked_func
 
 
+@pytest.fixture
+def profiles_dir(tmp_path):
+    for profile in ("abcd.default", "efgh.dev"):
+        profile_dir = tmp_path / "Profiles" / profile
+        (profile_dir / "cache2").mkdir(parents=True)
+        (profile_dir / FILE_NAME).touch()
+        # Never a profile's own Places database
+        (profile_dir / "cache2" / FILE_NAME).touch()
+
+    clear_candidates_cache()
+    yield str(tmp_path)
+    clear_candidates_cache()
+
+
 # endregion
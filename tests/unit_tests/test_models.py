@@ -1,6 +1,7 @@
 import pytest
 from pytest_mock import MockerFixture
 
+from firefox_bookmarks.constants import BACKUP_PAGES, BACKUP_SLEEP
 from firefox_bookmarks.models import (
     ProfileCriterion,
     connect_firefox_models,
@@ -21,9 +22,14 @@ class TestConnectFirefoxModels:
 
         mock_connect_to_places_db.assert_called_once_with(
             database=database_obj,
+            db_path=None,
             look_under_path=my_path,
             criterion=my_criterion,
             readonly=False,
+            immutable=False,
+            pages=BACKUP_PAGES,
+            progress=None,
+            sleep=BACKUP_SLEEP,
         )
 
 
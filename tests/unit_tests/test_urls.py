@@ -0,0 +1,56 @@
+import pytest
+
+from firefox_bookmarks.urls import *
+
+
+class TestHashUrl:
+
+    @pytest.mark.parametrize(
+        "url, prefix_hash",
+        [
+            # The top 16 bits of every `url_hash` of these schemes in Places
+            ("https://www.mozilla.org/about/", 11026),
+            ("http://example.com/", 29222),
+        ],
+    )
+    def test_hashes_scheme_into_top_bits(self, url, prefix_hash):
+        assert hash_url(url) >> 32 == prefix_hash
+
+    def test_hashes_schemeless_strings_in_32_bits(self):
+        assert hash_url("no scheme here") < 2**32
+
+    def test_hashes_only_leading_characters(self):
+        head = "https://example.com/" + "a" * 2000
+        assert hash_url(head) == hash_url(head + "b")
+
+
+class TestReverseHost:
+
+    def test_reverses_host(self):
+        assert reverse_host("https://WWW.Mozilla.org/about/") == \
+            "gro.allizom.www."
+
+    def test_handles_missing_host(self):
+        assert reverse_host("about:blank") == "."
+
+
+class TestSplitOrigin:
+
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            ("https://www.mozilla.org/about/",
+             ("https://", "www.mozilla.org")),
+            ("http://localhost:8080/x", ("http://", "localhost:8080")),
+            ("about:blank", ("about:", "")),
+        ],
+    )
+    def test_splits(self, url, expected):
+        assert split_origin(url) == expected
+
+
+def test_makes_places_guids():
+    guids = {make_guid() for _ in range(100)}
+
+    assert len(guids) == 100
+    assert all(len(guid) == 12 for guid in guids)